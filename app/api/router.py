@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.routes import auth, health, progress, quiz, study_plan, user
+from app.api.routes import analytics, auth, health, progress, quiz, study_plan, user
 
 api_router = APIRouter()
 
@@ -10,3 +10,4 @@ api_router.include_router(user.router, prefix="/users", tags=["users"])
 api_router.include_router(study_plan.router, prefix="/plan", tags=["study-plans"])
 api_router.include_router(progress.router, prefix="/progress", tags=["progress"])
 api_router.include_router(quiz.router, prefix="/quizzes", tags=["quizzes"])
+api_router.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
@@ -0,0 +1,22 @@
+from datetime import date
+from typing import Annotated
+from uuid import UUID
+
+from fastapi import APIRouter, Depends
+
+from app.core.dependencies import CurrentUser, get_read_analytics_service
+from app.domain.schemas.analytics import UserActivitySummary
+from app.domain.services.analytics import AnalyticsService
+
+router = APIRouter()
+
+
+@router.get("/me", response_model=UserActivitySummary)
+async def get_my_activity(
+    current_user: CurrentUser,
+    service: Annotated[AnalyticsService, Depends(get_read_analytics_service)],
+    start: date | None = None,
+    end: date | None = None,
+    study_plan_id: UUID | None = None,
+) -> UserActivitySummary:
+    return await service.get_user_summary(current_user.id, start, end, study_plan_id)
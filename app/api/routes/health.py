@@ -3,14 +3,14 @@ from typing import Any
 from fastapi import APIRouter, HTTPException, status
 from sqlalchemy import text
 
-from app.core.dependencies import SessionDep
+from app.core.dependencies import ReadSessionDep
 
 router = APIRouter()
 
 
 @router.get("/", status_code=status.HTTP_200_OK)
 async def health_check(
-    session: SessionDep,
+    session: ReadSessionDep,
 ) -> Any:
     """
     Health check endpoint.
@@ -0,0 +1,36 @@
+import secrets
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+
+from app.core.config import get_settings
+from app.core.metrics import render_metrics
+
+
+def _authorize_scraper(authorization: Annotated[str | None, Header()] = None) -> None:
+    settings = get_settings()
+    token = settings.METRICS_TOKEN
+    if token is None:
+        if settings.ENVIRONMENT == "production":
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+        return
+    if authorization is None or not secrets.compare_digest(
+        authorization.encode(), f"Bearer {token}".encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+router = APIRouter(dependencies=[Depends(_authorize_scraper)])
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """
+    Prometheus exposition of the metrics in `app.core.metrics`, for scrapers
+    holding `METRICS_TOKEN`.
+    """
+    content, content_type = render_metrics()
+    return Response(content=content, media_type=content_type)
@@ -6,7 +6,7 @@ from pydantic import BaseModel
 
 from app.core.dependencies import CurrentUser, get_progress_service
 from app.domain.enums import CompletionStatus
-from app.domain.schemas.progress import ResourceProgressRead
+from app.domain.schemas.progress import ResourceProgressRead, StudyPlanProgressRead
 from app.domain.services.progress import ProgressService
 
 router = APIRouter()
@@ -42,3 +42,24 @@ async def update_resource_status(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=str(e),
         ) from e
+
+
+@router.post(
+    "/plan/{study_plan_id}/rebuild",
+    response_model=StudyPlanProgressRead,
+)
+async def rebuild_study_plan_progress(
+    study_plan_id: UUID,
+    current_user: CurrentUser,
+    service: Annotated[ProgressService, Depends(get_progress_service)],
+) -> StudyPlanProgressRead:
+    try:
+        progress = await service.rebuild_study_plan_progress(
+            current_user.id, study_plan_id
+        )
+        return StudyPlanProgressRead.model_validate(progress)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        ) from e
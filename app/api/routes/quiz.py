@@ -6,7 +6,9 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from app.core.dependencies import (
     CurrentUser,
     get_quiz_service,
+    get_read_quiz_service,
 )
+from app.domain.enums import QuizState
 from app.domain.schemas.quiz import (
     QuizGenerateRequest,
     QuizRead,
@@ -42,7 +44,7 @@ async def create_quiz(
 async def get_quiz(
     quiz_id: UUID,
     current_user: CurrentUser,
-    service: Annotated[QuizService, Depends(get_quiz_service)],
+    service: Annotated[QuizService, Depends(get_read_quiz_service)],
 ) -> QuizReadDetail:
     quiz = await service.get_quiz(quiz_id)
     if not quiz:
@@ -73,8 +75,7 @@ async def start_quiz(
     current_user: CurrentUser,
     service: Annotated[QuizService, Depends(get_quiz_service)],
 ) -> QuizReadPublic:
-    quiz = await service.start_quiz(quiz_id, current_user.id)
-    return QuizReadPublic.model_validate(quiz)
+    return await service.start_quiz(quiz_id, current_user.id)
 
 
 @router.post(
@@ -111,9 +112,10 @@ async def submit_quiz(
 async def list_quizzes(
     plan_id: UUID,
     current_user: CurrentUser,
-    service: Annotated[QuizService, Depends(get_quiz_service)],
+    service: Annotated[QuizService, Depends(get_read_quiz_service)],
+    state: QuizState | None = None,
 ) -> list[QuizRead]:
-    quizzes = await service.list_quizzes(plan_id, current_user.id)
+    quizzes = await service.list_quizzes(plan_id, current_user.id, state)
     return [QuizRead.model_validate(q) for q in quizzes]
 
 
@@ -1,20 +1,26 @@
 from typing import Annotated
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.responses import Response, StreamingResponse
 
+from app.core.compression import encoded_response, negotiate_encoding
 from app.core.dependencies import (
     CurrentUser,
     CurrentUserOptional,
     get_gemini_service,
     get_progress_service,
+    get_read_study_plan_service,
+    get_read_user_service,
+    get_streaming_study_plan_service,
     get_study_plan_service,
-    get_user_service,
 )
+from app.core.streaming import stream_json, stream_ndjson
 from app.domain.schemas.progress import StudyPlanProgressRead
 from app.domain.schemas.study_plan import (
     StudyPlanCreate,
     StudyPlanGenerateRequest,
+    StudyPlanImportResult,
     StudyPlanProposal,
     StudyPlanRead,
     StudyPlanReadDetail,
@@ -78,15 +84,65 @@ async def generate_study_plan(
     return proposal
 
 
+@router.post(
+    "/import",
+    response_model=StudyPlanImportResult,
+    status_code=status.HTTP_201_CREATED,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/x-ndjson": {"schema": {"type": "string"}}},
+        }
+    },
+)
+async def import_study_plans(
+    request: Request,
+    current_user: CurrentUser,
+    service: Annotated[StudyPlanService, Depends(get_study_plan_service)],
+) -> StudyPlanImportResult:
+    """
+    Create plans for the current user from an NDJSON body, one plan (as in
+    `POST /`, without `user_id`) per line. Plans are committed in chunks: on an
+    invalid line the error names it, and the plans before it stay imported.
+    """
+    imported = await service.import_study_plans(current_user.id, request.stream())
+    return StudyPlanImportResult(imported=imported)
+
+
 @router.get("/{plan_id}", response_model=StudyPlanReadDetailWithProgress)
 async def get_study_plan(
     plan_id: UUID,
-    service: Annotated[StudyPlanService, Depends(get_study_plan_service)],
+    service: Annotated[StudyPlanService, Depends(get_read_study_plan_service)],
+    # Only used, and so only opening the write transaction, for signed-in
+    # users, whose progress is created or caught up on the first view
     progress_service: Annotated[ProgressService, Depends(get_progress_service)],
     current_user: CurrentUserOptional,
-) -> StudyPlanReadDetailWithProgress:
-    plan = await service.get_study_plan_detailed(plan_id)
-    if not plan or not plan.active:
+    stream: bool = Query(
+        False,
+        description="Encode the tree from the loaded rows while sending it, "
+        "bypassing the cache; for very large plans",
+    ),
+    accept_encoding: Annotated[str | None, Header()] = None,
+) -> StudyPlanReadDetailWithProgress | Response:
+    if not stream and not current_user:
+        # Without progress the body is the same for everyone, so it is cached
+        # already compressed
+        body = await service.get_study_plan_tree_body(
+            plan_id, negotiate_encoding(accept_encoding)
+        )
+        if body is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Study plan not found"
+            )
+        return encoded_response(body)
+
+    if stream:
+        plan = await service.get_study_plan_detailed(plan_id)
+        found = plan is not None and plan.active
+    else:
+        detail = await service.get_study_plan_tree(plan_id)
+        found = detail is not None
+    if not found:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Study plan not found"
         )
@@ -98,7 +154,11 @@ async def get_study_plan(
         )
         progress = StudyPlanProgressRead.model_validate(progress)
 
-    detail = StudyPlanReadDetail.model_validate(plan)
+    if stream:
+        return StreamingResponse(
+            stream_json(StudyPlanReadDetailWithProgress, plan, progress=progress),
+            media_type="application/json",
+        )
     return StudyPlanReadDetailWithProgress(**detail.model_dump(), progress=progress)
 
 
@@ -146,8 +206,8 @@ async def fork_study_plan(
 @router.get("/user/{user_id}", response_model=list[StudyPlanRead])
 async def list_user_study_plans(
     user_id: UUID,
-    service: Annotated[StudyPlanService, Depends(get_study_plan_service)],
-    user_service: Annotated[UserService, Depends(get_user_service)],
+    service: Annotated[StudyPlanService, Depends(get_read_study_plan_service)],
+    user_service: Annotated[UserService, Depends(get_read_user_service)],
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
 ) -> list[StudyPlanRead]:
@@ -160,6 +220,29 @@ async def list_user_study_plans(
     return [StudyPlanRead.model_validate(item) for item in items]
 
 
+@router.get("/user/{user_id}/export", response_class=StreamingResponse)
+async def export_user_study_plans(
+    user_id: UUID,
+    service: Annotated[StudyPlanService, Depends(get_streaming_study_plan_service)],
+    user_service: Annotated[UserService, Depends(get_read_user_service)],
+) -> StreamingResponse:
+    """
+    A user's active plans as NDJSON, one plan per line, in the format
+    accepted by `POST /import`. Streamed, so memory use does not grow with
+    the number of plans.
+    """
+    user = await user_service.get_by_id(user_id)
+    if not user or not user.active:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+        )
+
+    return StreamingResponse(
+        stream_ndjson(StudyPlanProposal, service.export_study_plans(user.id)),
+        media_type="application/x-ndjson",
+    )
+
+
 @router.delete("/{plan_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_study_plan(
     plan_id: UUID,
@@ -0,0 +1,307 @@
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Protocol
+
+from pydantic import TypeAdapter
+
+from app.core.config import get_settings
+from app.core.metrics import CACHE_REQUESTS
+
+
+class CacheBackend(Protocol):
+    """
+    Shared tier of the cache, reachable from every worker (e.g. Redis).
+    Values are opaque bytes; expiry is handled by the backend.
+    """
+
+    async def get(self, key: str) -> bytes | None: ...
+
+    async def set(self, key: str, value: bytes, ttl_seconds: float) -> None: ...
+
+    async def delete(self, key: str) -> None: ...
+
+    async def incr(self, key: str) -> int: ...
+
+
+class LocalCache:
+    """
+    In-process LRU with a TTL per entry. Stores Python objects as they are,
+    so callers must not mutate what they get back.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl_seconds: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+
+class InMemoryCacheBackend:
+    """
+    `CacheBackend` kept in process memory. Stands in for the shared tier in
+    tests and single-worker setups; several `Cache` instances sharing one
+    behave like workers sharing a Redis.
+    """
+
+    def __init__(self, max_entries: int = 10_000) -> None:
+        self._store = LocalCache(max_entries)
+        self._counters: dict[str, int] = {}
+
+    async def get(self, key: str) -> bytes | None:
+        if key in self._counters:
+            return str(self._counters[key]).encode()
+        return self._store.get(key)
+
+    async def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        self._store.set(key, value, ttl_seconds)
+
+    async def delete(self, key: str) -> None:
+        self._store.delete(key)
+
+    async def incr(self, key: str) -> int:
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+
+class RedisCacheBackend:
+    def __init__(self, url: str) -> None:
+        try:
+            from redis import asyncio as redis
+        except ImportError as e:
+            raise RuntimeError(
+                "CACHE_URL is set but redis is not installed, install the `redis` extra"
+            ) from e
+        self._client = redis.from_url(url)
+
+    async def get(self, key: str) -> bytes | None:
+        return await self._client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        await self._client.set(key, value, px=max(1, int(ttl_seconds * 1000)))
+
+    async def delete(self, key: str) -> None:
+        await self._client.delete(key)
+
+    async def incr(self, key: str) -> int:
+        return await self._client.incr(key)
+
+
+@dataclass
+class CacheStats:
+    local_hits: int = 0
+    shared_hits: int = 0
+    misses: int = 0
+    loads: int = 0
+    # Callers that waited on a load already running for the same key
+    coalesced: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        hits = self.local_hits + self.shared_hits
+        total = hits + self.misses
+        return hits / total if total else 0.0
+
+
+class CacheNamespace[T]:
+    """
+    Cached values of one kind. Keys are prefixed with the namespace and its
+    version, so `invalidate_all` drops every entry, on every worker, by
+    bumping the version instead of deleting keys one by one.
+    """
+
+    def __init__(
+        self, cache: "Cache", name: str, model: type[T], ttl_seconds: float
+    ) -> None:
+        self.cache = cache
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.stats = CacheStats()
+        self._local_hits = CACHE_REQUESTS.labels(namespace=name, result="local_hit")
+        self._shared_hits = CACHE_REQUESTS.labels(namespace=name, result="shared_hit")
+        self._misses = CACHE_REQUESTS.labels(namespace=name, result="miss")
+        self._adapter = TypeAdapter(model)
+        self._version_key = f"{cache.prefix}:{name}:version"
+        self._local_version = 0
+        self._inflight: dict[str, asyncio.Future[T | None]] = {}
+
+    @property
+    def _local_ttl(self) -> float:
+        # Without a shared tier the local copy is the only one, otherwise it
+        # is only trusted briefly because other workers may invalidate it
+        if self.cache.shared is None:
+            return self.ttl_seconds
+        return min(self.ttl_seconds, self.cache.local_ttl_seconds)
+
+    async def _version(self) -> int:
+        shared = self.cache.shared
+        if shared is None:
+            return self._local_version
+        version = self.cache.local.get(self._version_key)
+        if version is None:
+            raw = await shared.get(self._version_key)
+            version = int(raw) if raw is not None else 0
+            self.cache.local.set(self._version_key, version, self._local_ttl)
+        return version
+
+    async def _key(self, key: str) -> str:
+        return f"{self.cache.prefix}:{self.name}:v{await self._version()}:{key}"
+
+    async def _get(self, full_key: str) -> T | None:
+        value = self.cache.local.get(full_key)
+        if value is not None:
+            self.stats.local_hits += 1
+            self._local_hits.inc()
+            return value
+
+        if self.cache.shared is not None:
+            raw = await self.cache.shared.get(full_key)
+            if raw is not None:
+                self.stats.shared_hits += 1
+                self._shared_hits.inc()
+                value = self._adapter.validate_json(raw)
+                self.cache.local.set(full_key, value, self._local_ttl)
+                return value
+
+        self.stats.misses += 1
+        self._misses.inc()
+        return None
+
+    async def _set(self, full_key: str, value: T) -> None:
+        self.cache.local.set(full_key, value, self._local_ttl)
+        if self.cache.shared is not None:
+            await self.cache.shared.set(
+                full_key, self._adapter.dump_json(value), self.ttl_seconds
+            )
+
+    async def get(self, key: str) -> T | None:
+        return await self._get(await self._key(key))
+
+    async def set(self, key: str, value: T) -> None:
+        await self._set(await self._key(key), value)
+
+    async def get_or_load(
+        self, key: str, loader: Callable[[], Awaitable[T | None]]
+    ) -> T | None:
+        """
+        Return the cached value or load and cache it. Concurrent misses for the
+        same key in this process share a single `loader` call. None results
+        are not cached.
+        """
+        full_key = await self._key(key)
+        value = await self._get(full_key)
+        if value is not None:
+            return value
+
+        inflight = self._inflight.get(full_key)
+        if inflight is not None:
+            self.stats.coalesced += 1
+            return await asyncio.shield(inflight)
+
+        future: asyncio.Future[T | None] = asyncio.get_running_loop().create_future()
+        self._inflight[full_key] = future
+        try:
+            self.stats.loads += 1
+            value = await loader()
+            if value is not None:
+                await self._set(full_key, value)
+            future.set_result(value)
+            return value
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting
+            future.exception()
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            del self._inflight[full_key]
+
+    async def invalidate(self, key: str) -> None:
+        self.stats.invalidations += 1
+        full_key = await self._key(key)
+        self.cache.local.delete(full_key)
+        if self.cache.shared is not None:
+            await self.cache.shared.delete(full_key)
+
+    async def invalidate_all(self) -> None:
+        self.stats.invalidations += 1
+        if self.cache.shared is None:
+            self._local_version += 1
+            return
+        version = await self.cache.shared.incr(self._version_key)
+        self.cache.local.set(self._version_key, version, self._local_ttl)
+
+
+class Cache:
+    """
+    Two-tier cache: an in-process `LocalCache` in front of an optional shared
+    `CacheBackend`. Features get their own `CacheNamespace` from `namespace`.
+    """
+
+    def __init__(
+        self,
+        local: LocalCache,
+        shared: CacheBackend | None = None,
+        prefix: str = "cache",
+        local_ttl_seconds: float = 5.0,
+    ) -> None:
+        self.local = local
+        self.shared = shared
+        self.prefix = prefix
+        self.local_ttl_seconds = local_ttl_seconds
+        self._namespaces: dict[str, CacheNamespace[Any]] = {}
+
+    def namespace[T](
+        self, name: str, model: type[T], ttl_seconds: float | None = None
+    ) -> CacheNamespace[T]:
+        namespace = self._namespaces.get(name)
+        if namespace is None:
+            namespace = CacheNamespace(
+                self,
+                name,
+                model,
+                ttl_seconds or get_settings().CACHE_DEFAULT_TTL_SECONDS,
+            )
+            self._namespaces[name] = namespace
+        return namespace
+
+    def stats(self) -> dict[str, CacheStats]:
+        return {name: ns.stats for name, ns in self._namespaces.items()}
+
+
+@lru_cache
+def get_cache() -> Cache:
+    settings = get_settings()
+    return Cache(
+        LocalCache(settings.CACHE_LOCAL_MAX_ENTRIES),
+        RedisCacheBackend(settings.CACHE_URL) if settings.CACHE_URL else None,
+        prefix=settings.CACHE_KEY_PREFIX,
+        local_ttl_seconds=settings.CACHE_LOCAL_TTL_SECONDS,
+    )
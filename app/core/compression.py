@@ -0,0 +1,320 @@
+"""
+Response compression: gzip, and brotli when the `brotli` extra is installed,
+negotiated from `Accept-Encoding`.
+"""
+
+import asyncio
+import gzip
+import time
+import zlib
+from collections.abc import Callable
+from functools import lru_cache
+
+from pydantic import BaseModel, ConfigDict
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import get_settings
+from app.core.metrics import HTTP_RESPONSE_COMPRESSION, HTTP_RESPONSE_COMPRESSION_BYTES
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional, install the `brotli` extra
+    brotli = None
+
+BROTLI = "br"
+GZIP = "gzip"
+IDENTITY = "identity"
+
+_COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "image/svg+xml",
+)
+
+
+def supported_encodings() -> tuple[str, ...]:
+    """Encodings this process can produce, in order of preference."""
+    return (BROTLI, GZIP) if brotli is not None else (GZIP,)
+
+
+def negotiate_encoding(accept_encoding: str | None) -> str:
+    """
+    The preferred of `supported_encodings` among those `accept_encoding`
+    accepts with the highest q-value, or `IDENTITY`.
+    """
+    if not accept_encoding:
+        return IDENTITY
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, *params = (part.strip() for part in item.split(";"))
+        weight = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        if coding:
+            weights[coding.lower()] = weight
+
+    best, best_weight = IDENTITY, 0.0
+    for encoding in supported_encodings():
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def compress(body: bytes, encoding: str, level: int | None = None) -> bytes:
+    """
+    `body` in `encoding` at `level` (gzip level or brotli quality), by default
+    the on-the-fly level from the settings.
+    """
+    settings = get_settings()
+    if encoding == GZIP:
+        level = settings.COMPRESSION_GZIP_LEVEL if level is None else level
+        # No timestamp, so equal bodies compress to equal bytes
+        return gzip.compress(body, compresslevel=level, mtime=0)
+    if encoding == BROTLI and brotli is not None:
+        level = settings.COMPRESSION_BROTLI_QUALITY if level is None else level
+        return brotli.compress(body, quality=level)
+    if encoding == IDENTITY:
+        return body
+    raise ValueError(f"Unsupported encoding {encoding!r}")
+
+
+class StreamCompressor:
+    """
+    Compresses a body sent in several chunks. Each `compress` call returns
+    everything its chunk produced, so the client can decode it on arrival.
+    """
+
+    def __init__(self, encoding: str, level: int | None = None) -> None:
+        settings = get_settings()
+        self._gzip = None
+        self._brotli = None
+        if encoding == GZIP:
+            level = settings.COMPRESSION_GZIP_LEVEL if level is None else level
+            self._gzip = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        elif encoding == BROTLI and brotli is not None:
+            level = settings.COMPRESSION_BROTLI_QUALITY if level is None else level
+            self._brotli = brotli.Compressor(quality=level)
+        else:
+            raise ValueError(f"Unsupported encoding {encoding!r}")
+
+    def compress(self, chunk: bytes) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.process(chunk) + self._brotli.flush()
+        return self._gzip.compress(chunk) + self._gzip.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.finish()
+        return self._gzip.flush(zlib.Z_FINISH)
+
+
+class EncodedBody(BaseModel):
+    """A response body and the encoding it is in, for caching."""
+
+    # Base64 in the shared cache tier, which stores JSON
+    model_config = ConfigDict(ser_json_bytes="base64", val_json_bytes="base64")
+
+    content: bytes
+    encoding: str
+
+
+async def encode_body(body: bytes, encoding: str) -> EncodedBody:
+    """
+    `body` compressed for caching: once per cache entry, so at the higher
+    `COMPRESSION_CACHED_*` levels and in a worker thread, off the event loop.
+    Bodies under `COMPRESSION_MIN_SIZE_BYTES` stay as they are.
+    """
+    settings = get_settings()
+    if encoding == IDENTITY or len(body) < settings.COMPRESSION_MIN_SIZE_BYTES:
+        return EncodedBody(content=body, encoding=IDENTITY)
+    level = (
+        settings.COMPRESSION_CACHED_BROTLI_QUALITY
+        if encoding == BROTLI
+        else settings.COMPRESSION_CACHED_GZIP_LEVEL
+    )
+    content = await asyncio.to_thread(compress, body, encoding, level)
+    return EncodedBody(content=content, encoding=encoding)
+
+
+def encoded_response(
+    body: EncodedBody, media_type: str = "application/json"
+) -> Response:
+    """A response sending `body` as it is, never compressed again on the way out."""
+    headers = {"Vary": "Accept-Encoding"}
+    if body.encoding != IDENTITY:
+        headers["Content-Encoding"] = body.encoding
+    return Response(body.content, media_type=media_type, headers=headers)
+
+
+class CompressionBudget:
+    """
+    Token bucket of CPU seconds for on-the-fly compression: refilled at
+    `cpu_fraction` seconds per second, holding at most `burst_seconds` of
+    refill. A `cpu_fraction` of 0 never runs out.
+    """
+
+    def __init__(self, cpu_fraction: float, burst_seconds: float = 1.0) -> None:
+        self.cpu_fraction = cpu_fraction
+        self.capacity = cpu_fraction * burst_seconds
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def available(self) -> bool:
+        if self.cpu_fraction <= 0:
+            return True
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.cpu_fraction
+        )
+        self._updated = now
+        return self._tokens > 0
+
+    def spend(self, seconds: float) -> None:
+        if self.cpu_fraction > 0:
+            self._tokens -= seconds
+
+
+@lru_cache
+def get_compression_budget() -> CompressionBudget:
+    return CompressionBudget(get_settings().COMPRESSION_CPU_BUDGET)
+
+
+def is_compressible(content_type: str) -> bool:
+    media_type = content_type.partition(";")[0].strip().lower()
+    return (
+        media_type.startswith("text/")
+        or media_type.endswith("+json")
+        or media_type in _COMPRESSIBLE_TYPES
+    )
+
+
+class _CompressingSend:
+    """`send` of one response, compressing its body on the way out."""
+
+    def __init__(
+        self, send: Send, encoding: str, minimum_size: int, budget: CompressionBudget
+    ) -> None:
+        self.send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.budget = budget
+        # Response start held back until the first body chunk tells its size
+        self.pending: Message | None = None
+        self.compressor: StreamCompressor | None = None
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            await self.start(message)
+        elif message["type"] != "http.response.body":
+            await self.send(message)
+        elif self.compressor is not None:
+            await self.next_body(message)
+        elif self.pending is not None:
+            await self.first_body(message)
+        else:
+            await self.send(message)
+
+    def run(self, step: Callable[[bytes], bytes], data: bytes) -> bytes:
+        started = time.thread_time()
+        compressed = step(data)
+        self.budget.spend(time.thread_time() - started)
+        HTTP_RESPONSE_COMPRESSION_BYTES.labels(stage="before").inc(len(data))
+        HTTP_RESPONSE_COMPRESSION_BYTES.labels(stage="after").inc(len(compressed))
+        return compressed
+
+    async def start(self, message: Message) -> None:
+        headers = Headers(raw=message["headers"])
+        if not is_compressible(headers.get("content-type", "")):
+            await self.send(message)
+            return
+        if "accept-encoding" not in headers.get("vary", "").lower():
+            MutableHeaders(scope=message).add_vary_header("Accept-Encoding")
+        if "content-encoding" in headers:
+            HTTP_RESPONSE_COMPRESSION.labels(result="precompressed").inc()
+            await self.send(message)
+        elif self.encoding == IDENTITY:
+            HTTP_RESPONSE_COMPRESSION.labels(result=IDENTITY).inc()
+            await self.send(message)
+        else:
+            self.pending = message
+
+    async def first_body(self, message: Message) -> None:
+        start, self.pending = self.pending, None
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if not more_body and len(body) < self.minimum_size:
+            skipped = "below_minimum"
+        elif not self.budget.available():
+            skipped = "over_budget"
+        else:
+            skipped = None
+        if skipped is not None:
+            HTTP_RESPONSE_COMPRESSION.labels(result=skipped).inc()
+            await self.send(start)
+            await self.send(message)
+            return
+
+        HTTP_RESPONSE_COMPRESSION.labels(result=self.encoding).inc()
+        headers = MutableHeaders(scope=start)
+        headers["Content-Encoding"] = self.encoding
+        if more_body:
+            del headers["Content-Length"]
+            self.compressor = StreamCompressor(self.encoding)
+            body = self.run(self.compressor.compress, body)
+        else:
+            body = self.run(lambda data: compress(data, self.encoding), body)
+            headers["Content-Length"] = str(len(body))
+        await self.send(start)
+        await self.send({**message, "body": body})
+
+    async def next_body(self, message: Message) -> None:
+        compressor = self.compressor
+        body = self.run(compressor.compress, message.get("body", b""))
+        if not message.get("more_body", False):
+            body += self.run(lambda _: compressor.finish(), b"")
+        await self.send({**message, "body": body})
+
+
+class CompressionMiddleware:
+    """
+    Compresses text and JSON responses in the encoding the client prefers.
+    Bodies under `COMPRESSION_MIN_SIZE_BYTES` and every response started
+    while the worker's `CompressionBudget` is spent go out uncompressed.
+    Streamed bodies are compressed chunk by chunk. Responses that already
+    have a `Content-Encoding` (precompressed cache entries) pass through.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int | None = None,
+        budget: CompressionBudget | None = None,
+    ) -> None:
+        self.app = app
+        self.minimum_size = (
+            get_settings().COMPRESSION_MIN_SIZE_BYTES
+            if minimum_size is None
+            else minimum_size
+        )
+        self.budget = budget or get_compression_budget()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"))
+        await self.app(
+            scope,
+            receive,
+            _CompressingSend(send, encoding, self.minimum_size, self.budget),
+        )
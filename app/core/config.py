@@ -7,6 +7,18 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 class Settings(BaseSettings):
     # Bussiness Logic
     STUDY_PLAN_MAX_DEPTH: int = 5
+    # NDJSON import commits every this many plans; export loads plan trees in
+    # batches of this size
+    STUDY_PLAN_IMPORT_CHUNK_SIZE: int = 200
+    # Longest NDJSON import line, in bytes, so one line cannot fill the memory
+    STUDY_PLAN_IMPORT_MAX_LINE_BYTES: int = 1024 * 1024
+    STUDY_PLAN_EXPORT_BATCH_SIZE: int = 100
+
+    # Background jobs (an interval of 0 disables the job)
+    QUIZ_EXPIRY_SWEEP_INTERVAL_SECONDS: int = 60
+    QUIZ_EXPIRY_SWEEP_BATCH_SIZE: int = 100
+    REFRESH_TOKEN_PURGE_INTERVAL_SECONDS: int = 3600
+    REFRESH_TOKEN_PURGE_BATCH_SIZE: int = 500
 
     # Application
     APP_NAME: str = "Study Tool API"
@@ -21,20 +33,85 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = "sqlite+aiosqlite:///./app.db"
     DATABASE_TEST_URL: str = "sqlite+aiosqlite:///./test.db"
+    # Replica used by read-only endpoints. Unset, SQLite opens the primary file
+    # through a separate read-only pool and other backends reuse the primary.
+    DATABASE_READ_URL: str | None = None
+    # After a write, the same client reads from the primary for this long so
+    # it sees its own changes despite replica lag
+    READ_YOUR_WRITES_SECONDS: int = 5
     DB_ECHO: bool = False
+    # Connection pool (ignored by SQLite, which uses one connection per session)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_SECONDS: int = 30
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # asyncpg prepared statement cache per connection (0 disables it, needed
+    # behind pgbouncer in transaction pooling mode)
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    # How long a SQLite write waits for the single write lock before failing
+    # with "database is locked"
+    DB_SQLITE_BUSY_TIMEOUT_SECONDS: float = 30.0
     RESET_DB_ON_STARTUP: bool = False
+    # Statements slower than this are logged with their route (0 disables)
+    DB_SLOW_QUERY_MS: int = 500
+
+    # Cache
+    # Shared tier (e.g. redis://localhost:6379/0); unset keeps the cache local
+    CACHE_URL: str | None = None
+    CACHE_KEY_PREFIX: str = "study-tool"
+    CACHE_DEFAULT_TTL_SECONDS: int = 300
+    CACHE_LOCAL_MAX_ENTRIES: int = 10_000
+    # With a shared tier, local copies are trusted this long since other
+    # workers may have invalidated them
+    CACHE_LOCAL_TTL_SECONDS: int = 5
+
+    # Response compression
+    # Smaller bodies are sent as they are, compressing them saves too little
+    COMPRESSION_MIN_SIZE_BYTES: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    # Fraction of a CPU core each worker may spend compressing responses on
+    # the fly; past it responses go out uncompressed (0 removes the limit)
+    COMPRESSION_CPU_BUDGET: float = 0.25
+    # Cached bodies are compressed once per cache entry, so harder
+    COMPRESSION_CACHED_GZIP_LEVEL: int = 9
+    COMPRESSION_CACHED_BROTLI_QUALITY: int = 9
 
     # Logging
     LOG_LEVEL: Literal["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"] = "INFO"
 
     # Security
     SECRET_KEY: str = "changethis"
+    # Key id written to the JWT header of new tokens
+    SECRET_KEY_ID: str = "default"
+    # Retired signing keys by key id, still accepted while their tokens live
+    PREVIOUS_SECRET_KEYS: dict[str, str] = {}
     ALGORITHM: str = "HS256"
+    # Threads running Argon2 hash/verify off the event loop
+    PASSWORD_HASH_WORKERS: int = 4
+    ACCESS_TOKEN_CACHE_SIZE: int = 10_000
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # Revoked tokens are kept this long so reuse can still be detected
+    REFRESH_TOKEN_REVOKED_RETENTION_HOURS: int = 24
 
     # AI
     GEMINI_API_KEY: str | None = None
+    GEMINI_TIMEOUT_SECONDS: float = 120.0
+
+    # Metrics
+    METRICS_ENABLED: bool = True
+    # Bearer token scrapers must send to GET /metrics. Unset, the endpoint is
+    # open outside production and not served in production.
+    METRICS_TOKEN: str | None = None
+    # How often event loop lag is sampled (0 disables sampling)
+    EVENT_LOOP_LAG_SAMPLE_INTERVAL_SECONDS: float = 1.0
+    # Log and count callbacks holding the event loop longer than the threshold,
+    # with the stack and route that caused them. With the test suite, fails
+    # tests whose requests block that long.
+    LOOP_WATCHDOG_ENABLED: bool = False
+    LOOP_WATCHDOG_THRESHOLD_MS: int = 100
 
     model_config = SettingsConfigDict(
         env_file=".env", env_file_encoding="utf-8", case_sensitive=True, extra="ignore"
@@ -1,19 +1,163 @@
-from collections.abc import AsyncGenerator
+import time
+from collections.abc import AsyncGenerator, AsyncIterator
+from contextlib import asynccontextmanager
+from http.cookies import SimpleCookie
+from typing import Any
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import ORMExecuteState, Session
+from sqlalchemy.pool import NullPool
 from sqlmodel import SQLModel
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.core.config import get_settings
+from app.core.instrumentation import instrument_engine
 
 settings = get_settings()
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DB_ECHO,
-    future=True,
-    connect_args=(
-        {"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
-    ),
+# Cookie holding the time until which a client that wrote reads the primary
+READ_PRIMARY_COOKIE = "read_primary_until"
+# Session.info key marking sessions that flushed or executed DML
+_WROTE = "wrote"
+# Execution option marking connections that are only used to read
+READ_ONLY_OPTION = "read_only"
+
+
+def get_engine_options(url: str) -> dict[str, Any]:
+    """
+    Engine keyword arguments for the backend behind `url`.
+
+    SQLite runs in-process, so it only needs to be shareable across threads
+    and to queue writers behind the write lock long enough.
+    PostgreSQL gets a sized, pre-pinged pool and the asyncpg statement cache.
+    """
+    backend = make_url(url).get_backend_name()
+    if backend == "sqlite":
+        return {
+            "connect_args": {
+                "check_same_thread": False,
+                "timeout": settings.DB_SQLITE_BUSY_TIMEOUT_SECONDS,
+            }
+        }
+    if backend == "postgresql":
+        return {
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+            "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+            "pool_pre_ping": settings.DB_POOL_PRE_PING,
+            "connect_args": {
+                "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+                "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            },
+        }
+    return {}
+
+
+def _is_sqlite_file(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database not in (
+        None,
+        "",
+        ":memory:",
+    )
+
+
+def _enable_wal(engine: AsyncEngine) -> None:
+    # WAL lets the read-only pool read while a write transaction is open
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_journal_mode(dbapi_connection, _connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.close()
+
+
+def _enable_savepoints(engine: AsyncEngine) -> None:
+    # The sqlite3 driver manages BEGIN itself and breaks SAVEPOINT; let
+    # SQLAlchemy emit BEGIN instead
+    @event.listens_for(engine.sync_engine, "connect")
+    def _disable_driver_transactions(dbapi_connection, _connection_record) -> None:
+        dbapi_connection.isolation_level = None
+
+    # IMMEDIATE takes the write lock up front. A deferred transaction that
+    # reads first and then writes fails with "database is locked" when
+    # another writer got in between, instead of waiting for it. Read-only
+    # sessions stay deferred so they never queue behind writers.
+    @event.listens_for(engine.sync_engine, "begin")
+    def _begin(connection) -> None:
+        if connection.get_execution_options().get(READ_ONLY_OPTION):
+            connection.exec_driver_sql("BEGIN")
+        else:
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def create_engine(url: str, echo: bool = False, name: str = "primary") -> AsyncEngine:
+    options = get_engine_options(url)
+    if _is_sqlite_file(url):
+        # A request holding the write lock may open a second connection for
+        # its reads; with a bounded pool, requests queued on the lock can hold
+        # every connection and deadlock it. Opening a file is cheap.
+        options["poolclass"] = NullPool
+    engine = create_async_engine(url, echo=echo, future=True, **options)
+    instrument_engine(engine, name)
+    if make_url(url).get_backend_name() == "sqlite":
+        _enable_savepoints(engine)
+    if _is_sqlite_file(url):
+        _enable_wal(engine)
+    return engine
+
+
+def create_read_engine(
+    url: str, read_url: str | None = None, echo: bool = False
+) -> AsyncEngine | None:
+    """
+    Engine for read-only sessions: the replica when `read_url` is set, a
+    read-only pool over the same file for SQLite, otherwise None (reads share
+    the primary engine).
+    """
+    if read_url:
+        return create_engine(read_url, echo=echo, name="read")
+    if not _is_sqlite_file(url):
+        return None
+    parsed = make_url(url)
+    read_only_url = parsed.set(
+        database=f"file:{parsed.database}",
+        query={**parsed.query, "mode": "ro", "uri": "true"},
+    )
+    read_only_engine = create_async_engine(
+        read_only_url, echo=echo, future=True, **get_engine_options(url)
+    )
+    instrument_engine(read_only_engine, "read")
+    return read_only_engine
+
+
+engine = create_engine(settings.DATABASE_URL, echo=settings.DB_ECHO)
+read_engine = (
+    create_read_engine(
+        settings.DATABASE_URL, settings.DATABASE_READ_URL, echo=settings.DB_ECHO
+    )
+    or engine
+)
+
+async_session_factory = async_sessionmaker(engine, expire_on_commit=False)
+read_session_factory = async_sessionmaker(
+    read_engine, expire_on_commit=False, autoflush=False
+)
+# Reads of clients that just wrote; a request may hold the write lock of the
+# primary through its other session, so these must not ask for it
+primary_read_session_factory = async_sessionmaker(
+    engine.execution_options(**{READ_ONLY_OPTION: True}),
+    expire_on_commit=False,
+    autoflush=False,
 )
 
 
@@ -25,7 +169,96 @@ async def init_db():
         await conn.run_sync(SQLModel.metadata.create_all)
 
 
-async def get_session() -> AsyncGenerator[AsyncSession, None]:
-    async_session = async_sessionmaker(engine, expire_on_commit=False)
-    async with async_session() as session:
+def reads_primary(request: Request) -> bool:
+    until = request.cookies.get(READ_PRIMARY_COOKIE)
+    try:
+        return until is not None and float(until) > time.time()
+    except ValueError:
+        return False
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_flushed(session: Session, _flush_context) -> None:
+    session.info[_WROTE] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_dml(state: ORMExecuteState) -> None:
+    if state.is_insert or state.is_update or state.is_delete:
+        state.session.info[_WROTE] = True
+
+
+async def get_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    async with unit_of_work() as session:
         yield session
+    # Reached only once the writes are committed
+    if session.info.get(_WROTE) and settings.READ_YOUR_WRITES_SECONDS:
+        # Pin the client's next reads to the primary until replicas caught
+        # up, see `ReadYourWritesMiddleware`
+        request.state.read_primary_until = (
+            time.time() + settings.READ_YOUR_WRITES_SECONDS
+        )
+
+
+@asynccontextmanager
+async def unit_of_work(
+    session_factory: async_sessionmaker[AsyncSession] | None = None,
+) -> AsyncIterator[AsyncSession]:
+    """
+    Session for one unit of work: repositories only flush, and everything is
+    committed once when the block exits, or rolled back if it raises.
+    """
+    async with (session_factory or async_session_factory)() as session:
+        try:
+            yield session
+        except BaseException:
+            await session.rollback()
+            raise
+        await session.commit()
+
+
+async def get_read_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    factory = (
+        primary_read_session_factory if reads_primary(request) else read_session_factory
+    )
+    async with factory() as session:
+        yield session
+
+
+class ReadYourWritesMiddleware:
+    """
+    Sets the cookie pinning a client's reads to the primary after a request
+    of it committed writes. `get_session` only commits once the response
+    headers of the endpoint were gathered, so the cookie is added as the
+    response starts.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                until = scope.get("state", {}).get("read_primary_until")
+                if until is not None:
+                    MutableHeaders(scope=message).append(
+                        "set-cookie", _read_primary_cookie(until)
+                    )
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
+
+
+def _read_primary_cookie(until: float) -> str:
+    cookie: SimpleCookie = SimpleCookie()
+    cookie[READ_PRIMARY_COOKIE] = str(until)
+    morsel = cookie[READ_PRIMARY_COOKIE]
+    morsel["max-age"] = settings.READ_YOUR_WRITES_SECONDS
+    morsel["path"] = "/"
+    morsel["httponly"] = True
+    morsel["samesite"] = "lax"
+    return morsel.OutputString()
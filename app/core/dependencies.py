@@ -2,14 +2,17 @@ from typing import Annotated
 from uuid import UUID
 
 import jwt
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Response, status
 from fastapi.security import OAuth2PasswordBearer
 from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import Cache, get_cache
 from app.core.config import get_settings
-from app.core.database import get_session
+from app.core.database import get_read_session, get_session
+from app.core.security import access_token_verifier
 from app.domain.schemas.token import TokenPayload
+from app.domain.services.analytics import AnalyticsService
 from app.domain.services.auth import AuthService
 from app.domain.services.gemini import GeminiService
 from app.domain.services.progress import ProgressService
@@ -17,6 +20,7 @@ from app.domain.services.quiz import QuizService
 from app.domain.services.study_plan import StudyPlanService
 from app.domain.services.user import UserService
 from app.persistence.model.user import User
+from app.persistence.repository.analytics import AnalyticsRepository
 from app.persistence.repository.progress import ProgressRepository
 from app.persistence.repository.quiz import QuizRepository
 from app.persistence.repository.section import SectionRepository
@@ -24,7 +28,14 @@ from app.persistence.repository.study_plan import StudyPlanRepository
 from app.persistence.repository.token import RefreshTokenRepository
 from app.persistence.repository.user import UserRepository
 
-SessionDep = Annotated[AsyncSession, Depends(get_session)]
+# Function scope: the request's transaction is committed when the endpoint
+# returns, before the response is sent
+SessionDep = Annotated[AsyncSession, Depends(get_session, scope="function")]
+# Read-only endpoints: served by the replica unless the client just wrote
+ReadSessionDep = Annotated[AsyncSession, Depends(get_read_session, scope="function")]
+# Streaming responses read after the endpoint returns, so their session is
+# only closed once the response has been sent
+StreamingReadSessionDep = Annotated[AsyncSession, Depends(get_read_session)]
 settings = get_settings()
 
 reusable_oauth2 = OAuth2PasswordBearer(
@@ -63,6 +74,33 @@ def get_quiz_repository(session: SessionDep) -> QuizRepository:
     return QuizRepository(session)
 
 
+def get_analytics_repository(session: SessionDep) -> AnalyticsRepository:
+    return AnalyticsRepository(session)
+
+
+# --- Read-only repositories ---
+def get_read_user_repository(session: ReadSessionDep) -> UserRepository:
+    return UserRepository(session)
+
+
+def get_read_study_plan_repository(session: ReadSessionDep) -> StudyPlanRepository:
+    return StudyPlanRepository(session)
+
+
+def get_read_quiz_repository(session: ReadSessionDep) -> QuizRepository:
+    return QuizRepository(session)
+
+
+def get_read_analytics_repository(session: ReadSessionDep) -> AnalyticsRepository:
+    return AnalyticsRepository(session)
+
+
+def get_streaming_study_plan_repository(
+    session: StreamingReadSessionDep,
+) -> StudyPlanRepository:
+    return StudyPlanRepository(session)
+
+
 # --- Services ---
 def get_gemini_service() -> GeminiService:
     return GeminiService()
@@ -75,7 +113,10 @@ def get_user_service(
 
 
 def get_auth_service(
-    user_repo: Annotated[UserRepository, Depends(get_user_repository)],
+    # Users are only looked up, through the read session: on SQLite a login
+    # then takes the write lock for the refresh token alone, not while the
+    # password is being verified
+    user_repo: Annotated[UserRepository, Depends(get_read_user_repository)],
     token_repo: Annotated[
         RefreshTokenRepository, Depends(get_refresh_token_repository)
     ],
@@ -85,45 +126,101 @@ def get_auth_service(
 
 def get_study_plan_service(
     repo: Annotated[StudyPlanRepository, Depends(get_study_plan_repository)],
+    cache: Annotated[Cache, Depends(get_cache)],
 ) -> StudyPlanService:
-    return StudyPlanService(repo)
+    return StudyPlanService(repo, cache)
+
+
+def get_analytics_service(
+    repo: Annotated[AnalyticsRepository, Depends(get_analytics_repository)],
+) -> AnalyticsService:
+    return AnalyticsService(repo)
 
 
 def get_progress_service(
     progress_repo: Annotated[ProgressRepository, Depends(get_progress_repository)],
     study_plan_repo: Annotated[StudyPlanRepository, Depends(get_study_plan_repository)],
     section_repo: Annotated[SectionRepository, Depends(get_section_repository)],
+    analytics_service: Annotated[AnalyticsService, Depends(get_analytics_service)],
 ) -> ProgressService:
-    return ProgressService(progress_repo, study_plan_repo, section_repo)
+    return ProgressService(
+        progress_repo, study_plan_repo, section_repo, analytics_service
+    )
 
 
 def get_quiz_service(
     quiz_repo: Annotated[QuizRepository, Depends(get_quiz_repository)],
     study_plan_repo: Annotated[StudyPlanRepository, Depends(get_study_plan_repository)],
     gemini_service: Annotated[GeminiService, Depends(get_gemini_service)],
+    analytics_service: Annotated[AnalyticsService, Depends(get_analytics_service)],
+) -> QuizService:
+    return QuizService(quiz_repo, study_plan_repo, gemini_service, analytics_service)
+
+
+# --- Read-only services ---
+def get_read_user_service(
+    repo: Annotated[UserRepository, Depends(get_read_user_repository)],
+) -> UserService:
+    return UserService(repo)
+
+
+def get_read_study_plan_service(
+    repo: Annotated[StudyPlanRepository, Depends(get_read_study_plan_repository)],
+    cache: Annotated[Cache, Depends(get_cache)],
+) -> StudyPlanService:
+    return StudyPlanService(repo, cache)
+
+
+def get_streaming_study_plan_service(
+    repo: Annotated[StudyPlanRepository, Depends(get_streaming_study_plan_repository)],
+) -> StudyPlanService:
+    return StudyPlanService(repo)
+
+
+def get_read_quiz_service(
+    quiz_repo: Annotated[QuizRepository, Depends(get_read_quiz_repository)],
+    study_plan_repo: Annotated[
+        StudyPlanRepository, Depends(get_read_study_plan_repository)
+    ],
+    gemini_service: Annotated[GeminiService, Depends(get_gemini_service)],
 ) -> QuizService:
     return QuizService(quiz_repo, study_plan_repo, gemini_service)
 
 
+def get_read_analytics_service(
+    repo: Annotated[AnalyticsRepository, Depends(get_read_analytics_repository)],
+) -> AnalyticsService:
+    return AnalyticsService(repo)
+
+
 # --- Auth & User ---
-async def _get_token_payload(token: str) -> TokenPayload:
+async def _get_token_payload(token: str, response: Response) -> TokenPayload:
+    stats = access_token_verifier.stats
+    seconds_before = stats.seconds
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        return TokenPayload(**payload)
+        return access_token_verifier.verify(token)
     except (jwt.InvalidTokenError, ValidationError):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         ) from None
+    finally:
+        # Timings tell clients how the server works, so like the `X-DB-*`
+        # headers they are only sent outside production
+        if settings.ENVIRONMENT != "production":
+            elapsed_ms = (stats.seconds - seconds_before) * 1000
+            response.headers.append("Server-Timing", f"jwt;dur={elapsed_ms:.3f}")
 
 
+# The current user is looked up through the read session: on SQLite the write
+# session takes the write lock with its first statement, which only the
+# endpoints that write should do
 async def get_current_user(
     token: Annotated[str, Depends(reusable_oauth2)],
-    user_service: Annotated[UserService, Depends(get_user_service)],
+    user_service: Annotated[UserService, Depends(get_read_user_service)],
+    response: Response,
 ) -> User:
-    token_data = await _get_token_payload(token)
+    token_data = await _get_token_payload(token, response)
 
     if token_data.sub is None:
         raise HTTPException(
@@ -141,12 +238,13 @@ async def get_current_user(
 
 async def get_current_user_optional(
     token: Annotated[str | None, Depends(reusable_oauth2_optional)],
-    user_service: Annotated[UserService, Depends(get_user_service)],
+    user_service: Annotated[UserService, Depends(get_read_user_service)],
+    response: Response,
 ) -> User | None:
     if not token:
         return None
     try:
-        token_data = await _get_token_payload(token)
+        token_data = await _get_token_payload(token, response)
     except HTTPException:
         return None
 
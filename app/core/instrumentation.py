@@ -0,0 +1,179 @@
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from logging import getLogger
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import get_settings
+from app.core.metrics import (
+    DB_POOL_CONNECTIONS,
+    DB_QUERIES_PER_REQUEST,
+    DB_TIME_PER_REQUEST,
+    route_template,
+)
+
+logger = getLogger("app.core.instrumentation")
+
+QUERY_COUNT_HEADER = "X-DB-Query-Count"
+QUERY_TIME_HEADER = "X-DB-Time-Ms"
+SLOWEST_QUERY_HEADER = "X-DB-Slowest-Ms"
+
+# Driver-dependent and not what N+1s are made of, so not counted
+_TRANSACTION_CONTROL = ("BEGIN", "COMMIT", "ROLLBACK", "SAVEPOINT", "RELEASE")
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    total_seconds: float = 0.0
+    slowest_seconds: float = 0.0
+    slowest_statement: str | None = None
+    # Only filled when tracking with `record_statements=True`
+    statements: list[str] | None = field(default=None, repr=False)
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        if seconds >= self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_statement = statement
+        if self.statements is not None:
+            self.statements.append(statement)
+
+
+# Every tracker active in the current context, outermost first
+_trackers: ContextVar[tuple[QueryStats, ...]] = ContextVar("query_trackers", default=())
+
+
+@contextmanager
+def track_queries(record_statements: bool = False) -> Iterator[QueryStats]:
+    """
+    Attribute the statements executed in this context (including tasks it
+    starts) to the yielded `QueryStats`. Trackers nest: an inner block also
+    counts towards the outer ones.
+    """
+    stats = QueryStats(statements=[] if record_statements else None)
+    token = _trackers.set((*_trackers.get(), stats))
+    try:
+        yield stats
+    finally:
+        _trackers.reset(token)
+
+
+def _before_cursor_execute(conn, _cursor, _statement, _parameters, _context, _many):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, _cursor, statement, _parameters, _context, _many):
+    elapsed = time.perf_counter() - conn.info["query_started_at"].pop()
+    if statement.lstrip().upper().startswith(_TRANSACTION_CONTROL):
+        return
+    for stats in _trackers.get():
+        stats.record(statement, elapsed)
+
+
+def _handle_error(exception_context) -> None:
+    # after_cursor_execute does not run for failed statements
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_started_at"):
+        conn.info["query_started_at"].pop()
+
+
+def _instrument_pool(engine: AsyncEngine, name: str) -> None:
+    open_connections = DB_POOL_CONNECTIONS.labels(engine=name, state="open")
+    checked_out = DB_POOL_CONNECTIONS.labels(engine=name, state="checked_out")
+    pool = engine.sync_engine.pool
+
+    event.listen(pool, "connect", lambda *_: open_connections.inc())
+    event.listen(pool, "close", lambda *_: open_connections.dec())
+    # Detached connections leave the pool without a close event from it
+    event.listen(pool, "detach", lambda *_: open_connections.dec())
+    event.listen(pool, "checkout", lambda *_: checked_out.inc())
+    event.listen(pool, "checkin", lambda *_: checked_out.dec())
+
+
+def instrument_engine(engine: AsyncEngine, name: str = "primary") -> None:
+    """
+    Attribute the engine's statements to the active `track_queries` blocks
+    and report its pool usage under `name`.
+    """
+    sync_engine = engine.sync_engine
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+    _instrument_pool(engine, name)
+
+
+class QueryStatsMiddleware:
+    """
+    Tracks the SQL statements of each HTTP request. Outside production the
+    count, total and slowest statement time are sent as `X-DB-*` headers; in
+    every environment they are recorded in the per-route histograms, and
+    statements slower than `DB_SLOW_QUERY_MS` are logged.
+
+    Headers are written when the response starts, so statements run while a
+    streaming body is sent only show up in the metrics.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        settings = get_settings()
+        self.expose_headers = settings.ENVIRONMENT != "production"
+        self.slow_query_seconds = settings.DB_SLOW_QUERY_MS / 1000
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+
+            async def send_with_stats(message: Message) -> None:
+                if message["type"] == "http.response.start" and self.expose_headers:
+                    message["headers"] = [
+                        *message.get("headers", []),
+                        *self._headers(stats),
+                    ]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_stats)
+            finally:
+                self._observe(scope, stats)
+
+    def _headers(self, stats: QueryStats) -> list[tuple[bytes, bytes]]:
+        return [
+            (QUERY_COUNT_HEADER.lower().encode(), str(stats.count).encode()),
+            (
+                QUERY_TIME_HEADER.lower().encode(),
+                f"{stats.total_seconds * 1000:.2f}".encode(),
+            ),
+            (
+                SLOWEST_QUERY_HEADER.lower().encode(),
+                f"{stats.slowest_seconds * 1000:.2f}".encode(),
+            ),
+        ]
+
+    def _observe(self, scope: Scope, stats: QueryStats) -> None:
+        labels: dict[str, Any] = {
+            "method": scope["method"],
+            "route": route_template(scope),
+        }
+        DB_QUERIES_PER_REQUEST.labels(**labels).observe(stats.count)
+        DB_TIME_PER_REQUEST.labels(**labels).observe(stats.total_seconds)
+        if self.slow_query_seconds and stats.slowest_seconds > self.slow_query_seconds:
+            logger.warning(
+                "Slow query (%.0f ms) in %s %s: %s",
+                stats.slowest_seconds * 1000,
+                labels["method"],
+                labels["route"],
+                stats.slowest_statement,
+            )
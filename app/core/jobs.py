@@ -0,0 +1,79 @@
+import asyncio
+from logging import getLogger
+
+from app.core.config import get_settings
+from app.core.database import unit_of_work
+from app.core.metrics import EVENT_LOOP_LAG
+from app.core.tasks import PeriodicTask
+from app.domain.services.analytics import AnalyticsService
+from app.domain.services.auth import AuthService
+from app.domain.services.gemini import GeminiService
+from app.domain.services.quiz import QuizService
+from app.persistence.repository.analytics import AnalyticsRepository
+from app.persistence.repository.quiz import QuizRepository
+from app.persistence.repository.study_plan import StudyPlanRepository
+from app.persistence.repository.token import RefreshTokenRepository
+from app.persistence.repository.user import UserRepository
+
+logger = getLogger("app.core.jobs")
+
+
+async def close_expired_quizzes() -> int:
+    settings = get_settings()
+    async with unit_of_work() as session:
+        service = QuizService(
+            QuizRepository(session),
+            StudyPlanRepository(session),
+            GeminiService(),
+            AnalyticsService(AnalyticsRepository(session)),
+        )
+        closed = await service.close_expired_quizzes(
+            settings.QUIZ_EXPIRY_SWEEP_BATCH_SIZE
+        )
+    if closed:
+        logger.info("Closed %d expired quizzes", closed)
+    return closed
+
+
+async def purge_stale_refresh_tokens() -> int:
+    settings = get_settings()
+    async with unit_of_work() as session:
+        service = AuthService(UserRepository(session), RefreshTokenRepository(session))
+        purged = await service.purge_stale_tokens(
+            settings.REFRESH_TOKEN_PURGE_BATCH_SIZE
+        )
+    if purged:
+        logger.info("Purged %d stale refresh tokens", purged)
+    return purged
+
+
+async def sample_event_loop_lag() -> float:
+    # Resuming after a bare yield waits for every callback already queued, so
+    # the delay is how far behind the loop is
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    await asyncio.sleep(0)
+    lag = loop.time() - started
+    EVENT_LOOP_LAG.observe(lag)
+    return lag
+
+
+def get_periodic_tasks() -> list[PeriodicTask]:
+    settings = get_settings()
+    return [
+        PeriodicTask(
+            "quiz-expiry-sweeper",
+            settings.QUIZ_EXPIRY_SWEEP_INTERVAL_SECONDS,
+            close_expired_quizzes,
+        ),
+        PeriodicTask(
+            "refresh-token-purge",
+            settings.REFRESH_TOKEN_PURGE_INTERVAL_SECONDS,
+            purge_stale_refresh_tokens,
+        ),
+        PeriodicTask(
+            "event-loop-lag",
+            settings.EVENT_LOOP_LAG_SAMPLE_INTERVAL_SECONDS,
+            sample_event_loop_lag,
+        ),
+    ]
@@ -0,0 +1,171 @@
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Every metric of the app is defined here. With several worker processes,
+# start them with PROMETHEUS_MULTIPROC_DIR pointing at an empty directory:
+# each process then writes its samples to files there and /metrics merges
+# them, whichever worker serves the scrape.
+
+_LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time to handle a request, by route template",
+    ["method", "route", "status"],
+    buckets=_LATENCY_BUCKETS,
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Requests being handled",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request",
+    "SQL statements executed while handling a request",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144),
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "db_time_per_request_seconds",
+    "Time spent executing SQL statements while handling a request",
+    ["method", "route"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections",
+    "Connections held by the pool (open) and lent to sessions (checked_out)",
+    ["engine", "state"],
+    multiprocess_mode="livesum",
+)
+
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "Delay before a task that yielded to the event loop runs again",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+EVENT_LOOP_BLOCK_DURATION = Histogram(
+    "event_loop_block_duration_seconds",
+    "Callbacks that held the event loop past LOOP_WATCHDOG_THRESHOLD_MS, by route",
+    ["route"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+GEMINI_REQUEST_DURATION = Histogram(
+    "gemini_request_duration_seconds",
+    "Gemini generate_content calls, by outcome (ok, error, timeout)",
+    ["outcome"],
+    buckets=(0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0),
+)
+
+PASSWORD_HASH_QUEUE_DEPTH = Gauge(
+    "password_hash_queue_depth",
+    "Argon2 hash and verify calls waiting for a worker thread",
+    multiprocess_mode="livesum",
+)
+PASSWORD_HASH_DURATION = Histogram(
+    "password_hash_duration_seconds",
+    "Argon2 hash and verify calls, from submission to result",
+    ["operation"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+CACHE_REQUESTS = Counter(
+    "cache_requests",
+    "Cache lookups by namespace and result (local_hit, shared_hit, miss)",
+    ["namespace", "result"],
+)
+
+
+HTTP_RESPONSE_COMPRESSION = Counter(
+    "http_response_compression",
+    "Compressible responses by outcome (gzip, br, identity, below_minimum, "
+    "over_budget, precompressed)",
+    ["result"],
+)
+HTTP_RESPONSE_COMPRESSION_BYTES = Counter(
+    "http_response_compression_bytes",
+    "Bytes of responses compressed by the middleware, before and after",
+    ["stage"],
+)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """
+    The exposition text and its content type, merged across worker processes
+    in multiprocess mode.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def route_template(scope: Scope) -> str:
+    # Templates keep the label set bounded, unlike raw paths with ids in them
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class HttpMetricsMiddleware:
+    """
+    Records the latency of each HTTP request under its route template, and
+    the number of requests in flight.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method=method)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            HTTP_REQUEST_DURATION.labels(
+                method=method, route=route_template(scope), status=str(status)
+            ).observe(time.perf_counter() - started)
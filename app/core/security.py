@@ -1,3 +1,11 @@
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
 from typing import Any
 
@@ -6,6 +14,12 @@ from argon2 import PasswordHasher
 from argon2.exceptions import VerifyMismatchError
 
 from app.core.config import get_settings
+from app.core.metrics import (
+    CACHE_REQUESTS,
+    PASSWORD_HASH_DURATION,
+    PASSWORD_HASH_QUEUE_DEPTH,
+)
+from app.domain.schemas.token import TokenPayload
 
 ph = PasswordHasher()
 
@@ -27,6 +41,58 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         return False
 
 
+class PasswordHashPool:
+    """
+    Runs Argon2 on a bounded set of worker threads instead of the event loop.
+    argon2-cffi releases the GIL while hashing, so other requests keep being
+    served meanwhile; calls beyond `max_workers` queue up.
+    """
+
+    def __init__(self, max_workers: int):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="argon2"
+        )
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(
+            "verify", verify_password, plain_password, hashed_password
+        )
+
+    async def _run[T](self, operation: str, fn: Callable[..., T], *args: str) -> T:
+        # Leaves the queue once, either when a worker picks it up or when the
+        # caller gives up waiting
+        lock = threading.Lock()
+        queued = True
+
+        def dequeue() -> None:
+            nonlocal queued
+            with lock:
+                if queued:
+                    queued = False
+                    PASSWORD_HASH_QUEUE_DEPTH.dec()
+
+        def run() -> T:
+            dequeue()
+            return fn(*args)
+
+        PASSWORD_HASH_QUEUE_DEPTH.inc()
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, run)
+        finally:
+            dequeue()
+            PASSWORD_HASH_DURATION.labels(operation=operation).observe(
+                time.perf_counter() - started
+            )
+
+
+password_hash_pool = PasswordHashPool(get_settings().PASSWORD_HASH_WORKERS)
+
+
 def create_access_token(
     subject: str | Any, expires_delta: timedelta | None = None
 ) -> str:
@@ -39,11 +105,110 @@ def create_access_token(
         )
     to_encode = {"exp": expire, "sub": str(subject)}
     encoded_jwt = jwt.encode(
-        to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
+        to_encode,
+        settings.SECRET_KEY,
+        algorithm=settings.ALGORITHM,
+        headers={"kid": settings.SECRET_KEY_ID},
     )
     return encoded_jwt
 
 
+@dataclass
+class VerificationStats:
+    verifications: int = 0
+    cache_hits: int = 0
+    seconds: float = 0.0
+
+
+@dataclass(frozen=True)
+class _VerifiedToken:
+    payload: TokenPayload
+    expires_at: float
+    kid: str | None
+    signing_key: str
+
+
+class AccessTokenVerifier:
+    """
+    Verifies access tokens and keeps a bounded LRU of verified payloads keyed
+    by token digest, so a token presented repeatedly is only decoded once.
+    Cached entries are dropped as soon as the token's `exp` has passed, or
+    once the key they were verified with is no longer configured for their
+    `kid`.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.stats = VerificationStats()
+        self._hits = CACHE_REQUESTS.labels(namespace="access_token", result="local_hit")
+        self._misses = CACHE_REQUESTS.labels(namespace="access_token", result="miss")
+        self._cache: OrderedDict[bytes, _VerifiedToken] = OrderedDict()
+
+    def verify(self, token: str) -> TokenPayload:
+        """
+        Raises `jwt.InvalidTokenError` or `pydantic.ValidationError` when the
+        token cannot be trusted.
+        """
+        started = time.perf_counter()
+        try:
+            return self._verify(token)
+        finally:
+            self.stats.verifications += 1
+            self.stats.seconds += time.perf_counter() - started
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def _verify(self, token: str) -> TokenPayload:
+        key = hashlib.sha256(token.encode()).digest()
+        cached = self._cache.get(key)
+        if cached is not None:
+            if cached.expires_at <= time.time():
+                del self._cache[key]
+                raise jwt.ExpiredSignatureError("Signature has expired")
+            # A key retired or replaced since is no longer trusted
+            if _get_verification_key(cached.kid) != cached.signing_key:
+                del self._cache[key]
+                raise jwt.InvalidTokenError(f"Unknown signing key id: {cached.kid}")
+            self._cache.move_to_end(key)
+            self.stats.cache_hits += 1
+            self._hits.inc()
+            return cached.payload
+
+        self._misses.inc()
+
+        settings = get_settings()
+        kid = jwt.get_unverified_header(token).get("kid")
+        signing_key = _get_verification_key(kid)
+        if signing_key is None:
+            raise jwt.InvalidTokenError(f"Unknown signing key id: {kid}")
+        claims = jwt.decode(
+            token,
+            signing_key,
+            algorithms=[settings.ALGORITHM],
+            options={"require": ["exp"]},
+        )
+        payload = TokenPayload(**claims)
+
+        self._cache[key] = _VerifiedToken(
+            payload, float(claims["exp"]), kid, signing_key
+        )
+        if len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return payload
+
+
+def _get_verification_key(kid: str | None) -> str | None:
+    settings = get_settings()
+    # Tokens issued before key ids were introduced carry no `kid`
+    if kid is None or kid == settings.SECRET_KEY_ID:
+        return settings.SECRET_KEY
+    return settings.PREVIOUS_SECRET_KEYS.get(kid)
+
+
+access_token_verifier = AccessTokenVerifier(get_settings().ACCESS_TOKEN_CACHE_SIZE)
+
+
 def create_refresh_token() -> str:
     """
     Generates a random refresh token string.
@@ -51,3 +216,10 @@ def create_refresh_token() -> str:
     import secrets
 
     return secrets.token_urlsafe(32)
+
+
+def hash_refresh_token(token: str) -> bytes:
+    """
+    Fixed-size digest under which a refresh token is stored and looked up.
+    """
+    return hashlib.sha256(token.encode()).digest()
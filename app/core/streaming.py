@@ -0,0 +1,140 @@
+"""
+Incremental JSON encoding of Pydantic response models, for bodies too large to
+build in memory as one model and one blob first.
+"""
+
+import json
+import types
+from collections.abc import AsyncIterable, AsyncIterator, Iterator
+from functools import lru_cache
+from typing import Any, TypedDict, Union, get_args, get_origin
+
+from pydantic import BaseModel, TypeAdapter
+
+# Pieces are gathered into chunks of about this size before being sent
+STREAM_CHUNK_BYTES = 64 * 1024
+
+_LIST = "list"
+_MODEL = "model"
+_VALUES = "values"
+
+
+def _nested_model(annotation: Any) -> type[BaseModel] | None:
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    return None
+
+
+def _nested_kind(annotation: Any) -> tuple[str, type[BaseModel]] | None:
+    origin, args = get_origin(annotation), get_args(annotation)
+    if origin is list and _nested_model(args[0]):
+        return _LIST, args[0]
+    if origin in (Union, types.UnionType):
+        args = tuple(arg for arg in args if arg is not type(None))
+        if len(args) == 1 and _nested_model(args[0]):
+            return _MODEL, args[0]
+    if _nested_model(annotation):
+        return _MODEL, annotation
+    return None
+
+
+@lru_cache
+def _parts(model: type[BaseModel]) -> list[tuple[str, Any, Any]]:
+    """
+    How to encode the fields of `model`, in order: lists of models and
+    (optional) models as (kind, name, model), encoded recursively, and each
+    run of other fields as (kind, names, adapter), encoded in one call through
+    a `TypeAdapter` of a TypedDict of those fields.
+    """
+    parts: list[tuple[str, Any, Any]] = []
+    run: dict[str, Any] = {}
+
+    def close_run() -> None:
+        if run:
+            # Fields only known at runtime, hence the functional syntax
+            values = TypedDict(f"{model.__name__}Values", dict(run))  # type: ignore[misc]  # noqa: UP013
+            parts.append((_VALUES, tuple(run), TypeAdapter(values)))
+            run.clear()
+
+    for name, field in model.model_fields.items():
+        nested = _nested_kind(field.annotation)
+        if nested is None:
+            run[name] = field.annotation
+            continue
+        close_run()
+        kind, nested_model = nested
+        parts.append((kind, name, nested_model))
+    close_run()
+    return parts
+
+
+def iter_model_json(model: type[BaseModel], obj: Any, **values: Any) -> Iterator[bytes]:
+    """
+    Encode `obj` as `model.model_validate(obj).model_dump_json()` would, piece
+    by piece, reading the fields off `obj` (ORM rows or models). Lists of
+    nested models are encoded item by item as they are reached instead of
+    being validated up front. `values` replace top-level attributes of `obj`.
+    """
+
+    def get(name: str) -> Any:
+        return values[name] if name in values else getattr(obj, name)
+
+    separator = b"{"
+    for kind, target, adapter in _parts(model):
+        if kind == _VALUES:
+            encoded = adapter.dump_json({name: get(name) for name in target})
+            # '{"a":1,"b":2}' without its braces
+            yield separator + encoded[1:-1]
+            separator = b","
+            continue
+        yield separator + json.dumps(target).encode() + b":"
+        separator = b","
+        value = get(target)
+        if kind == _LIST:
+            item_separator = b"["
+            for item in value:
+                yield item_separator
+                item_separator = b","
+                yield from iter_model_json(adapter, item)
+            yield b"[]" if item_separator == b"[" else b"]"
+        elif value is not None:
+            yield from iter_model_json(adapter, value)
+        else:
+            yield b"null"
+    yield b"{}" if separator == b"{" else b"}"
+
+
+async def stream_json(
+    model: type[BaseModel], obj: Any, **values: Any
+) -> AsyncIterator[bytes]:
+    """
+    `iter_model_json` in chunks of about `STREAM_CHUNK_BYTES`, for a
+    `StreamingResponse`.
+    """
+    chunk = bytearray()
+    for piece in iter_model_json(model, obj, **values):
+        chunk += piece
+        if len(chunk) >= STREAM_CHUNK_BYTES:
+            yield bytes(chunk)
+            chunk.clear()
+    if chunk:
+        yield bytes(chunk)
+
+
+async def stream_ndjson(
+    model: type[BaseModel], objs: AsyncIterable[Any]
+) -> AsyncIterator[bytes]:
+    """
+    One `model` JSON document per line for each of `objs`, in chunks of about
+    `STREAM_CHUNK_BYTES`.
+    """
+    chunk = bytearray()
+    async for obj in objs:
+        for piece in iter_model_json(model, obj):
+            chunk += piece
+        chunk += b"\n"
+        if len(chunk) >= STREAM_CHUNK_BYTES:
+            yield bytes(chunk)
+            chunk.clear()
+    if chunk:
+        yield bytes(chunk)
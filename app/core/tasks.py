@@ -0,0 +1,46 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from logging import getLogger
+from typing import Any
+
+logger = getLogger("app.core.tasks")
+
+
+class PeriodicTask:
+    """
+    Runs an async job every `interval_seconds` on the event loop until stopped.
+    Failures are logged and the job is retried on the next tick.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        interval_seconds: float,
+        job: Callable[[], Awaitable[Any]],
+    ):
+        self.name = name
+        self.interval_seconds = interval_seconds
+        self.job = job
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        if self._task is None and self.interval_seconds > 0:
+            self._task = asyncio.create_task(self._run(), name=self.name)
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.job()
+            except Exception:
+                logger.exception("Periodic task %s failed", self.name)
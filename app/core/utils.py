@@ -0,0 +1,59 @@
+from collections.abc import AsyncIterable, AsyncIterator
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+_DEFAULT_PORTS = {"http": ":80", "https": ":443"}
+
+
+class LineTooLongError(ValueError):
+    def __init__(self, line_number: int, max_bytes: int):
+        super().__init__(f"Line {line_number} is longer than {max_bytes} bytes")
+        self.line_number = line_number
+
+
+async def iter_ndjson_lines(
+    chunks: AsyncIterable[bytes], max_line_bytes: int
+) -> AsyncIterator[tuple[int, bytes]]:
+    """
+    Split a byte stream into newline-delimited lines as it arrives, yielding
+    (line number, line). Blank lines are skipped but still counted. Each byte
+    is copied once; a line longer than `max_line_bytes` raises
+    `LineTooLongError` as soon as that much of it has arrived.
+    """
+    pending = bytearray()
+    number = 0
+    async for chunk in chunks:
+        start = 0
+        while (end := chunk.find(b"\n", start)) != -1:
+            pending += chunk[start:end]
+            start = end + 1
+            number += 1
+            if len(pending) > max_line_bytes:
+                raise LineTooLongError(number, max_line_bytes)
+            if pending.strip():
+                yield number, bytes(pending)
+            pending.clear()
+        pending += chunk[start:]
+        if len(pending) > max_line_bytes:
+            raise LineTooLongError(number + 1, max_line_bytes)
+    if pending.strip():
+        yield number + 1, bytes(pending)
+
+
+def canonical_url(url: str) -> str:
+    """
+    `url` with the differences that do not change what it points to removed:
+    scheme and host are lowercased, the default port, fragment, trailing slash
+    and `utm_*` tracking parameters dropped, and query parameters sorted.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    default_port = _DEFAULT_PORTS.get(scheme)
+    if default_port and netloc.endswith(default_port):
+        netloc = netloc.removesuffix(default_port)
+    query = sorted(
+        (name, value)
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not name.lower().startswith("utm_")
+    )
+    return urlunsplit((scheme, netloc, parts.path.rstrip("/"), urlencode(query), ""))
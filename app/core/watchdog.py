@@ -0,0 +1,186 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+from logging import getLogger
+from types import FrameType
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import get_settings
+from app.core.metrics import EVENT_LOOP_BLOCK_DURATION, route_template
+
+logger = getLogger("app.core.watchdog")
+
+
+@dataclass
+class LoopBlock:
+    # Route template of the request whose task blocked, None outside requests
+    route: str | None
+    duration_seconds: float
+    # Stack of the event loop thread while it was blocked
+    stack: str
+
+
+class LoopWatchdog:
+    """
+    Detects callbacks that hold the event loop longer than `threshold_seconds`.
+
+    A heartbeat task on the loop records when it last ran; a thread checks it
+    and, once it is late, captures what the loop thread is executing. That
+    stack is matched against the requests in flight (see `track`) to name the
+    route. The block is logged and counted when the loop gets going again.
+    """
+
+    def __init__(self, threshold_seconds: float, max_blocks: int = 100) -> None:
+        self.threshold_seconds = threshold_seconds
+        self.blocks: deque[LoopBlock] = deque(maxlen=max_blocks)
+        # Heartbeat period, fine enough to notice blocks a bit over threshold
+        self._interval = threshold_seconds / 4
+        self._beat = time.monotonic()
+        self._requests: dict[FrameType, Scope] = {}
+        self._heartbeat: asyncio.Task[None] | None = None
+        self._thread: threading.Thread | None = None
+        self._stopping = threading.Event()
+        self._loop_thread_id = 0
+
+    @property
+    def running(self) -> bool:
+        return self._heartbeat is not None
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stopping.clear()
+        self._heartbeat = asyncio.create_task(self._run_heartbeat(), name="watchdog")
+        self._thread = threading.Thread(
+            target=self._watch, name="loop-watchdog", daemon=True
+        )
+        self._thread.start()
+
+    async def stop(self) -> None:
+        if self._heartbeat is None or self._thread is None:
+            return
+        self._stopping.set()
+        self._heartbeat.cancel()
+        try:
+            await self._heartbeat
+        except asyncio.CancelledError:
+            pass
+        self._thread.join()
+        self._heartbeat = None
+        self._thread = None
+
+    def drain(self) -> list[LoopBlock]:
+        blocks = list(self.blocks)
+        self.blocks.clear()
+        return blocks
+
+    def track(self, scope: Scope) -> FrameType | None:
+        """
+        Attribute blocks of the current task to the request `scope` until
+        `untrack` is called with the returned handle.
+        """
+        task = asyncio.current_task()
+        frame = getattr(task.get_coro(), "cr_frame", None) if task else None
+        if self.running and frame is not None:
+            self._requests[frame] = scope
+            return frame
+        return None
+
+    def untrack(self, frame: FrameType | None) -> None:
+        if frame is not None:
+            self._requests.pop(frame, None)
+
+    async def _run_heartbeat(self) -> None:
+        while True:
+            self._beat = time.monotonic()
+            await asyncio.sleep(self._interval)
+
+    def _watch(self) -> None:
+        blocked_since: float | None = None
+        pending: LoopBlock | None = None
+        while not self._stopping.wait(self._interval):
+            beat = self._beat
+            if pending is not None:
+                if beat != blocked_since:
+                    # Running again; the heartbeat was due `_interval` after
+                    # its last beat, everything beyond that was the block
+                    pending.duration_seconds = max(
+                        pending.duration_seconds, beat - blocked_since - self._interval
+                    )
+                    self._record(pending)
+                    pending = None
+                continue
+
+            lag = time.monotonic() - beat - self._interval
+            if lag > self.threshold_seconds:
+                blocked_since = beat
+                pending = self._capture(lag)
+
+        if pending is not None:
+            self._record(pending)
+
+    def _capture(self, lag: float) -> LoopBlock | None:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return None
+        stack = "".join(traceback.format_stack(frame))
+
+        # The blocking task's coroutine is one of the frames on the stack
+        requests = self._requests.copy()
+        route = None
+        while frame is not None:
+            scope = requests.get(frame)
+            if scope is not None:
+                route = route_template(scope)
+                break
+            frame = frame.f_back
+        return LoopBlock(route=route, duration_seconds=lag, stack=stack)
+
+    def _record(self, block: LoopBlock | None) -> None:
+        if block is None:
+            return
+        self.blocks.append(block)
+        EVENT_LOOP_BLOCK_DURATION.labels(route=block.route or "none").observe(
+            block.duration_seconds
+        )
+        logger.warning(
+            "Event loop blocked for %.0f ms in %s, stack while blocked:\n%s",
+            block.duration_seconds * 1000,
+            block.route or "no request",
+            block.stack,
+        )
+
+
+class LoopWatchdogMiddleware:
+    """
+    Lets the watchdog attribute blocks to the route of the request that
+    caused them. Does nothing while the watchdog is not running.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        watchdog = get_loop_watchdog()
+        if scope["type"] != "http" or not watchdog.running:
+            await self.app(scope, receive, send)
+            return
+
+        handle = watchdog.track(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            watchdog.untrack(handle)
+
+
+@lru_cache
+def get_loop_watchdog() -> LoopWatchdog:
+    return LoopWatchdog(get_settings().LOOP_WATCHDOG_THRESHOLD_MS / 1000)
@@ -16,3 +16,10 @@ class ResourceType(StrEnum):
     DOCUMENTATION = "documentation"
     REPOSITORY = "repository"
     PAPER = "paper"
+
+
+class QuizState(StrEnum):
+    NOT_STARTED = "not_started"
+    ACTIVE = "active"
+    EXPIRED = "expired"
+    COMPLETED = "completed"
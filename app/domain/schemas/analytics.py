@@ -0,0 +1,30 @@
+from datetime import date
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict
+
+
+class ActivityTotals(BaseModel):
+    resources_completed: int
+    minutes_studied: int
+    quiz_attempts: int
+    mean_quiz_score: float | None = None
+
+
+class DailyActivityRead(ActivityTotals):
+    day: date
+    study_plan_id: UUID
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class PlanActivityRead(ActivityTotals):
+    study_plan_id: UUID
+
+
+class UserActivitySummary(BaseModel):
+    user_id: UUID
+    start: date
+    end: date
+    daily: list[DailyActivityRead] = []
+    plans: list[PlanActivityRead] = []
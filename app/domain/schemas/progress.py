@@ -44,6 +44,7 @@ class StudyPlanProgressRead(StudyPlanProgressBase):
     id: UUID
     study_plan_id: UUID
     user_id: UUID
+    plan_version: int = 1
     section_progresses: list[SectionProgressRead] = []
 
     model_config = ConfigDict(from_attributes=True)
@@ -68,6 +68,7 @@ class QuizCreate(QuizProposal):
 class QuizRead(QuizBase):
     id: UUID
     study_plan_id: UUID
+    plan_version: int = 1
     user_id: UUID
     started_at: datetime | None
     completed_at: datetime | None
@@ -1,7 +1,10 @@
+import hashlib
+import json
 from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict
 
+from app.core.utils import canonical_url
 from app.domain.enums import ResourceType
 
 
@@ -14,7 +17,21 @@ class ResourceBase(BaseModel):
 
 
 class ResourceCreate(ResourceBase):
-    pass
+    def fingerprint(self) -> str:
+        """
+        Identity of the resource across plans: resources with the same
+        fingerprint are stored once and linked from every plan and section
+        using them. URLs are compared in canonical form and titles ignoring
+        case and spacing.
+        """
+        key = [
+            self.type,
+            canonical_url(self.url) if self.url else None,
+            " ".join(self.title.split()).casefold(),
+            self.description,
+            self.duration_minutes,
+        ]
+        return hashlib.sha256(json.dumps(key).encode()).hexdigest()
 
 
 class ResourceUpsert(ResourceCreate):
@@ -34,6 +34,7 @@ class StudyPlanRead(StudyPlanBase):
     created_at: datetime
     updated_at: datetime
     forked_from_id: UUID | None = None
+    version: int = 1
     # Metadata only, no sections/resources
 
     model_config = ConfigDict(from_attributes=True)
@@ -53,3 +54,7 @@ class StudyPlanGenerateRequest(BaseModel):
     ignore_proposal: bool
     extra_instructions: str
     proposal: StudyPlanProposal
+
+
+class StudyPlanImportResult(BaseModel):
+    imported: int
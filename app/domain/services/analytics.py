@@ -0,0 +1,106 @@
+from datetime import UTC, date, datetime, timedelta
+from uuid import UUID
+
+from app.domain.enums import CompletionStatus
+from app.domain.schemas.analytics import (
+    DailyActivityRead,
+    PlanActivityRead,
+    UserActivitySummary,
+)
+from app.persistence.model.quiz import Quiz
+from app.persistence.repository.analytics import AnalyticsRepository
+
+
+def _day_of(moment: datetime | None) -> date:
+    if moment is None:
+        return datetime.now(UTC).date()
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(UTC)
+    return moment.date()
+
+
+class AnalyticsService:
+    def __init__(self, analytics_repo: AnalyticsRepository):
+        self.analytics_repo = analytics_repo
+
+    async def record_resource_status_change(
+        self,
+        user_id: UUID,
+        study_plan_id: UUID,
+        resource_id: UUID,
+        previous_status: CompletionStatus,
+        previous_completed_at: datetime | None,
+        new_status: CompletionStatus,
+    ) -> None:
+        was_completed = previous_status == CompletionStatus.COMPLETED
+        is_completed = new_status == CompletionStatus.COMPLETED
+        if was_completed == is_completed:
+            return
+
+        duration = await self.analytics_repo.get_resource_duration(resource_id) or 0
+        if is_completed:
+            await self.analytics_repo.increment_daily_activity(
+                user_id,
+                study_plan_id,
+                _day_of(None),
+                resources_completed=1,
+                minutes_studied=duration,
+            )
+        else:
+            # Undo the completion on the day it was originally counted
+            await self.analytics_repo.increment_daily_activity(
+                user_id,
+                study_plan_id,
+                _day_of(previous_completed_at),
+                resources_completed=-1,
+                minutes_studied=-duration,
+            )
+
+    async def record_quiz_submission(self, quiz: Quiz) -> None:
+        await self.analytics_repo.increment_daily_activity(
+            quiz.user_id,
+            quiz.study_plan_id,
+            _day_of(quiz.completed_at),
+            quiz_attempts=1,
+            quiz_score_total=quiz.score or 0.0,
+        )
+
+    async def get_user_summary(
+        self,
+        user_id: UUID,
+        start: date | None = None,
+        end: date | None = None,
+        study_plan_id: UUID | None = None,
+    ) -> UserActivitySummary:
+        end = end or datetime.now(UTC).date()
+        start = start or end - timedelta(days=30)
+
+        daily = await self.analytics_repo.get_daily_activity(
+            user_id, start, end, study_plan_id
+        )
+        totals = await self.analytics_repo.get_plan_totals(user_id, start, end)
+
+        plans = []
+        for row in totals:
+            if study_plan_id is not None and row["study_plan_id"] != study_plan_id:
+                continue
+            attempts = row["quiz_attempts"] or 0
+            plans.append(
+                PlanActivityRead(
+                    study_plan_id=row["study_plan_id"],
+                    resources_completed=row["resources_completed"] or 0,
+                    minutes_studied=row["minutes_studied"] or 0,
+                    quiz_attempts=attempts,
+                    mean_quiz_score=(
+                        row["quiz_score_total"] / attempts if attempts else None
+                    ),
+                )
+            )
+
+        return UserActivitySummary(
+            user_id=user_id,
+            start=start,
+            end=end,
+            daily=[DailyActivityRead.model_validate(d) for d in daily],
+            plans=plans,
+        )
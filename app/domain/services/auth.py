@@ -1,7 +1,12 @@
 from datetime import UTC, datetime, timedelta
 
 from app.core.config import get_settings
-from app.core.security import create_access_token, create_refresh_token, verify_password
+from app.core.security import (
+    create_access_token,
+    create_refresh_token,
+    hash_refresh_token,
+    password_hash_pool,
+)
 from app.domain.schemas.token import Token
 from app.persistence.model.token import RefreshToken
 from app.persistence.model.user import User
@@ -22,7 +27,7 @@ class AuthService:
         user = await self.user_repository.get_by_email(email)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        if not await password_hash_pool.verify(password, user.hashed_password):
             return None
         return user
 
@@ -42,7 +47,7 @@ class AuthService:
         )
 
         refresh_token = RefreshToken(
-            token=refresh_token_str,
+            token_hash=hash_refresh_token(refresh_token_str),
             expires_at=refresh_token_expires,
             user_id=user.id,
         )
@@ -62,9 +67,12 @@ class AuthService:
             return None
 
         if stored_token.revoked_at:
+            # Reuse of a rotated token: the revocation must stick even though
+            # the request fails
             await self.refresh_token_repository.revoke_all_for_user(
                 stored_token.user_id
             )
+            await self.refresh_token_repository.commit()
             return None
 
         expires_at = stored_token.expires_at
@@ -92,3 +100,24 @@ class AuthService:
             await self.refresh_token_repository.update(stored_token, stored_token)
             return True
         return False
+
+    async def purge_stale_tokens(self, batch_size: int = 500) -> int:
+        """
+        Delete expired refresh tokens, and revoked ones once they are past the
+        reuse-detection window, in batches. Returns the number of deleted rows.
+        """
+        settings = get_settings()
+        now = datetime.now(UTC)
+        revoked_before = now - timedelta(
+            hours=settings.REFRESH_TOKEN_REVOKED_RETENTION_HOURS
+        )
+
+        purged = 0
+        while True:
+            deleted = await self.refresh_token_repository.delete_stale_batch(
+                now, revoked_before, batch_size
+            )
+            await self.refresh_token_repository.commit()
+            purged += deleted
+            if deleted < batch_size:
+                return purged
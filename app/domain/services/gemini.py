@@ -1,11 +1,14 @@
 import json
+import time
 from logging import getLogger
 from typing import Any
 
+import httpx
 from google import genai
 from google.genai import types
 
 from app.core.config import get_settings
+from app.core.metrics import GEMINI_REQUEST_DURATION
 from app.domain.enums import ResourceType
 from app.domain.schemas.quiz import QuizProposal
 from app.domain.schemas.study_plan import StudyPlanProposal, StudyPlanReadDetail
@@ -13,21 +16,47 @@ from app.domain.schemas.study_plan import StudyPlanProposal, StudyPlanReadDetail
 
 class GeminiService:
     def __init__(self):
-        settings = get_settings()
-        self.client = genai.Client(api_key=settings.GEMINI_API_KEY)
+        self._client: genai.Client | None = None
         self.model = "gemini-2.5-flash"
         self.logger = getLogger("app.domain.services.gemini.GeminiService")
 
+    @property
+    def client(self) -> genai.Client:
+        # Created on first use so services that never call the model
+        # (e.g. background jobs) don't require an API key.
+        if self._client is None:
+            settings = get_settings()
+            self._client = genai.Client(
+                api_key=settings.GEMINI_API_KEY,
+                http_options=types.HttpOptions(
+                    timeout=int(settings.GEMINI_TIMEOUT_SECONDS * 1000)
+                ),
+            )
+        return self._client
+
     def generate_json(
         self, prompt: str, schema: dict[str, Any] | None = None
     ) -> str | None:
-        response = self.client.models.generate_content(
-            model=self.model,
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                response_mime_type="application/json", response_json_schema=schema
-            ),
-        )
+        started = time.perf_counter()
+        outcome = "ok"
+        try:
+            response = self.client.models.generate_content(
+                model=self.model,
+                contents=prompt,
+                config=types.GenerateContentConfig(
+                    response_mime_type="application/json", response_json_schema=schema
+                ),
+            )
+        except (TimeoutError, httpx.TimeoutException):
+            outcome = "timeout"
+            raise
+        except Exception:
+            outcome = "error"
+            raise
+        finally:
+            GEMINI_REQUEST_DURATION.labels(outcome=outcome).observe(
+                time.perf_counter() - started
+            )
         return response.text
 
     def generate_study_plan_proposal(
@@ -1,7 +1,10 @@
 from datetime import UTC, datetime
+from typing import Any
 from uuid import UUID
 
 from app.domain.enums import CompletionStatus
+from app.domain.exceptions.base import InvalidOperationException
+from app.domain.services.analytics import AnalyticsService
 from app.persistence.model.progress import (
     ResourceProgress,
     SectionProgress,
@@ -19,10 +22,25 @@ class ProgressService:
         progress_repo: ProgressRepository,
         study_plan_repo: StudyPlanRepository,
         section_repo: SectionRepository,
+        analytics_service: AnalyticsService | None = None,
     ):
         self.progress_repo = progress_repo
         self.study_plan_repo = study_plan_repo
         self.section_repo = section_repo
+        self.analytics_service = analytics_service
+
+    @staticmethod
+    def _event(
+        study_plan_progress_id: UUID, resource_progress: ResourceProgress
+    ) -> dict[str, Any]:
+        # Appended in the transaction that changes the status, so the log
+        # never misses a change that was committed
+        return {
+            "study_plan_progress_id": study_plan_progress_id,
+            "resource_progress_id": resource_progress.id,
+            "status": resource_progress.status,
+            "occurred_at": resource_progress.completed_at or datetime.now(UTC),
+        }
 
     async def initialize_study_plan_progress(
         self, user_id: UUID, study_plan_id: UUID
@@ -31,26 +49,33 @@ class ProgressService:
             user_id, study_plan_id
         )
         if existing:
-            return existing
-
-        plan = await self.study_plan_repo.get_study_plan_detailed(study_plan_id)
-        if not plan:
-            raise ValueError("Study plan not found")
-
-        sp_progress = await self.progress_repo.study_plan.create(
-            StudyPlanProgress(user_id=user_id, study_plan_id=study_plan_id)
-        )
-
-        sections, resources = await self._create_section_progress_tree(
-            user_id, sp_progress.id, plan.sections
-        )
-
-        await self.progress_repo.section.create_batch(sections)
-        await self.progress_repo.resource.create_batch(resources)
+            plan = await self.study_plan_repo.get_by_id(study_plan_id)
+            if not plan or existing.plan_version == plan.version:
+                return existing
+            # Built against an older version of the plan, edited since: caught
+            # up on first use rather than for every follower on each edit
+            await self.sync_study_plan_progress(user_id, study_plan_id)
+        else:
+            plan = await self.study_plan_repo.get_study_plan_detailed(study_plan_id)
+            if not plan:
+                raise ValueError("Study plan not found")
+
+            # Only the request that inserts the plan row builds the tree, a
+            # concurrent one finds the row taken and just reloads
+            sp_progress_id = (
+                await self.progress_repo.create_study_plan_progress_if_missing(
+                    user_id, study_plan_id, plan.version
+                )
+            )
+            if sp_progress_id is not None:
+                sections, resources = await self._create_section_progress_tree(
+                    user_id, sp_progress_id, plan.sections
+                )
+                await self.progress_repo.insert_missing_progress(sections, resources)
 
-        # Reload with relationships
+        # Reload with relationships, written by bulk statements
         reloaded = await self.progress_repo.get_study_plan_progress(
-            user_id, study_plan_id
+            user_id, study_plan_id, refresh=True
         )
         if not reloaded:
             raise ValueError("Failed to initialize progress")
@@ -100,32 +125,46 @@ class ProgressService:
         sp_progress = await self.initialize_study_plan_progress(user_id, study_plan_id)
 
         sec_progress = await self.progress_repo.get_section_progress(
-            user_id, section_id
+            sp_progress.id, section_id
         )
         if not sec_progress:
             raise ValueError("Section progress not found")
 
+        # Resources are shared, so a user can have progress on the same one
+        # in several sections
         res_progress = await self.progress_repo.get_resource_progress(
-            user_id, resource_id
+            sec_progress.id, resource_id
         )
         if not res_progress:
             raise ValueError("Resource progress not found")
 
-        if res_progress.section_progress_id != sec_progress.id:
-            raise ValueError("Resource does not belong to this section")
-
+        previous_status = res_progress.status
+        previous_completed_at = res_progress.completed_at
         res_progress.status = status
         res_progress.completed_at = (
             datetime.now(UTC) if status == CompletionStatus.COMPLETED else None
         )
 
         await self.progress_repo.resource.update(res_progress, res_progress)
+        await self.progress_repo.append_events(
+            [self._event(sp_progress.id, res_progress)]
+        )
+
+        if self.analytics_service:
+            await self.analytics_service.record_resource_status_change(
+                user_id,
+                study_plan_id,
+                resource_id,
+                previous_status,
+                previous_completed_at,
+                status,
+            )
 
         await self._recalculate_section_progress(sec_progress)
         await self._recalculate_study_plan_progress(sp_progress)
 
         res_progress = await self.progress_repo.get_resource_progress(
-            user_id, resource_id
+            sec_progress.id, resource_id
         )
         if not res_progress:
             raise ValueError("Resource progress not found")
@@ -133,6 +172,21 @@ class ProgressService:
 
     async def _recalculate_section_progress(
         self, section_progress: SectionProgress
+    ) -> None:
+        # A section's score feeds its parent's, so walk up to the top level
+        section_ids = await self.section_repo.get_ancestor_ids(
+            section_progress.section_id
+        )
+        chain = await self.progress_repo.get_section_progresses(
+            section_progress.study_plan_progress_id, section_ids
+        )
+        for progress in chain:
+            if not progress:
+                return
+            await self._recalculate_section_score(progress)
+
+    async def _recalculate_section_score(
+        self, section_progress: SectionProgress
     ) -> None:
         section = await self.section_repo.get_with_details(section_progress.section_id)
         if not section:
@@ -140,7 +194,7 @@ class ProgressService:
 
         resource_score = await self._calculate_resource_score(section_progress)
         children_score = await self._calculate_children_score(
-            section, section_progress.user_id
+            section, section_progress.study_plan_progress_id
         )
 
         total_items = len(section.resources) + len(section.children)
@@ -151,19 +205,12 @@ class ProgressService:
         self._update_progress_status(section_progress, new_progress)
         await self.progress_repo.section.update(section_progress, section_progress)
 
-        if section.parent_id:
-            parent_progress = await self.progress_repo.get_section_progress(
-                section_progress.user_id, section.parent_id
-            )
-            if parent_progress:
-                await self._recalculate_section_progress(parent_progress)
-
     async def _calculate_resource_score(
         self, section_progress: SectionProgress
     ) -> float:
         # Reload to get latest resource statuses
         sp_fresh = await self.progress_repo.get_section_progress(
-            section_progress.user_id, section_progress.section_id
+            section_progress.study_plan_progress_id, section_progress.section_id
         )
         if not sp_fresh:
             return 0.0
@@ -175,15 +222,13 @@ class ProgressService:
         )
         return float(completed)
 
-    async def _calculate_children_score(self, section: Section, user_id: UUID) -> float:
-        score = 0.0
-        for child in section.children:
-            child_progress = await self.progress_repo.get_section_progress(
-                user_id, child.id
-            )
-            if child_progress:
-                score += child_progress.progress
-        return score
+    async def _calculate_children_score(
+        self, section: Section, study_plan_progress_id: UUID
+    ) -> float:
+        child_progresses = await self.progress_repo.get_section_progresses(
+            study_plan_progress_id, [child.id for child in section.children]
+        )
+        return sum((cp.progress for cp in child_progresses if cp), 0.0)
 
     async def _recalculate_study_plan_progress(
         self, sp_progress: StudyPlanProgress
@@ -197,13 +242,10 @@ class ProgressService:
         top_level_sections = [s for s in plan_details.sections if s.parent_id is None]
         total_sections = len(top_level_sections)
 
-        progress_sum = 0.0
-        for section in top_level_sections:
-            sec_progress = await self.progress_repo.get_section_progress(
-                sp_progress.user_id, section.id
-            )
-            if sec_progress:
-                progress_sum += sec_progress.progress
+        sec_progresses = await self.progress_repo.get_section_progresses(
+            sp_progress.id, [section.id for section in top_level_sections]
+        )
+        progress_sum = sum((sp.progress for sp in sec_progresses if sp), 0.0)
 
         new_progress = progress_sum / total_sections if total_sections > 0 else 0.0
 
@@ -224,32 +266,156 @@ class ProgressService:
             entity.status = CompletionStatus.NOT_STARTED
             entity.completed_at = None
 
-    async def reset_resource_progress(self, user_id: UUID, resource_id: UUID) -> None:
-        res_progress = await self.progress_repo.get_resource_progress(
-            user_id, resource_id
-        )
-        if res_progress:
-            res_progress.status = CompletionStatus.NOT_STARTED
-            res_progress.completed_at = None
-            await self.progress_repo.resource.update(res_progress, res_progress)
-
-    async def reset_section_progress(self, user_id: UUID, section_id: UUID) -> None:
+    async def reset_section_progress(
+        self, study_plan_progress_id: UUID, section_id: UUID
+    ) -> None:
         sec_progress = await self.progress_repo.get_section_progress(
-            user_id, section_id
+            study_plan_progress_id, section_id
         )
         if sec_progress:
             self._update_progress_status(sec_progress, 0.0)
             await self.progress_repo.section.update(sec_progress, sec_progress)
+            events = []
+            uncompleted: list[tuple[UUID, datetime | None]] = []
             for rp in sec_progress.resource_progresses:
+                was_started = rp.status != CompletionStatus.NOT_STARTED
+                if rp.status == CompletionStatus.COMPLETED:
+                    uncompleted.append((rp.resource_id, rp.completed_at))
                 rp.status = CompletionStatus.NOT_STARTED
                 rp.completed_at = None
                 await self.progress_repo.resource.update(rp, rp)
+                if was_started:
+                    events.append(self._event(sec_progress.study_plan_progress_id, rp))
+            await self.progress_repo.append_events(events)
+            await self._record_uncompleted(
+                sec_progress.user_id, study_plan_progress_id, uncompleted
+            )
+
+    async def _record_uncompleted(
+        self,
+        user_id: UUID,
+        study_plan_progress_id: UUID,
+        uncompleted: list[tuple[UUID, datetime | None]],
+    ) -> None:
+        # Resets undo completions like `update_resource_status` does, so the
+        # daily rollups keep matching the progress tables
+        if not self.analytics_service or not uncompleted:
+            return
+        sp_progress = await self.progress_repo.study_plan.get_by_id(
+            study_plan_progress_id
+        )
+        if not sp_progress:
+            return
+        for resource_id, completed_at in uncompleted:
+            await self.analytics_service.record_resource_status_change(
+                user_id,
+                sp_progress.study_plan_id,
+                resource_id,
+                CompletionStatus.COMPLETED,
+                completed_at,
+                CompletionStatus.NOT_STARTED,
+            )
+
+    async def backfill_progress_events(self, batch_size: int = 500) -> int:
+        """
+        Seed the event log with the current status of every started resource
+        progress it has no event for, so progress recorded before the log
+        existed can be rebuilt. Commits per batch; returns the number seeded.
+        """
+        seeded = 0
+        while batch := await self.progress_repo.seed_missing_events(batch_size):
+            await self.progress_repo.commit()
+            seeded += batch
+        return seeded
+
+    async def rebuild_study_plan_progress(
+        self, user_id: UUID, study_plan_id: UUID
+    ) -> StudyPlanProgress:
+        """
+        Recompute the whole progress snapshot of a plan by replaying its event
+        log: resource statuses come from the latest event, sections and the
+        plan are then projected bottom-up in memory and written in one commit.
+        Refused when a resource was started without an event, as it was before
+        the log existed, until `backfill_progress_events` seeded the log:
+        replaying would reset it.
+        """
+        sp_progress = await self.progress_repo.get_study_plan_progress(
+            user_id, study_plan_id
+        )
+        if not sp_progress:
+            raise ValueError("Study plan progress not found")
+        plan = await self.study_plan_repo.get_study_plan_detailed(study_plan_id)
+        if not plan:
+            raise ValueError("Study plan not found")
+
+        latest = await self.progress_repo.replay_resource_statuses(sp_progress.id)
+        unlogged = [
+            rp.id
+            for sec_progress in sp_progress.section_progresses
+            for rp in sec_progress.resource_progresses
+            if rp.status != CompletionStatus.NOT_STARTED and rp.id not in latest
+        ]
+        if unlogged:
+            raise InvalidOperationException(
+                "The progress event log is incomplete for this plan",
+                detail={"resource_progress_ids": [str(id) for id in unlogged]},
+            )
+
+        sec_progress_by_section = {
+            sp.section_id: sp for sp in sp_progress.section_progresses
+        }
+        for sec_progress in sp_progress.section_progresses:
+            for rp in sec_progress.resource_progresses:
+                status, occurred_at = latest.get(
+                    rp.id, (CompletionStatus.NOT_STARTED, None)
+                )
+                rp.status = status
+                rp.completed_at = (
+                    occurred_at if status == CompletionStatus.COMPLETED else None
+                )
+
+        def project(section: Section) -> float:
+            sec_progress = sec_progress_by_section.get(section.id)
+            completed = (
+                sum(
+                    1
+                    for rp in sec_progress.resource_progresses
+                    if rp.status == CompletionStatus.COMPLETED
+                )
+                if sec_progress
+                else 0
+            )
+            children_score = sum(project(child) for child in section.children)
+            total_items = len(section.resources) + len(section.children)
+            progress = (
+                (completed + children_score) / total_items if total_items > 0 else 0.0
+            )
+            if sec_progress:
+                self._update_progress_status(sec_progress, progress)
+            return progress
+
+        top_level_sections = [s for s in plan.sections if s.parent_id is None]
+        progress_sum = sum(project(section) for section in top_level_sections)
+        self._update_progress_status(
+            sp_progress,
+            progress_sum / len(top_level_sections) if top_level_sections else 0.0,
+        )
+
+        await self.progress_repo.study_plan.update(sp_progress, sp_progress)
+
+        reloaded = await self.progress_repo.get_study_plan_progress(
+            user_id, study_plan_id
+        )
+        if not reloaded:
+            raise ValueError("Study plan progress not found")
+        return reloaded
 
     async def sync_study_plan_progress(
         self, user_id: UUID, study_plan_id: UUID
     ) -> None:
+        # Edits delete the progress of removed sections in bulk
         sp_progress = await self.progress_repo.get_study_plan_progress(
-            user_id, study_plan_id
+            user_id, study_plan_id, refresh=True
         )
         if not sp_progress:
             return
@@ -268,22 +434,30 @@ class ProgressService:
             sp_progress, plan_section_ids, plan_resource_ids
         )
 
-        await self._ensure_progress_tree(
+        missing_sections: list[SectionProgress] = []
+        missing_resources: list[ResourceProgress] = []
+        self._ensure_progress_tree(
             user_id,
             sp_progress.id,
             plan.sections,
             existing_sec_progs,
             existing_res_progs,
+            missing_sections,
+            missing_resources,
+        )
+        await self.progress_repo.insert_missing_progress(
+            missing_sections, missing_resources
         )
 
-        await self._recalculate_all_sections(user_id, plan.sections)
+        await self._recalculate_all_sections(sp_progress.id, plan.sections)
+        sp_progress.plan_version = plan.version
         await self._recalculate_study_plan_progress(sp_progress)
 
     async def _cleanup_obsolete_progress(
         self,
         sp_progress: StudyPlanProgress,
         plan_section_ids: set[UUID],
-        plan_resource_ids: set[UUID],
+        plan_resource_ids: set[tuple[UUID, UUID]],
     ) -> None:
         sections_to_delete = [
             sp.id
@@ -294,7 +468,7 @@ class ProgressService:
         resources_to_delete = []
         for sp in sp_progress.section_progresses:
             for rp in sp.resource_progresses:
-                if rp.resource_id not in plan_resource_ids:
+                if (sp.section_id, rp.resource_id) not in plan_resource_ids:
                     resources_to_delete.append(rp.id)
 
         if sections_to_delete:
@@ -307,8 +481,8 @@ class ProgressService:
         self,
         sp_progress: StudyPlanProgress,
         plan_section_ids: set[UUID],
-        plan_resource_ids: set[UUID],
-    ) -> tuple[dict[UUID, SectionProgress], dict[UUID, ResourceProgress]]:
+        plan_resource_ids: set[tuple[UUID, UUID]],
+    ) -> tuple[dict[UUID, SectionProgress], dict[tuple[UUID, UUID], ResourceProgress]]:
         existing_sec_progs = {
             sp.section_id: sp
             for sp in sp_progress.section_progresses
@@ -319,14 +493,15 @@ class ProgressService:
         for sp in sp_progress.section_progresses:
             if sp.section_id in plan_section_ids:
                 for rp in sp.resource_progresses:
-                    if rp.resource_id in plan_resource_ids:
-                        existing_res_progs[rp.resource_id] = rp
+                    if (sp.section_id, rp.resource_id) in plan_resource_ids:
+                        existing_res_progs[sp.section_id, rp.resource_id] = rp
 
         return existing_sec_progs, existing_res_progs
 
     def _get_plan_element_ids(
         self, sections: list[Section]
-    ) -> tuple[set[UUID], set[UUID]]:
+    ) -> tuple[set[UUID], set[tuple[UUID, UUID]]]:
+        # Resources as (section id, resource id): one can be in several sections
         sec_ids = set()
         res_ids = set()
 
@@ -334,36 +509,37 @@ class ProgressService:
             for sec in secs:
                 sec_ids.add(sec.id)
                 for res in sec.resources:
-                    res_ids.add(res.id)
+                    res_ids.add((sec.id, res.id))
                 traverse(sec.children)
 
         traverse(sections)
         return sec_ids, res_ids
 
-    async def _ensure_progress_tree(
+    def _ensure_progress_tree(
         self,
         user_id: UUID,
         sp_progress_id: UUID,
         sections: list[Section],
         existing_sec_progs: dict[UUID, SectionProgress],
-        existing_res_progs: dict[UUID, ResourceProgress],
+        existing_res_progs: dict[tuple[UUID, UUID], ResourceProgress],
+        missing_sections: list[SectionProgress],
+        missing_resources: list[ResourceProgress],
     ) -> None:
         for section in sections:
             if section.id not in existing_sec_progs:
-                sec_progress = await self.progress_repo.section.create(
-                    SectionProgress(
-                        user_id=user_id,
-                        section_id=section.id,
-                        study_plan_progress_id=sp_progress_id,
-                    )
+                sec_progress = SectionProgress(
+                    user_id=user_id,
+                    section_id=section.id,
+                    study_plan_progress_id=sp_progress_id,
                 )
+                missing_sections.append(sec_progress)
                 existing_sec_progs[section.id] = sec_progress
             else:
                 sec_progress = existing_sec_progs[section.id]
 
             for resource in section.resources:
-                if resource.id not in existing_res_progs:
-                    await self.progress_repo.resource.create(
+                if (section.id, resource.id) not in existing_res_progs:
+                    missing_resources.append(
                         ResourceProgress(
                             user_id=user_id,
                             resource_id=resource.id,
@@ -372,23 +548,27 @@ class ProgressService:
                     )
 
             if section.children:
-                await self._ensure_progress_tree(
+                self._ensure_progress_tree(
                     user_id,
                     sp_progress_id,
                     section.children,
                     existing_sec_progs,
                     existing_res_progs,
+                    missing_sections,
+                    missing_resources,
                 )
 
     async def _recalculate_all_sections(
-        self, user_id: UUID, sections: list[Section]
+        self, study_plan_progress_id: UUID, sections: list[Section]
     ) -> None:
         for section in sections:
             if section.children:
-                await self._recalculate_all_sections(user_id, section.children)
+                await self._recalculate_all_sections(
+                    study_plan_progress_id, section.children
+                )
 
             sec_progress = await self.progress_repo.get_section_progress(
-                user_id, section.id
+                study_plan_progress_id, section.id
             )
             if sec_progress:
                 await self._recalculate_section_progress(sec_progress)
@@ -1,17 +1,22 @@
 from datetime import UTC, datetime
 from uuid import UUID
 
+from app.domain.enums import QuizState
 from app.domain.exceptions.base import (
     InvalidOperationException,
     NotFoundException,
     UnauthorizedException,
 )
 from app.domain.schemas.quiz import (
+    QuestionOptionPublic,
+    QuestionPublic,
     QuestionUserSelectedOptions,
     QuizGenerateRequest,
     QuizRead,
+    QuizReadPublic,
     QuizResult,
 )
+from app.domain.services.analytics import AnalyticsService
 from app.domain.services.gemini import GeminiService
 from app.persistence.model.quiz import Question, QuestionOption, Quiz, QuizUserAnswer
 from app.persistence.repository.quiz import QuizRepository
@@ -24,10 +29,12 @@ class QuizService:
         quiz_repo: QuizRepository,
         study_plan_repo: StudyPlanRepository,
         gemini_service: GeminiService,
+        analytics_service: AnalyticsService | None = None,
     ):
         self.quiz_repo = quiz_repo
         self.study_plan_repo = study_plan_repo
         self.gemini_service = gemini_service
+        self.analytics_service = analytics_service
 
     async def create_quiz(
         self,
@@ -51,6 +58,7 @@ class QuizService:
 
         quiz = Quiz(
             study_plan_id=study_plan_id,
+            plan_version=study_plan.version,
             user_id=user_id,
             title=proposal.title,
             difficulty=proposal.difficulty,
@@ -92,8 +100,8 @@ class QuizService:
             passed=passed,
         )
 
-    async def start_quiz(self, quiz_id: UUID, user_id: UUID) -> Quiz:
-        quiz = await self.quiz_repo.get_with_questions(quiz_id)
+    async def start_quiz(self, quiz_id: UUID, user_id: UUID) -> QuizReadPublic:
+        quiz = await self.quiz_repo.get_by_id(quiz_id)
         if not quiz:
             raise NotFoundException("Quiz not found")
         if quiz.user_id != user_id:
@@ -103,7 +111,32 @@ class QuizService:
             quiz.started_at = datetime.now(UTC)
             await self.quiz_repo.save(quiz)
 
-        return quiz
+        return await self.get_public_quiz(quiz)
+
+    async def get_public_quiz(self, quiz: Quiz) -> QuizReadPublic:
+        question_rows = await self.quiz_repo.get_public_questions(quiz.id)
+        option_rows = await self.quiz_repo.get_public_options(quiz.id)
+
+        options_by_question: dict[UUID, list[QuestionOptionPublic]] = {}
+        for row in option_rows:
+            options_by_question.setdefault(row["question_id"], []).append(
+                QuestionOptionPublic(id=row["id"], text=row["text"])
+            )
+
+        questions = [
+            QuestionPublic(
+                id=row["id"],
+                title=row["title"],
+                description=row["description"],
+                order=row["order"],
+                correct_answer_count=row["correct_answer_count"],
+                options=options_by_question.get(row["id"], []),
+            )
+            for row in question_rows
+        ]
+
+        quiz_data = QuizRead.model_validate(quiz).model_dump()
+        return QuizReadPublic(**quiz_data, questions=questions)
 
     async def submit_answers(
         self, quiz_id: UUID, user_id: UUID, answers: list[QuestionUserSelectedOptions]
@@ -118,13 +151,7 @@ class QuizService:
         if not quiz.started_at:
             raise InvalidOperationException("Quiz has not been started")
 
-        started_at = (
-            quiz.started_at.replace(tzinfo=UTC)
-            if quiz.started_at.tzinfo is None
-            else quiz.started_at
-        )
-        time_elapsed = datetime.now(UTC) - started_at
-        if time_elapsed.total_seconds() > quiz.duration_minutes * 60:
+        if quiz.is_expired:
             raise InvalidOperationException("Quiz time has expired")
 
         user_answers_map = self._map_user_answers(answers)
@@ -136,7 +163,10 @@ class QuizService:
         quiz.score = self._calculate_score(quiz, user_answers_map)
         quiz.completed_at = datetime.now(UTC)
 
-        return await self.quiz_repo.save(quiz)
+        quiz = await self.quiz_repo.save(quiz)
+        if self.analytics_service:
+            await self.analytics_service.record_quiz_submission(quiz)
+        return quiz
 
     def _map_user_answers(
         self, answers: list[QuestionUserSelectedOptions]
@@ -182,8 +212,47 @@ class QuizService:
                 )
         return answers_to_save
 
-    async def list_quizzes(self, study_plan_id: UUID, user_id: UUID) -> list[Quiz]:
-        return await self.quiz_repo.list_by_plan_and_user(study_plan_id, user_id)
+    async def list_quizzes(
+        self, study_plan_id: UUID, user_id: UUID, state: QuizState | None = None
+    ) -> list[Quiz]:
+        return await self.quiz_repo.list_by_plan_and_user(study_plan_id, user_id, state)
+
+    async def close_expired_quizzes(self, batch_size: int = 100) -> int:
+        """
+        Auto-submit quizzes whose time ran out, scoring the answers on record.
+        Each quiz is claimed by one update, so sweeps running in several
+        workers close, and count, it once. Returns the number of quizzes
+        closed.
+        """
+        # Quizzes started before `expires_at` was stored would never expire
+        while await self.quiz_repo.backfill_expires_at(batch_size):
+            await self.quiz_repo.commit()
+
+        closed = 0
+        while True:
+            quizzes = await self.quiz_repo.get_expired_open(
+                datetime.now(UTC), limit=batch_size
+            )
+            scores = {}
+            for quiz in quizzes:
+                user_answers_map: dict[UUID, set[UUID]] = {}
+                for answer in quiz.user_answers:
+                    user_answers_map.setdefault(answer.question_id, set()).add(
+                        answer.selected_option_id
+                    )
+                scores[quiz.id] = self._calculate_score(quiz, user_answers_map)
+
+            if quizzes:
+                claimed = await self.quiz_repo.close_expired(quizzes, scores)
+                if self.analytics_service:
+                    for quiz in claimed:
+                        await self.analytics_service.record_quiz_submission(quiz)
+                # One transaction per batch keeps long sweeps from holding locks
+                await self.quiz_repo.commit()
+                closed += len(claimed)
+
+            if len(quizzes) < batch_size:
+                return closed
 
     async def delete_quiz(self, quiz_id: UUID, user_id: UUID) -> None:
         quiz = await self.quiz_repo.get_by_id(quiz_id)
@@ -1,31 +1,107 @@
+import asyncio
+import gzip
+from collections.abc import AsyncIterable, AsyncIterator, Iterator, Sequence
 from uuid import UUID
 
+from pydantic import ValidationError
+
+from app.core.cache import Cache
+from app.core.compression import GZIP, IDENTITY, EncodedBody, compress, encode_body
 from app.core.config import get_settings
+from app.core.streaming import iter_model_json
+from app.core.utils import LineTooLongError, iter_ndjson_lines
+from app.domain.exceptions.base import InvalidOperationException
 from app.domain.schemas.resource import ResourceCreate, ResourceUpsert
 from app.domain.schemas.section import SectionCreate, SectionUpsert
-from app.domain.schemas.study_plan import StudyPlanCreate, StudyPlanUpdate
+from app.domain.schemas.study_plan import (
+    StudyPlanCreate,
+    StudyPlanProposal,
+    StudyPlanReadDetail,
+    StudyPlanReadDetailWithProgress,
+    StudyPlanUpdate,
+)
 from app.domain.services.progress import ProgressService
+from app.persistence.model.links import SectionResourceLink, StudyPlanResourceLink
 from app.persistence.model.resource import Resource
 from app.persistence.model.section import Section
-from app.persistence.model.study_plan import StudyPlan
+from app.persistence.model.study_plan import StudyPlan, StudyPlanSnapshot
 from app.persistence.repository.study_plan import (
     StudyPlanRepository,
+    StudyPlanRows,
 )
 
 
 class StudyPlanService:
-    def __init__(self, study_plan_repository: StudyPlanRepository):
+    def __init__(
+        self, study_plan_repository: StudyPlanRepository, cache: Cache | None = None
+    ):
         self.study_plan_repository = study_plan_repository
+        self.plan_trees = (
+            cache.namespace("plan_tree", StudyPlanReadDetail) if cache else None
+        )
+        self.plan_tree_bodies = (
+            cache.namespace("plan_tree_body", EncodedBody) if cache else None
+        )
+        # Resources by fingerprint, so each one is linked rather than copied
+        self._resources: dict[str, Resource] = {}
 
-    def _create_resource_entity(self, resource_in: ResourceCreate) -> Resource:
+    def _new_resource(self, resource_in: ResourceCreate, fingerprint: str) -> Resource:
         return Resource(
             title=resource_in.title,
             url=resource_in.url,
             type=resource_in.type,
             description=resource_in.description,
             duration_minutes=resource_in.duration_minutes,
+            fingerprint=fingerprint,
         )
 
+    def _create_resource_entity(self, resource_in: ResourceCreate) -> Resource:
+        """
+        The resource with the content of `resource_in`: the stored one once
+        `_load_resources` saw it, otherwise a new one shared by every later
+        use of the same content.
+        """
+        fingerprint = resource_in.fingerprint()
+        resource = self._resources.get(fingerprint)
+        if resource is None:
+            resource = self._new_resource(resource_in, fingerprint)
+            self._resources[fingerprint] = resource
+        return resource
+
+    async def _load_resources(self, resources_in: Iterator[ResourceCreate]) -> None:
+        """
+        Look up the stored resources for `resources_in` in one query, creating
+        the missing ones, before building entities from them.
+        """
+        candidates = {}
+        for resource_in in resources_in:
+            fingerprint = resource_in.fingerprint()
+            if fingerprint not in self._resources:
+                candidates[fingerprint] = self._new_resource(resource_in, fingerprint)
+        self._resources.update(
+            await self.study_plan_repository.resources.get_or_create(
+                list(candidates.values())
+            )
+        )
+
+    def _iter_resources(
+        self, sections_in: Sequence[SectionCreate | SectionUpsert]
+    ) -> Iterator[ResourceCreate]:
+        for section_in in sections_in:
+            yield from section_in.resources
+            yield from self._iter_resources(section_in.children)
+
+    def _iter_sections(self, sections: Sequence[Section]) -> Iterator[Section]:
+        # Each section before its children
+        for section in sections:
+            yield section
+            yield from self._iter_sections(section.children)
+
+    @staticmethod
+    def _unique(resources: list[Resource]) -> list[Resource]:
+        # A resource listed twice under one plan or section is linked once
+        return list({resource.fingerprint: resource for resource in resources}.values())
+
     def _create_section_entity(
         self, section_in: SectionCreate | SectionUpsert
     ) -> Section:
@@ -34,13 +110,14 @@ class StudyPlanService:
             description=section_in.description,
             order=section_in.order,
         )
-
-        for res_in in section_in.resources:
-            section.resources.append(self._create_resource_entity(res_in))
-
-        for child_in in section_in.children:
-            section.children.append(self._create_section_entity(child_in))
-
+        # Assigned even when empty, so the collections count as loaded after
+        # the flush and serializing the new tree needs no lazy load
+        section.resources = self._unique(
+            [self._create_resource_entity(res_in) for res_in in section_in.resources]
+        )
+        section.children = [
+            self._create_section_entity(child_in) for child_in in section_in.children
+        ]
         return section
 
     def _validate_depth(self, section: SectionCreate, current_depth: int = 1) -> None:
@@ -56,6 +133,10 @@ class StudyPlanService:
         for sec_in in plan_in.sections:
             self._validate_depth(sec_in)
 
+        await self._load_resources(
+            iter([*plan_in.resources, *self._iter_resources(plan_in.sections)])
+        )
+
         # Create the main plan
         study_plan = StudyPlan(
             title=plan_in.title,
@@ -64,18 +145,144 @@ class StudyPlanService:
         )
 
         # Create resources for the plan
-        for res_in in plan_in.resources:
-            study_plan.resources.append(self._create_resource_entity(res_in))
+        study_plan.resources = self._unique(
+            [self._create_resource_entity(res_in) for res_in in plan_in.resources]
+        )
 
         # Create sections (and their resources/children)
+        study_plan.sections = [
+            self._create_section_entity(sec_in) for sec_in in plan_in.sections
+        ]
+
+        # The tree built above is complete, no need to read it back
+        await self.study_plan_repository.create(study_plan)
+        await self.study_plan_repository.sections.add_closure(
+            list(self._iter_sections(study_plan.sections))
+        )
+        await self._store_snapshots([study_plan])
+        return study_plan
+
+    async def import_study_plans(
+        self,
+        user_id: UUID,
+        chunks: AsyncIterable[bytes],
+        chunk_size: int | None = None,
+    ) -> int:
+        """
+        Create plans owned by `user_id` from an NDJSON stream with one
+        `StudyPlanProposal` per line, parsed as it arrives. Every `chunk_size`
+        plans are bulk inserted and committed. An invalid or too long line
+        stops the import; the chunks committed before it are kept. Returns the
+        number of plans imported.
+        """
+        settings = get_settings()
+        chunk_size = chunk_size or settings.STUDY_PLAN_IMPORT_CHUNK_SIZE
+        imported = 0
+        rows = StudyPlanRows()
+        lines = iter_ndjson_lines(chunks, settings.STUDY_PLAN_IMPORT_MAX_LINE_BYTES)
+        try:
+            async for line_number, line in lines:
+                try:
+                    plan_in = StudyPlanProposal.model_validate_json(line)
+                    for sec_in in plan_in.sections:
+                        self._validate_depth(sec_in)
+                except ValidationError as e:
+                    raise InvalidOperationException(
+                        f"Line {line_number} is not a valid study plan",
+                        detail={
+                            "line": line_number,
+                            "imported": imported,
+                            "errors": e.errors(
+                                include_url=False,
+                                include_context=False,
+                                include_input=False,
+                            ),
+                        },
+                    ) from None
+                except ValueError as e:
+                    raise InvalidOperationException(
+                        f"Line {line_number}: {e}",
+                        detail={"line": line_number, "imported": imported},
+                    ) from None
+
+                self._add_plan_rows(rows, plan_in, user_id)
+                if len(rows.plans) == chunk_size:
+                    imported += await self._insert_chunk(rows)
+                    rows = StudyPlanRows()
+        except LineTooLongError as e:
+            raise InvalidOperationException(
+                str(e), detail={"line": e.line_number, "imported": imported}
+            ) from None
+        if rows.plans:
+            imported += await self._insert_chunk(rows)
+        return imported
+
+    async def _insert_chunk(self, rows: StudyPlanRows) -> int:
+        repository = self.study_plan_repository
+        await repository.insert_rows(rows)
+        plans = await repository.get_study_plans_detailed([p.id for p in rows.plans])
+        await self._store_snapshots(plans)
+        await repository.commit()
+        repository.session.expunge_all()
+        # The rows inserted instead of these candidates are not loaded
+        self._resources.clear()
+        return len(rows.plans)
+
+    def _add_plan_rows(
+        self, rows: StudyPlanRows, plan_in: StudyPlanProposal, user_id: UUID
+    ) -> None:
+        plan = StudyPlan(
+            title=plan_in.title, description=plan_in.description, user_id=user_id
+        )
+        rows.plans.append(plan)
+        for res_in in plan_in.resources:
+            resource = self._create_resource_entity(res_in)
+            rows.resources.append(resource)
+            rows.plan_resources.append(
+                StudyPlanResourceLink(study_plan_id=plan.id, resource_id=resource.id)
+            )
         for sec_in in plan_in.sections:
-            study_plan.sections.append(self._create_section_entity(sec_in))
+            self._add_section_rows(rows, sec_in, study_plan_id=plan.id)
 
-        created_plan = await self.study_plan_repository.create(study_plan)
-        item = await self.study_plan_repository.get_study_plan_detailed(created_plan.id)
-        if item is None:
-            raise Exception("Failed to retrieve created study plan")
-        return item
+    def _add_section_rows(
+        self,
+        rows: StudyPlanRows,
+        section_in: SectionCreate,
+        study_plan_id: UUID | None = None,
+        parent_id: UUID | None = None,
+    ) -> None:
+        # Like the ORM path, only top-level sections point at the plan
+        section = Section(
+            title=section_in.title,
+            description=section_in.description,
+            order=section_in.order,
+            study_plan_id=study_plan_id,
+            parent_id=parent_id,
+        )
+        rows.sections.append(section)
+        for res_in in section_in.resources:
+            resource = self._create_resource_entity(res_in)
+            rows.resources.append(resource)
+            rows.section_resources.append(
+                SectionResourceLink(section_id=section.id, resource_id=resource.id)
+            )
+        for child_in in section_in.children:
+            self._add_section_rows(rows, child_in, parent_id=section.id)
+
+    async def export_study_plans(
+        self, user_id: UUID, batch_size: int | None = None
+    ) -> AsyncIterator[StudyPlan]:
+        """
+        A user's active plans with their trees, oldest first, to be encoded as
+        `StudyPlanProposal` lines for `import_study_plans`. Plans are loaded
+        `batch_size` at a time and released once the batch was consumed.
+        """
+        batch_size = batch_size or get_settings().STUDY_PLAN_EXPORT_BATCH_SIZE
+        repository = self.study_plan_repository
+        async for ids in repository.stream_ids_by_user(user_id, batch_size):
+            for plan in await repository.get_study_plans_detailed(ids):
+                yield plan
+            repository.session.expunge_all()
 
     async def get_by_id(self, id: UUID) -> StudyPlan | None:
         return await self.study_plan_repository.get_by_id(id)
@@ -89,35 +296,109 @@ class StudyPlanService:
         plan = await self.study_plan_repository.get_study_plan_detailed(id)
         return plan
 
-    def _copy_resource(self, resource: Resource) -> Resource:
-        return Resource(
-            title=resource.title,
-            url=resource.url,
-            type=resource.type,
-            description=resource.description,
-            duration_minutes=resource.duration_minutes,
-        )
+    async def get_study_plan_tree(self, id: UUID) -> StudyPlanReadDetail | None:
+        """
+        Read model of an active plan with its sections and resources: the
+        snapshot of its current version, served from the cache when possible.
+        """
+        version = await self._get_version(id)
+        if version is None:
+            return None
+        return await self._get_study_plan_tree(id, version)
 
-    def _copy_section(self, section: Section) -> Section:
-        new_section = Section(
-            title=section.title,
-            description=section.description,
-            order=section.order,
+    async def _get_version(self, id: UUID) -> int | None:
+        plan = await self.study_plan_repository.get_by_id(id)
+        if not plan or not plan.active:
+            return None
+        return plan.version
+
+    async def _get_study_plan_tree(
+        self, id: UUID, version: int
+    ) -> StudyPlanReadDetail | None:
+        # A version never changes, so its cache entries are never invalidated
+        if self.plan_trees is None:
+            return await self._load_snapshot(id, version)
+        return await self.plan_trees.get_or_load(
+            f"{id}:{version}", lambda: self._load_snapshot(id, version)
         )
-        for res in section.resources:
-            new_section.resources.append(self._copy_resource(res))
 
-        for child in section.children:
-            new_section.children.append(self._copy_section(child))
+    async def _load_snapshot(
+        self, id: UUID, version: int
+    ) -> StudyPlanReadDetail | None:
+        """
+        The stored snapshot of `version` of a plan. A plan stored before
+        snapshots were is built from its rows; they are read after the
+        version, so they are never older than it.
+        """
+        repository = self.study_plan_repository
+        content = await repository.get_snapshot(id, version)
+        if content is not None:
+            return StudyPlanReadDetail.model_validate_json(gzip.decompress(content))
+
+        plan = await repository.get_study_plan_detailed(id)
+        if not plan:
+            return None
+        return StudyPlanReadDetail.model_validate(plan)
+
+    async def _store_snapshots(self, plans: list[StudyPlan]) -> None:
+        """
+        Store the snapshot of the current version of each of `plans`, with
+        their trees loaded, in the transaction that made that version.
+        """
+        level = get_settings().COMPRESSION_CACHED_GZIP_LEVEL
+        snapshots = [
+            StudyPlanSnapshot(
+                study_plan_id=plan.id,
+                version=plan.version,
+                content=await asyncio.to_thread(
+                    compress,
+                    StudyPlanReadDetail.model_validate(plan).model_dump_json().encode(),
+                    GZIP,
+                    level,
+                ),
+            )
+            for plan in plans
+        ]
+        await self.study_plan_repository.add_snapshots(snapshots)
+
+    async def get_study_plan_tree_body(
+        self, id: UUID, encoding: str
+    ) -> EncodedBody | None:
+        """
+        JSON of an active plan as `GET /plan/{id}` sends it without progress,
+        which is the same for every anonymous client. With a cache it is
+        stored compressed in `encoding`, so hot plans are compressed once per
+        cache entry instead of once per request.
+        """
+        version = await self._get_version(id)
+        if version is None:
+            return None
 
-        return new_section
+        async def load(encoding: str) -> EncodedBody | None:
+            detail = await self._get_study_plan_tree(id, version)
+            if detail is None:
+                return None
+            body = b"".join(
+                iter_model_json(StudyPlanReadDetailWithProgress, detail, progress=None)
+            )
+            return await encode_body(body, encoding)
+
+        if self.plan_tree_bodies is None:
+            # Left to the compression middleware and its CPU budget
+            return await load(IDENTITY)
+        return await self.plan_tree_bodies.get_or_load(
+            f"{id}:{version}:{encoding}", lambda: load(encoding)
+        )
 
     async def fork_study_plan(
         self, original_plan_id: UUID, user_id: UUID
     ) -> StudyPlan | None:
-        original_plan = await self.study_plan_repository.get_study_plan_detailed(
-            original_plan_id
-        )
+        """
+        Fork a plan by inserting only the new plan row: the fork shows the
+        tree of the plan owning the original's rows, so forking a fork does
+        not make a chain to walk, until its tree is first edited.
+        """
+        original_plan = await self.study_plan_repository.get_by_id(original_plan_id)
         if not original_plan:
             return None
 
@@ -126,19 +407,13 @@ class StudyPlanService:
             description=original_plan.description,
             user_id=user_id,
             forked_from_id=original_plan.id,
+            tree_source_id=original_plan.tree_source_id or original_plan.id,
         )
-
-        for res in original_plan.resources:
-            new_plan.resources.append(self._copy_resource(res))
-
-        for sec in original_plan.sections:
-            new_plan.sections.append(self._copy_section(sec))
-
-        created_plan = await self.study_plan_repository.create(new_plan)
-        item = await self.study_plan_repository.get_study_plan_detailed(created_plan.id)
-        if item is None:
-            raise Exception("Failed to retrieve created study plan")
-        return item
+        await self.study_plan_repository.create(new_plan)
+        fork = await self.study_plan_repository.get_study_plan_detailed(new_plan.id)
+        if fork:
+            await self._store_snapshots([fork])
+        return fork
 
     async def update_study_plan(
         self,
@@ -149,30 +424,146 @@ class StudyPlanService:
         plan = await self.study_plan_repository.get_study_plan_detailed(plan_id)
         if not plan:
             raise ValueError("Study plan not found")
+        await self.study_plan_repository.bump_version(
+            plan,
+            **update_in.model_dump(include={"title", "description"}, exclude_none=True),
+        )
 
-        if update_in.title is not None:
-            plan.title = update_in.title
-        if update_in.description is not None:
-            plan.description = update_in.description
-
+        # Sections added and removed by the update, as the roots of subtrees
+        created: list[Section] = []
+        removed: list[UUID] = []
         if update_in.sections is not None:
+            sections_in = update_in.sections
+            section_ids = await self._unshare_tree(plan, progress_service)
+            if section_ids:
+                sections_in = self._with_section_ids(sections_in, section_ids)
+                plan = await self.study_plan_repository.get_study_plan_detailed(plan_id)
+                if not plan:
+                    raise ValueError("Study plan not found")
+            await self._load_resources(self._iter_resources(sections_in))
+            study_plan_progress_id = (
+                await progress_service.progress_repo.get_study_plan_progress_id(
+                    plan.user_id, plan.id
+                )
+            )
             await self._sync_sections(
-                plan, update_in.sections, progress_service, plan.user_id
+                plan,
+                sections_in,
+                progress_service,
+                study_plan_progress_id,
+                created,
+                removed,
             )
 
-        await self.study_plan_repository.session.commit()
-        await self.study_plan_repository.session.refresh(plan)
+        await self.study_plan_repository.session.flush()
+        await self._apply_section_changes(created, removed, progress_service)
 
         await progress_service.sync_study_plan_progress(plan.user_id, plan.id)
+        await self._store_snapshots([plan])
 
         return plan
 
+    async def _apply_section_changes(
+        self,
+        created: list[Section],
+        removed: list[UUID],
+        progress_service: ProgressService,
+    ) -> None:
+        """
+        Add the closure rows of the `created` subtrees, and delete the
+        `removed` subtrees with the progress of every user on them, each in
+        a few set-based statements.
+        """
+        sections = self.study_plan_repository.sections
+        await sections.add_closure(list(self._iter_sections(created)))
+        removed_ids = await sections.get_descendant_ids(removed)
+        await progress_service.progress_repo.delete_section_progress(removed_ids)
+        await sections.delete_by_ids(removed_ids)
+
+    async def _unshare_tree(
+        self, plan: StudyPlan, progress_service: ProgressService
+    ) -> dict[UUID, UUID]:
+        """
+        Give `plan` rows of its own before its tree is edited, copied from the
+        tree it shows, and return the new section ids by the old ones. A fork
+        copies its source's tree. A plan whose tree forks share hands its rows
+        to the oldest fork and copies them for itself, so the forks keep the
+        tree they had. Progress on `plan` moves to the copies. A plan that is
+        the only one showing its tree is left as it is.
+        """
+        repository = self.study_plan_repository
+        if plan.tree_source_id is None:
+            sharer_ids = await repository.get_tree_sharer_ids(plan.id)
+            if not sharer_ids:
+                return {}
+            await repository.hand_off_tree(plan.id, sharer_ids[0])
+
+        rows = StudyPlanRows()
+        section_ids: dict[UUID, UUID] = {}
+        for resource in plan.resources:
+            rows.plan_resources.append(
+                StudyPlanResourceLink(study_plan_id=plan.id, resource_id=resource.id)
+            )
+        for section in plan.sections:
+            self._copy_section_rows(rows, section, section_ids, study_plan_id=plan.id)
+        plan.tree_source_id = None
+        await repository.insert_rows(rows)
+        await progress_service.progress_repo.move_section_progress(plan.id, section_ids)
+        # Loaded again from the copies
+        repository.session.expire(plan, ["sections", "resources"])
+        return section_ids
+
+    def _copy_section_rows(
+        self,
+        rows: StudyPlanRows,
+        section: Section,
+        section_ids: dict[UUID, UUID],
+        study_plan_id: UUID | None = None,
+        parent_id: UUID | None = None,
+    ) -> None:
+        # Resources are shared, not copied
+        copy = Section(
+            title=section.title,
+            description=section.description,
+            order=section.order,
+            study_plan_id=study_plan_id,
+            parent_id=parent_id,
+        )
+        section_ids[section.id] = copy.id
+        rows.sections.append(copy)
+        for resource in section.resources:
+            rows.section_resources.append(
+                SectionResourceLink(section_id=copy.id, resource_id=resource.id)
+            )
+        for child in section.children:
+            self._copy_section_rows(rows, child, section_ids, parent_id=copy.id)
+
+    def _with_section_ids(
+        self, sections_in: list[SectionUpsert], section_ids: dict[UUID, UUID]
+    ) -> list[SectionUpsert]:
+        """`sections_in` referring to the copies of the sections they name."""
+        return [
+            section_in.model_copy(
+                update={
+                    "id": section_ids.get(section_in.id, section_in.id)
+                    if section_in.id
+                    else None,
+                    "children": self._with_section_ids(
+                        section_in.children, section_ids
+                    ),
+                }
+            )
+            for section_in in sections_in
+        ]
+
     async def _sync_sections(
         self,
         plan: StudyPlan,
         sections_in: list[SectionUpsert],
         progress_service: ProgressService,
-        user_id: UUID,
+        study_plan_progress_id: UUID | None,
+        created: list[Section],
+        removed: list[UUID],
     ) -> None:
         existing_sections_map = {s.id: s for s in plan.sections}
         new_sections_list = []
@@ -192,16 +583,21 @@ class StudyPlanService:
 
                 existing_sec.order = i
 
-                res_affected = await self._sync_resources(
-                    existing_sec, sec_in.resources, progress_service, user_id
-                )
+                res_affected = self._sync_resources(existing_sec, sec_in.resources)
                 child_affected = await self._sync_children(
-                    existing_sec, sec_in.children, progress_service, user_id
+                    existing_sec,
+                    sec_in.children,
+                    progress_service,
+                    study_plan_progress_id,
+                    created,
+                    removed,
                 )
 
-                if affected or res_affected or child_affected:
+                if study_plan_progress_id and (
+                    affected or res_affected or child_affected
+                ):
                     await progress_service.reset_section_progress(
-                        user_id, existing_sec.id
+                        study_plan_progress_id, existing_sec.id
                     )
 
                 new_sections_list.append(existing_sec)
@@ -210,9 +606,11 @@ class StudyPlanService:
                 new_sec = self._create_section_entity(sec_in)
                 new_sec.order = i
                 new_sections_list.append(new_sec)
+                created.append(new_sec)
 
-        for sec_to_delete in existing_sections_map.values():
-            await self.study_plan_repository.session.delete(sec_to_delete)
+        # Detached from the plan here, deleted with their subtrees after the
+        # flush
+        removed.extend(existing_sections_map)
 
         plan.sections = new_sections_list
 
@@ -221,7 +619,9 @@ class StudyPlanService:
         parent: Section,
         children_in: list[SectionUpsert],
         progress_service: ProgressService,
-        user_id: UUID,
+        study_plan_progress_id: UUID | None,
+        created: list[Section],
+        removed: list[UUID],
     ) -> bool:
         existing_children_map = {s.id: s for s in parent.children}
         new_children_list = []
@@ -242,17 +642,21 @@ class StudyPlanService:
 
                 existing_child.order = i
 
-                res_affected = await self._sync_resources(
-                    existing_child, child_in.resources, progress_service, user_id
-                )
+                res_affected = self._sync_resources(existing_child, child_in.resources)
                 grandchild_affected = await self._sync_children(
-                    existing_child, child_in.children, progress_service, user_id
+                    existing_child,
+                    child_in.children,
+                    progress_service,
+                    study_plan_progress_id,
+                    created,
+                    removed,
                 )
 
                 if affected or res_affected or grandchild_affected:
-                    await progress_service.reset_section_progress(
-                        user_id, existing_child.id
-                    )
+                    if study_plan_progress_id:
+                        await progress_service.reset_section_progress(
+                            study_plan_progress_id, existing_child.id
+                        )
                     any_affected = True
 
                 new_children_list.append(existing_child)
@@ -261,62 +665,44 @@ class StudyPlanService:
                 new_child = self._create_section_entity(child_in)
                 new_child.order = i
                 new_children_list.append(new_child)
+                created.append(new_child)
                 any_affected = True
 
-        for child_to_delete in existing_children_map.values():
-            await self.study_plan_repository.session.delete(child_to_delete)
+        if existing_children_map:
+            removed.extend(existing_children_map)
             any_affected = True
 
         parent.children = new_children_list
         return any_affected
 
-    async def _sync_resources(
-        self,
-        section: Section,
-        resources_in: list[ResourceUpsert],
-        progress_service: ProgressService,
-        user_id: UUID,
+    def _sync_resources(
+        self, section: Section, resources_in: list[ResourceUpsert]
     ) -> bool:
+        """
+        Link the resources of `resources_in` to `section`. Resources are shared
+        between plans, so they are copied on write: a changed resource is
+        linked to the resource stored for its new content, and the row other
+        plans use stays as it was. Its progress goes with the old link.
+        """
         existing_res_map = {r.id: r for r in section.resources}
         new_res_list = []
         any_affected = False
 
         for res_in in resources_in:
-            if res_in.id and res_in.id in existing_res_map:
-                existing_res = existing_res_map[res_in.id]
-
-                affected = False
-                if (
-                    existing_res.title != res_in.title
-                    or existing_res.url != res_in.url
-                    or existing_res.type != res_in.type
-                    or existing_res.description != res_in.description
-                    or existing_res.duration_minutes != res_in.duration_minutes
-                ):
-                    existing_res.title = res_in.title
-                    existing_res.url = res_in.url
-                    existing_res.type = res_in.type
-                    existing_res.description = res_in.description
-                    existing_res.duration_minutes = res_in.duration_minutes
-                    affected = True
-
-                if affected:
-                    await progress_service.reset_resource_progress(
-                        user_id, existing_res.id
-                    )
-                    any_affected = True
-
+            existing_res = existing_res_map.pop(res_in.id, None) if res_in.id else None
+            if (
+                existing_res is not None
+                and existing_res.fingerprint == res_in.fingerprint()
+            ):
                 new_res_list.append(existing_res)
-                del existing_res_map[res_in.id]
             else:
-                new_res = self._create_resource_entity(res_in)
-                new_res_list.append(new_res)
+                new_res_list.append(self._create_resource_entity(res_in))
                 any_affected = True
 
         if existing_res_map:
             any_affected = True
 
-        section.resources = new_res_list
+        section.resources = self._unique(new_res_list)
         return any_affected
 
     async def delete_study_plan(self, plan_id: UUID) -> None:
@@ -1,8 +1,9 @@
 from uuid import UUID
 
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import col
 
-from app.core.security import hash_password
+from app.core.security import password_hash_pool
 from app.domain.exceptions.base import AlreadyExistsException
 from app.domain.schemas.user import UserCreate
 from app.persistence.model.user import User
@@ -19,13 +20,21 @@ class UserService:
                 f"The user with this email {user_in.email} already exists."
             )
 
-        hashed_password = hash_password(user_in.password)
+        hashed_password = await password_hash_pool.hash(user_in.password)
         user = User(
             email=user_in.email,
             username=user_in.username,
             hashed_password=hashed_password,
         )
-        return await self.user_repository.create(user)
+        # A concurrent signup may take the email after the check above; the
+        # savepoint keeps the request's transaction usable when that happens
+        try:
+            async with self.user_repository.savepoint():
+                return await self.user_repository.create(user)
+        except IntegrityError:
+            raise AlreadyExistsException(
+                f"The user with this email {user_in.email} already exists."
+            ) from None
 
     async def get_user_by_email(self, email: str) -> User | None:
         return await self.user_repository.get_by_email(email)
@@ -9,9 +9,15 @@ from app.api.exception_handlers import (
     pydantic_validation_exception_handler,
 )
 from app.api.router import api_router
+from app.api.routes import metrics
+from app.core.compression import CompressionMiddleware
 from app.core.config import get_settings
-from app.core.database import init_db
+from app.core.database import ReadYourWritesMiddleware, init_db
+from app.core.instrumentation import QueryStatsMiddleware
+from app.core.jobs import get_periodic_tasks
 from app.core.logging import setup_logging
+from app.core.metrics import HttpMetricsMiddleware
+from app.core.watchdog import LoopWatchdogMiddleware, get_loop_watchdog
 from app.domain.exceptions.base import DomainException
 
 settings = get_settings()
@@ -21,10 +27,17 @@ setup_logging()
 @asynccontextmanager
 async def lifespan(app: FastAPI):  # noqa: ARG001
     # Startup
+    if settings.LOOP_WATCHDOG_ENABLED:
+        await get_loop_watchdog().start()
     await init_db()
+    periodic_tasks = get_periodic_tasks()
+    for task in periodic_tasks:
+        task.start()
     yield
     # Shutdown
-    pass
+    for task in periodic_tasks:
+        await task.stop()
+    await get_loop_watchdog().stop()
 
 
 app = FastAPI(
@@ -45,7 +58,15 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_headers=["*"],
     )
 
+app.add_middleware(ReadYourWritesMiddleware)
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(HttpMetricsMiddleware)
+app.add_middleware(LoopWatchdogMiddleware)
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
+if settings.METRICS_ENABLED:
+    app.include_router(metrics.router)
 
 
 @app.get("/")
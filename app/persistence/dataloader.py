@@ -0,0 +1,121 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable, Iterable
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState
+
+BatchLoadFn = Callable[[list[Any]], Awaitable[dict[Any, Any]]]
+
+
+class DataLoader[K: Hashable, V]:
+    """
+    Coalesces `load` calls made in the same event loop tick into one call of
+    `batch_fn` with all their keys, and memoizes the results. `batch_fn`
+    returns a mapping of the keys it found; missing keys resolve to None.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[list[K]], Awaitable[dict[K, V]]],
+        lock: asyncio.Lock,
+    ) -> None:
+        self._batch_fn = batch_fn
+        # Batches of different loaders share the session, never run them at once
+        self._lock = lock
+        self._results: dict[K, asyncio.Future[V | None]] = {}
+        self._queue: list[K] = []
+
+    async def load(self, key: K) -> V | None:
+        future = self._results.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._results[key] = future
+            self._queue.append(key)
+            if len(self._queue) == 1:
+                loop.call_soon(self._dispatch)
+        return await future
+
+    async def load_many(self, keys: Iterable[K]) -> list[V | None]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def clear(self) -> None:
+        # Pending keys keep their futures, their batch is already scheduled
+        self._results = {key: self._results[key] for key in self._queue}
+
+    def _dispatch(self) -> None:
+        keys, self._queue = self._queue, []
+        futures = {key: self._results[key] for key in keys}
+        asyncio.ensure_future(self._run(futures))
+
+    async def _run(self, futures: dict[K, asyncio.Future[V | None]]) -> None:
+        try:
+            async with self._lock:
+                found = await self._batch_fn(list(futures))
+        except BaseException as e:
+            for key, future in futures.items():
+                # Failed keys are not memoized, the next load retries them
+                if self._results.get(key) is future:
+                    del self._results[key]
+                if future.done():
+                    continue
+                if isinstance(e, Exception):
+                    future.set_exception(e)
+                else:
+                    future.cancel()
+            if not isinstance(e, Exception):
+                raise
+            return
+        for key, future in futures.items():
+            if not future.done():
+                future.set_result(found.get(key))
+
+
+class DataLoaderRegistry:
+    """
+    The loaders of one session, and so of one request. Memoized results are
+    dropped whenever the session writes (flush, bulk INSERT/UPDATE/DELETE) or
+    rolls back, so a lookup never returns a row from before a change.
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        self._loaders: dict[Hashable, DataLoader[Any, Any]] = {}
+        self._lock = asyncio.Lock()
+        sync_session = session.sync_session
+        event.listen(sync_session, "after_flush", self._on_flush)
+        event.listen(sync_session, "after_rollback", self._on_rollback)
+        event.listen(sync_session, "do_orm_execute", self._on_execute)
+
+    def get(self, name: Hashable, batch_fn: BatchLoadFn) -> DataLoader[Any, Any]:
+        loader = self._loaders.get(name)
+        if loader is None:
+            loader = DataLoader(batch_fn, self._lock)
+            self._loaders[name] = loader
+        return loader
+
+    def clear(self) -> None:
+        for loader in self._loaders.values():
+            loader.clear()
+
+    def _on_flush(self, _session: Any, _flush_context: Any) -> None:
+        self.clear()
+
+    def _on_rollback(self, _session: Any) -> None:
+        self.clear()
+
+    def _on_execute(self, state: ORMExecuteState) -> None:
+        if state.is_insert or state.is_update or state.is_delete:
+            self.clear()
+
+
+def get_loaders(session: AsyncSession) -> DataLoaderRegistry:
+    """
+    Registry bound to `session`; repositories sharing a session share it.
+    """
+    registry = session.info.get("dataloaders")
+    if registry is None:
+        registry = DataLoaderRegistry(session)
+        session.info["dataloaders"] = registry
+    return registry
@@ -0,0 +1,17 @@
+from sqlalchemy import Table
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def upsert_insert(session: AsyncSession, table: Table) -> sqlite.Insert:
+    """
+    INSERT construct of the session's backend, exposing `on_conflict_do_update`
+    and `on_conflict_do_nothing`. Both dialects share that API, so callers do
+    not need to know which one they got.
+    """
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(table)  # type: ignore[return-value]
+    if dialect == "sqlite":
+        return sqlite.insert(table)
+    raise ValueError(f"Upserts are not supported on the {dialect} dialect")
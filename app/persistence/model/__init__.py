@@ -1,3 +1,4 @@
+from app.persistence.model.analytics import UserDailyActivity
 from app.persistence.model.base import BaseEntity
 from app.persistence.model.links import SectionResourceLink, StudyPlanResourceLink
 from app.persistence.model.progress import (
@@ -5,6 +6,7 @@ from app.persistence.model.progress import (
     SectionProgress,
     StudyPlanProgress,
 )
+from app.persistence.model.progress_event import ProgressEvent
 from app.persistence.model.quiz import (
     Question,
     QuestionOption,
@@ -12,23 +14,29 @@ from app.persistence.model.quiz import (
     QuizUserAnswer,
 )
 from app.persistence.model.resource import Resource
-from app.persistence.model.section import Section
-from app.persistence.model.study_plan import StudyPlan
+from app.persistence.model.section import Section, SectionClosure
+from app.persistence.model.study_plan import StudyPlan, StudyPlanSnapshot
+from app.persistence.model.token import RefreshToken
 from app.persistence.model.user import User
 
 __all__ = [
     "BaseEntity",
+    "ProgressEvent",
     "Question",
     "QuestionOption",
     "Quiz",
     "QuizUserAnswer",
+    "RefreshToken",
     "Resource",
     "ResourceProgress",
     "Section",
+    "SectionClosure",
     "SectionProgress",
     "SectionResourceLink",
     "StudyPlan",
     "StudyPlanProgress",
     "StudyPlanResourceLink",
+    "StudyPlanSnapshot",
     "User",
+    "UserDailyActivity",
 ]
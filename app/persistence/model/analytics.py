@@ -0,0 +1,32 @@
+from datetime import date
+from uuid import UUID
+
+from sqlalchemy import UniqueConstraint
+from sqlmodel import Field
+
+from app.persistence.model.base import BaseEntity
+
+
+class UserDailyActivity(BaseEntity, table=True):
+    """
+    Daily rollup of a user's activity on one study plan. Rows are only ever
+    incremented from status-change and submission events.
+    """
+
+    __tablename__ = "user_daily_activity"  # type: ignore
+    __table_args__ = (UniqueConstraint("user_id", "study_plan_id", "day"),)
+
+    user_id: UUID = Field(foreign_key="user.id")
+    study_plan_id: UUID = Field(foreign_key="study_plan.id")
+    day: date
+
+    resources_completed: int = Field(default=0)
+    minutes_studied: int = Field(default=0)
+    quiz_attempts: int = Field(default=0)
+    quiz_score_total: float = Field(default=0.0)
+
+    @property
+    def mean_quiz_score(self) -> float | None:
+        if not self.quiz_attempts:
+            return None
+        return self.quiz_score_total / self.quiz_attempts
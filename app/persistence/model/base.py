@@ -1,21 +1,58 @@
 from datetime import UTC, datetime
+from typing import Any
 from uuid import UUID, uuid4
 
-from sqlalchemy import func
+from sqlalchemy import DateTime, Dialect, func
+from sqlalchemy.types import TypeDecorator
 from sqlmodel import Field, SQLModel
 
 
+class UTCDateTime(TypeDecorator[datetime]):
+    """
+    Timezone-aware datetime, stored in and always loaded as UTC. SQLite keeps
+    no offset, so without this its rows would load naive while the objects
+    created in the session stay aware, and serialize differently.
+    """
+
+    impl = DateTime(timezone=True)
+    cache_ok = True
+
+    def process_bind_param(
+        self,
+        value: datetime | None,
+        dialect: Dialect,  # noqa: ARG002
+    ) -> datetime | None:
+        if value is not None and value.tzinfo is not None:
+            return value.astimezone(UTC)
+        return value
+
+    def process_result_value(
+        self,
+        value: Any | None,
+        dialect: Dialect,  # noqa: ARG002
+    ) -> datetime | None:
+        if value is None:
+            return None
+        if value.tzinfo is None:
+            return value.replace(tzinfo=UTC)
+        return value.astimezone(UTC)
+
+
 class BaseEntity(SQLModel):
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     active: bool = Field(default=True, index=True)
     created_at: datetime = Field(
         default_factory=lambda: datetime.now(UTC),
+        sa_type=UTCDateTime,
         sa_column_kwargs={"server_default": func.now()},
     )
     updated_at: datetime = Field(
         default_factory=lambda: datetime.now(UTC),
+        sa_type=UTCDateTime,
+        # Stamped client-side on UPDATE so the flushed value stays loaded and
+        # does not have to be read back
         sa_column_kwargs={
-            "onupdate": func.now(),
+            "onupdate": lambda: datetime.now(UTC),
             "server_default": func.now(),
         },
     )
@@ -2,10 +2,11 @@ from datetime import datetime
 from typing import TYPE_CHECKING
 from uuid import UUID
 
+from sqlalchemy import UniqueConstraint
 from sqlmodel import Field, Relationship
 
 from app.domain.enums import CompletionStatus
-from app.persistence.model.base import BaseEntity
+from app.persistence.model.base import BaseEntity, UTCDateTime
 
 if TYPE_CHECKING:
     from app.persistence.model.resource import Resource
@@ -16,10 +17,17 @@ if TYPE_CHECKING:
 
 class StudyPlanProgress(BaseEntity, table=True):
     __tablename__ = "study_plan_progress"  # type: ignore
+    __table_args__ = (UniqueConstraint("user_id", "study_plan_id"),)
 
     status: CompletionStatus = Field(default=CompletionStatus.NOT_STARTED)
     progress: float = Field(default=0.0)  # 0.0 to 1.0
-    completed_at: datetime | None = None
+    completed_at: datetime | None = Field(
+        default=None,
+        sa_type=UTCDateTime,
+    )
+
+    # Version of the plan the section and resource rows were built against
+    plan_version: int = Field(default=1)
 
     user_id: UUID = Field(foreign_key="user.id")
     study_plan_id: UUID = Field(foreign_key="study_plan.id")
@@ -35,10 +43,14 @@ class StudyPlanProgress(BaseEntity, table=True):
 
 class SectionProgress(BaseEntity, table=True):
     __tablename__ = "section_progress"  # type: ignore
+    __table_args__ = (UniqueConstraint("study_plan_progress_id", "section_id"),)
 
     status: CompletionStatus = Field(default=CompletionStatus.NOT_STARTED)
     progress: float = Field(default=0.0)
-    completed_at: datetime | None = None
+    completed_at: datetime | None = Field(
+        default=None,
+        sa_type=UTCDateTime,
+    )
 
     user_id: UUID = Field(foreign_key="user.id")
     section_id: UUID = Field(foreign_key="section.id")
@@ -58,9 +70,13 @@ class SectionProgress(BaseEntity, table=True):
 
 class ResourceProgress(BaseEntity, table=True):
     __tablename__ = "resource_progress"  # type: ignore
+    __table_args__ = (UniqueConstraint("section_progress_id", "resource_id"),)
 
     status: CompletionStatus = Field(default=CompletionStatus.NOT_STARTED)
-    completed_at: datetime | None = None
+    completed_at: datetime | None = Field(
+        default=None,
+        sa_type=UTCDateTime,
+    )
 
     user_id: UUID = Field(foreign_key="user.id")
     resource_id: UUID = Field(foreign_key="resource.id")
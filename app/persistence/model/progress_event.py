@@ -0,0 +1,35 @@
+from datetime import UTC, datetime
+from uuid import UUID
+
+from sqlalchemy import Index
+from sqlmodel import Field, SQLModel
+
+from app.domain.enums import CompletionStatus
+from app.persistence.model.base import UTCDateTime
+
+
+class ProgressEvent(SQLModel, table=True):
+    """
+    Append-only log of resource status changes. Rows are never updated;
+    `ResourceProgress` and its parents are a projection of this log.
+    """
+
+    __tablename__ = "progress_event"  # type: ignore
+    __table_args__ = (
+        # Replays read a plan's events in (occurred_at, id) order
+        Index(
+            "ix_progress_event_study_plan_progress_id_occurred_at",
+            "study_plan_progress_id",
+            "occurred_at",
+            "id",
+        ),
+    )
+
+    id: int | None = Field(default=None, primary_key=True)
+    study_plan_progress_id: UUID
+    resource_progress_id: UUID
+    status: CompletionStatus
+    occurred_at: datetime = Field(
+        default_factory=lambda: datetime.now(UTC),
+        sa_type=UTCDateTime,
+    )
@@ -1,10 +1,11 @@
-from datetime import UTC, datetime
+from datetime import UTC, datetime, timedelta
 from typing import TYPE_CHECKING
 from uuid import UUID
 
+from sqlalchemy import Index, event
 from sqlmodel import Field, Relationship
 
-from app.persistence.model.base import BaseEntity
+from app.persistence.model.base import BaseEntity, UTCDateTime
 
 if TYPE_CHECKING:
     from app.persistence.model.study_plan import StudyPlan
@@ -13,15 +14,39 @@ if TYPE_CHECKING:
 
 class Quiz(BaseEntity, table=True):
     __tablename__ = "quiz"  # type: ignore
+    # A user's quizzes on a plan, newest first
+    __table_args__ = (
+        Index(
+            "ix_quiz_study_plan_id_user_id_created_at",
+            "study_plan_id",
+            "user_id",
+            "created_at",
+        ),
+    )
     study_plan_id: UUID = Field(foreign_key="study_plan.id")
+    # Version of the plan the quiz was generated for
+    plan_version: int = Field(default=1)
     user_id: UUID = Field(foreign_key="user.id")
     title: str
     difficulty: float
     duration_minutes: int
 
     # Attempts attributes
-    started_at: datetime | None = Field(default_factory=lambda: datetime.now(UTC))
-    completed_at: datetime | None = None
+    # No column-level default: a quiz saved with `started_at=None` stays unstarted
+    started_at: datetime | None = Field(
+        default_factory=lambda: datetime.now(UTC),
+        sa_type=UTCDateTime,
+        sa_column_kwargs={"default": None},
+    )
+    expires_at: datetime | None = Field(
+        default=None,
+        index=True,
+        sa_type=UTCDateTime,
+    )
+    completed_at: datetime | None = Field(
+        default=None,
+        sa_type=UTCDateTime,
+    )
     score: float | None = None
 
     # Relationships
@@ -34,18 +59,34 @@ class Quiz(BaseEntity, table=True):
         back_populates="quiz", sa_relationship_kwargs={"cascade": "all, delete"}
     )
 
-    @property
-    def is_expired(self) -> bool:
-        if not self.started_at or self.completed_at:
-            return False
+    def compute_expires_at(self) -> datetime | None:
+        if not self.started_at:
+            return None
 
         started_at = self.started_at
         if started_at.tzinfo is None:
             started_at = started_at.replace(tzinfo=UTC)
+        return started_at + timedelta(minutes=self.duration_minutes)
+
+    @property
+    def is_expired(self) -> bool:
+        if self.completed_at:
+            return False
+
+        expires_at = self.expires_at or self.compute_expires_at()
+        if not expires_at:
+            return False
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=UTC)
+        return datetime.now(UTC) > expires_at
+
 
-        now = datetime.now(UTC)
-        elapsed = (now - started_at).total_seconds()
-        return elapsed > (self.duration_minutes * 60)
+@event.listens_for(Quiz, "before_insert")
+@event.listens_for(Quiz, "before_update")
+def _persist_quiz_expiry(_mapper, _connection, target: Quiz) -> None:
+    # Keep `expires_at` in step with `started_at` so expiry can be queried in SQL
+    if target.expires_at is None:
+        target.expires_at = target.compute_expires_at()
 
 
 class Question(BaseEntity, table=True):
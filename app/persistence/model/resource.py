@@ -20,6 +20,9 @@ class Resource(BaseEntity, table=True):
     url: str | None = None
     description: str | None = None
     duration_minutes: int | None = None
+    # `ResourceCreate.fingerprint` of the content. Rows are shared between
+    # plans and never updated: editing a resource links the new content.
+    fingerprint: str = Field(unique=True)
 
     study_plans: list["StudyPlan"] = Relationship(
         back_populates="resources", link_model=StudyPlanResourceLink
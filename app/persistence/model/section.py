@@ -1,7 +1,8 @@
 from typing import TYPE_CHECKING
 from uuid import UUID
 
-from sqlmodel import Field, Relationship
+from sqlalchemy import Index
+from sqlmodel import Field, Relationship, SQLModel
 
 from app.persistence.model.base import BaseEntity
 from app.persistence.model.links import SectionResourceLink
@@ -20,8 +21,11 @@ class Section(BaseEntity, table=True):
     order: int = 0
 
     # Foreign Keys
-    study_plan_id: UUID | None = Field(default=None, foreign_key="study_plan.id")
-    parent_id: UUID | None = Field(default=None, foreign_key="section.id")
+    # Indexed for loading a plan's sections and a section's children
+    study_plan_id: UUID | None = Field(
+        default=None, foreign_key="study_plan.id", index=True
+    )
+    parent_id: UUID | None = Field(default=None, foreign_key="section.id", index=True)
 
     # Relationships
     study_plan: "StudyPlan" = Relationship(back_populates="sections")
@@ -35,3 +39,28 @@ class Section(BaseEntity, table=True):
     )
 
     progresses: list["SectionProgress"] = Relationship(back_populates="section")
+
+
+class SectionClosure(SQLModel, table=True):
+    """
+    One row per section and each of its ancestors, the section itself
+    included at depth 0, so the ancestors or the whole subtree of a section
+    are one indexed query instead of a walk over `parent_id`. Sections never
+    move to another parent, so rows are only inserted and deleted.
+    """
+
+    __tablename__ = "section_closure"  # type: ignore
+    # The primary key serves descendants, this covering index ancestors in
+    # order, nearest first
+    __table_args__ = (
+        Index(
+            "ix_section_closure_descendant_id_depth",
+            "descendant_id",
+            "depth",
+            "ancestor_id",
+        ),
+    )
+
+    ancestor_id: UUID = Field(foreign_key="section.id", primary_key=True)
+    descendant_id: UUID = Field(foreign_key="section.id", primary_key=True)
+    depth: int
@@ -1,6 +1,7 @@
 from typing import TYPE_CHECKING
 from uuid import UUID
 
+from sqlalchemy import Index, LargeBinary, UniqueConstraint
 from sqlmodel import Field, Relationship
 
 from app.persistence.model.base import BaseEntity
@@ -16,16 +17,32 @@ if TYPE_CHECKING:
 
 class StudyPlan(BaseEntity, table=True):
     __tablename__ = "study_plan"  # type: ignore
+    # A user's plans, newest first
+    __table_args__ = (
+        Index("ix_study_plan_user_id_created_at", "user_id", "created_at"),
+    )
 
     title: str
     description: str
+    # Bumped by every edit of the plan; each version has one immutable
+    # `StudyPlanSnapshot`
+    version: int = Field(default=1)
 
     user_id: UUID = Field(foreign_key="user.id")
     user: "User" = Relationship(back_populates="study_plans")
 
     forked_from_id: UUID | None = Field(default=None, foreign_key="study_plan.id")
     forked_from: "StudyPlan" = Relationship(
-        sa_relationship_kwargs={"remote_side": "StudyPlan.id"}
+        sa_relationship_kwargs={
+            "remote_side": "StudyPlan.id",
+            "foreign_keys": "StudyPlan.forked_from_id",
+        }
+    )
+    # A fork shows the sections and resources of this plan, the one owning
+    # them, until its tree is first edited. Indexed for finding the forks
+    # sharing a plan's tree.
+    tree_source_id: UUID | None = Field(
+        default=None, foreign_key="study_plan.id", index=True
     )
 
     sections: list["Section"] = Relationship(back_populates="study_plan")
@@ -35,3 +52,14 @@ class StudyPlan(BaseEntity, table=True):
     quizzes: list["Quiz"] = Relationship(back_populates="study_plan")
 
     progresses: list["StudyPlanProgress"] = Relationship(back_populates="study_plan")
+
+
+class StudyPlanSnapshot(BaseEntity, table=True):
+    __tablename__ = "study_plan_snapshot"  # type: ignore
+    __table_args__ = (UniqueConstraint("study_plan_id", "version"),)
+
+    study_plan_id: UUID = Field(foreign_key="study_plan.id")
+    version: int
+    # The plan's read model at this version as gzipped JSON, written the
+    # first time the version is read and never changed
+    content: bytes = Field(sa_type=LargeBinary)  # type: ignore
@@ -2,9 +2,10 @@ from datetime import datetime
 from typing import TYPE_CHECKING
 from uuid import UUID
 
+from sqlalchemy import Index, LargeBinary
 from sqlmodel import Field, Relationship
 
-from app.persistence.model.base import BaseEntity
+from app.persistence.model.base import BaseEntity, UTCDateTime
 
 if TYPE_CHECKING:
     from app.persistence.model.user import User
@@ -12,10 +13,17 @@ if TYPE_CHECKING:
 
 class RefreshToken(BaseEntity, table=True):
     __tablename__ = "refresh_token"  # type: ignore
+    __table_args__ = (
+        Index("ix_refresh_token_user_id_revoked_at", "user_id", "revoked_at"),
+    )
 
-    token: str = Field(index=True, unique=True)
-    expires_at: datetime
-    revoked_at: datetime | None = None
+    # SHA-256 digest of the token handed to the client, never the token itself
+    token_hash: bytes = Field(sa_type=LargeBinary(32), unique=True)
+    expires_at: datetime = Field(index=True, sa_type=UTCDateTime)
+    revoked_at: datetime | None = Field(
+        default=None,
+        sa_type=UTCDateTime,
+    )
 
     user_id: UUID = Field(foreign_key="user.id")
     user: "User" = Relationship(back_populates="refresh_tokens")
@@ -0,0 +1,96 @@
+from datetime import date
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import col
+
+from app.persistence.dialect import upsert_insert
+from app.persistence.model.analytics import UserDailyActivity
+from app.persistence.model.resource import Resource
+from app.persistence.repository.base import BaseRepository
+
+_COUNTERS = (
+    "resources_completed",
+    "minutes_studied",
+    "quiz_attempts",
+    "quiz_score_total",
+)
+
+
+class AnalyticsRepository(BaseRepository[UserDailyActivity]):
+    def __init__(self, session: AsyncSession):
+        super().__init__(session, UserDailyActivity)
+
+    async def increment_daily_activity(
+        self, user_id: UUID, study_plan_id: UUID, day: date, **deltas: float
+    ) -> None:
+        """
+        Add `deltas` to the rollup row for (user, plan, day), creating it if
+        needed, in a single upsert statement.
+        """
+        unknown = set(deltas) - set(_COUNTERS)
+        if unknown:
+            raise ValueError(f"Unknown activity counters: {sorted(unknown)}")
+
+        table = UserDailyActivity.__table__  # type: ignore[attr-defined]
+        statement = upsert_insert(self.session, table).values(
+            user_id=user_id, study_plan_id=study_plan_id, day=day, **deltas
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=["user_id", "study_plan_id", "day"],
+            set_={name: table.c[name] + statement.excluded[name] for name in deltas},
+        )
+        await self.session.execute(statement)
+
+    async def get_daily_activity(
+        self,
+        user_id: UUID,
+        start: date,
+        end: date,
+        study_plan_id: UUID | None = None,
+    ) -> list[UserDailyActivity]:
+        statement = (
+            select(UserDailyActivity)
+            .where(
+                col(UserDailyActivity.user_id) == user_id,
+                col(UserDailyActivity.day) >= start,
+                col(UserDailyActivity.day) <= end,
+            )
+            .order_by(col(UserDailyActivity.day))
+        )
+        if study_plan_id is not None:
+            statement = statement.where(
+                col(UserDailyActivity.study_plan_id) == study_plan_id
+            )
+        result = await self.session.execute(statement)
+        return list(result.scalars().all())
+
+    async def get_plan_totals(
+        self, user_id: UUID, start: date, end: date
+    ) -> list[dict[str, Any]]:
+        statement = (
+            select(
+                col(UserDailyActivity.study_plan_id),
+                *(
+                    func.sum(getattr(UserDailyActivity, name)).label(name)
+                    for name in _COUNTERS
+                ),
+            )
+            .where(
+                col(UserDailyActivity.user_id) == user_id,
+                col(UserDailyActivity.day) >= start,
+                col(UserDailyActivity.day) <= end,
+            )
+            .group_by(col(UserDailyActivity.study_plan_id))
+        )
+        result = await self.session.execute(statement)
+        return [dict(row) for row in result.mappings().all()]
+
+    async def get_resource_duration(self, resource_id: UUID) -> int | None:
+        statement = select(col(Resource.duration_minutes)).where(
+            col(Resource.id) == resource_id
+        )
+        result = await self.session.execute(statement)
+        return result.scalar_one_or_none()
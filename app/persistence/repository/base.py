@@ -1,9 +1,11 @@
 from typing import Any, TypeVar
 
-from sqlalchemy import delete, func, select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import delete, func, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncSessionTransaction
+from sqlalchemy.orm.util import identity_key
 from sqlmodel import SQLModel, col
 
+from app.persistence.dataloader import get_loaders
 from app.persistence.model.base import BaseEntity
 
 ModelType = TypeVar("ModelType", bound=BaseEntity)
@@ -14,19 +16,49 @@ class BaseRepository[ModelType: BaseEntity]:
         self.session = session
         self.model = model
 
+    # Repositories only flush; the unit of work around the request (or job)
+    # commits once at the end, see `app.core.database.unit_of_work`.
+
+    async def commit(self) -> None:
+        """
+        Commit right away, for writes that must persist even if the rest of
+        the request fails, or to bound the size of long batch jobs.
+        """
+        await self.session.commit()
+
+    def savepoint(self) -> AsyncSessionTransaction:
+        """
+        SAVEPOINT as an async context manager: if the block raises, only its
+        changes are rolled back and the request's transaction stays usable.
+        """
+        return self.session.begin_nested()
+
     async def create(self, obj_in: ModelType) -> ModelType:
         self.session.add(obj_in)
-        await self.session.commit()
-        await self.session.refresh(obj_in)
+        await self.session.flush()
         return obj_in
 
     async def create_batch(self, objs_in: list[ModelType]) -> list[ModelType]:
         self.session.add_all(objs_in)
-        await self.session.commit()
+        await self.session.flush()
         return objs_in
 
     async def get_by_id(self, id: Any) -> ModelType | None:
-        return await self.session.get(self.model, id)
+        loaded = self.session.identity_map.get(identity_key(self.model, id))
+        if loaded is not None and not inspect(loaded).expired:
+            return loaded
+        # Lookups issued together within a request share one IN (...) query
+        loader = get_loaders(self.session).get((self.model, "id"), self._get_by_ids)
+        return await loader.load(id)
+
+    async def get_by_ids(self, ids: list[Any]) -> list[ModelType | None]:
+        loader = get_loaders(self.session).get((self.model, "id"), self._get_by_ids)
+        return await loader.load_many(ids)
+
+    async def _get_by_ids(self, ids: list[Any]) -> dict[Any, ModelType]:
+        statement = select(self.model).where(col(self.model.id).in_(ids))
+        result = await self.session.execute(statement)
+        return {obj.id: obj for obj in result.scalars().all()}
 
     async def get(
         self, *where_clauses: Any, skip: int = 0, limit: int = 100
@@ -58,15 +90,14 @@ class BaseRepository[ModelType: BaseEntity]:
                 setattr(db_obj, field, value)
 
         self.session.add(db_obj)
-        await self.session.commit()
-        await self.session.refresh(db_obj)
+        await self.session.flush()
         return db_obj
 
     async def delete(self, id: Any) -> bool:
         db_obj = await self.get_by_id(id)
         if db_obj:
             await self.session.delete(db_obj)
-            await self.session.commit()
+            await self.session.flush()
             return True
         return False
 
@@ -75,9 +106,8 @@ class BaseRepository[ModelType: BaseEntity]:
             return
         statement = delete(self.model).where(col(self.model.id).in_(ids))
         await self.session.execute(statement)
-        await self.session.commit()
 
     async def soft_delete(self, db_obj: ModelType) -> None:
         db_obj.active = False
         self.session.add(db_obj)
-        await self.session.commit()
+        await self.session.flush()
@@ -1,15 +1,21 @@
-from uuid import UUID
+from datetime import datetime
+from typing import Any
+from uuid import UUID, uuid4
 
-from sqlalchemy import select
+from sqlalchemy import case, delete, exists, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from sqlmodel import col
 
+from app.domain.enums import CompletionStatus
+from app.persistence.dataloader import DataLoader, get_loaders
+from app.persistence.dialect import upsert_insert
 from app.persistence.model.progress import (
     ResourceProgress,
     SectionProgress,
     StudyPlanProgress,
 )
+from app.persistence.model.progress_event import ProgressEvent
 from app.persistence.repository.base import BaseRepository
 
 
@@ -20,9 +26,17 @@ class ProgressRepository:
         self.section = BaseRepository(session, SectionProgress)
         self.resource = BaseRepository(session, ResourceProgress)
 
+    async def commit(self) -> None:
+        await self.study_plan.commit()
+
     async def get_study_plan_progress(
-        self, user_id: UUID, study_plan_id: UUID
+        self, user_id: UUID, study_plan_id: UUID, refresh: bool = False
     ) -> StudyPlanProgress | None:
+        """
+        Progress of (user, plan) with its section and resource rows. With
+        `refresh`, rows already in the session are overwritten with what was
+        loaded, for after they were changed by bulk statements.
+        """
         statement = (
             select(StudyPlanProgress)
             .where(
@@ -34,39 +48,249 @@ class ProgressRepository:
                     SectionProgress.resource_progresses  # type: ignore
                 )
             )
+            .execution_options(populate_existing=refresh)
         )
         result = await self.session.execute(statement)
         return result.scalars().first()
 
+    async def get_study_plan_progress_id(
+        self, user_id: UUID, study_plan_id: UUID
+    ) -> UUID | None:
+        statement = select(col(StudyPlanProgress.id)).where(
+            col(StudyPlanProgress.user_id) == user_id,
+            col(StudyPlanProgress.study_plan_id) == study_plan_id,
+        )
+        result = await self.session.execute(statement)
+        return result.scalar_one_or_none()
+
     async def get_section_progress(
-        self, user_id: UUID, section_id: UUID
+        self, study_plan_progress_id: UUID, section_id: UUID
     ) -> SectionProgress | None:
-        statement = (
-            select(SectionProgress)
+        loader = self._section_progress_loader(study_plan_progress_id)
+        return await loader.load(section_id)
+
+    async def get_section_progresses(
+        self, study_plan_progress_id: UUID, section_ids: list[UUID]
+    ) -> list[SectionProgress | None]:
+        loader = self._section_progress_loader(study_plan_progress_id)
+        return await loader.load_many(section_ids)
+
+    def _section_progress_loader(
+        self, study_plan_progress_id: UUID
+    ) -> DataLoader[UUID, SectionProgress]:
+        # Scoped to the plan progress rather than the user: a fork shows the
+        # sections of its source, so a user following both has two progresses
+        # on the same section
+        async def load(section_ids: list[UUID]) -> dict[UUID, SectionProgress]:
+            statement = (
+                select(SectionProgress)
+                .where(
+                    col(SectionProgress.study_plan_progress_id)
+                    == study_plan_progress_id,
+                    col(SectionProgress.section_id).in_(section_ids),
+                )
+                .options(selectinload(SectionProgress.resource_progresses))  # type: ignore
+            )
+            result = await self.session.execute(statement)
+            return {sp.section_id: sp for sp in result.scalars().all()}
+
+        return get_loaders(self.session).get(
+            (SectionProgress, study_plan_progress_id), load
+        )
+
+    async def move_section_progress(
+        self, study_plan_id: UUID, section_ids: dict[UUID, UUID]
+    ) -> None:
+        """
+        Point the section progress of every user of a plan from the old to
+        the new ids of `section_ids`, in one UPDATE.
+        """
+        if not section_ids:
+            return
+        plan_progress_ids = select(col(StudyPlanProgress.id)).where(
+            col(StudyPlanProgress.study_plan_id) == study_plan_id
+        )
+        await self.session.execute(
+            update(SectionProgress)
             .where(
-                col(SectionProgress.user_id) == user_id,
-                col(SectionProgress.section_id) == section_id,
+                col(SectionProgress.study_plan_progress_id).in_(plan_progress_ids),
+                col(SectionProgress.section_id).in_(list(section_ids)),
+            )
+            .values(section_id=case(section_ids, value=col(SectionProgress.section_id)))
+        )
+
+    async def delete_section_progress(self, section_ids: list[UUID]) -> None:
+        """
+        Delete the progress of every user on the sections `section_ids`, with
+        its resource progress.
+        """
+        if not section_ids:
+            return
+        section_progress_ids = select(col(SectionProgress.id)).where(
+            col(SectionProgress.section_id).in_(section_ids)
+        )
+        await self.session.execute(
+            delete(ResourceProgress).where(
+                col(ResourceProgress.section_progress_id).in_(section_progress_ids)
+            )
+        )
+        await self.session.execute(
+            delete(SectionProgress).where(
+                col(SectionProgress.section_id).in_(section_ids)
             )
-            .options(selectinload(SectionProgress.resource_progresses))  # type: ignore
         )
-        result = await self.session.execute(statement)
-        return result.scalars().first()
 
     async def get_resource_progress(
-        self, user_id: UUID, resource_id: UUID
+        self, section_progress_id: UUID, resource_id: UUID
     ) -> ResourceProgress | None:
-        statement = select(ResourceProgress).where(
-            col(ResourceProgress.user_id) == user_id,
-            col(ResourceProgress.resource_id) == resource_id,
+        async def load(resource_ids: list[UUID]) -> dict[UUID, ResourceProgress]:
+            statement = select(ResourceProgress).where(
+                col(ResourceProgress.section_progress_id) == section_progress_id,
+                col(ResourceProgress.resource_id).in_(resource_ids),
+            )
+            result = await self.session.execute(statement)
+            return {rp.resource_id: rp for rp in result.scalars().all()}
+
+        loader = get_loaders(self.session).get(
+            (ResourceProgress, section_progress_id), load
         )
-        result = await self.session.execute(statement)
-        return result.scalars().first()
+        return await loader.load(resource_id)
 
     async def get_or_create_study_plan_progress(
         self, user_id: UUID, study_plan_id: UUID
     ) -> StudyPlanProgress:
+        await self.create_study_plan_progress_if_missing(user_id, study_plan_id)
         progress = await self.get_study_plan_progress(user_id, study_plan_id)
         if not progress:
-            progress = StudyPlanProgress(user_id=user_id, study_plan_id=study_plan_id)
-            progress = await self.study_plan.create(progress)
+            raise ValueError("Failed to create study plan progress")
         return progress
+
+    async def create_study_plan_progress_if_missing(
+        self, user_id: UUID, study_plan_id: UUID, plan_version: int = 1
+    ) -> UUID | None:
+        """
+        Insert the progress row of (user, plan) unless it already exists,
+        built against `plan_version` of the plan. Returns the new id, or None
+        when the row was there (possibly created by a concurrent request) and
+        nothing was inserted.
+        """
+        table = StudyPlanProgress.__table__  # type: ignore[attr-defined]
+        statement = (
+            upsert_insert(self.session, table)
+            .values(
+                id=uuid4(),
+                user_id=user_id,
+                study_plan_id=study_plan_id,
+                plan_version=plan_version,
+            )
+            .on_conflict_do_nothing(index_elements=["user_id", "study_plan_id"])
+            .returning(table.c.id)
+        )
+        result = await self.session.execute(statement)
+        created_id = result.scalar_one_or_none()
+        return created_id
+
+    async def insert_missing_progress(
+        self,
+        sections: list[SectionProgress],
+        resources: list[ResourceProgress],
+    ) -> None:
+        """
+        Bulk insert section and resource progress rows, skipping the ones that
+        already exist for the same section or resource.
+        """
+        for model, rows, index_elements in (
+            (SectionProgress, sections, ["study_plan_progress_id", "section_id"]),
+            (ResourceProgress, resources, ["section_progress_id", "resource_id"]),
+        ):
+            if not rows:
+                continue
+            table = model.__table__  # type: ignore[attr-defined]
+            statement = upsert_insert(self.session, table).on_conflict_do_nothing(
+                index_elements=index_elements
+            )
+            await self.session.execute(
+                statement, [row.model_dump(include=set(table.c.keys())) for row in rows]
+            )
+
+    async def append_events(self, events: list[dict[str, Any]]) -> None:
+        """
+        Append progress events in one multi-row INSERT.
+        """
+        if not events:
+            return
+        await self.session.execute(insert(ProgressEvent), events)
+
+    async def seed_missing_events(self, limit: int = 500) -> int:
+        """
+        Append an event for up to `limit` started resource progresses that have
+        none, as progress recorded before the event log existed, with their
+        current status at `completed_at`, or `updated_at` when not completed.
+        Returns how many were seeded.
+        """
+        logged = exists().where(
+            col(ProgressEvent.study_plan_progress_id)
+            == col(SectionProgress.study_plan_progress_id),
+            col(ProgressEvent.resource_progress_id) == col(ResourceProgress.id),
+        )
+        statement = (
+            select(
+                col(SectionProgress.study_plan_progress_id),
+                col(ResourceProgress.id),
+                col(ResourceProgress.status),
+                col(ResourceProgress.completed_at),
+                col(ResourceProgress.updated_at),
+            )
+            .join(
+                SectionProgress,
+                col(SectionProgress.id) == col(ResourceProgress.section_progress_id),
+            )
+            .where(
+                col(ResourceProgress.status) != CompletionStatus.NOT_STARTED,
+                ~logged,
+            )
+            .limit(limit)
+        )
+        rows = (await self.session.execute(statement)).all()
+        await self.append_events(
+            [
+                {
+                    "study_plan_progress_id": study_plan_progress_id,
+                    "resource_progress_id": resource_progress_id,
+                    "status": status,
+                    "occurred_at": completed_at or updated_at,
+                }
+                for (
+                    study_plan_progress_id,
+                    resource_progress_id,
+                    status,
+                    completed_at,
+                    updated_at,
+                ) in rows
+            ]
+        )
+        return len(rows)
+
+    async def replay_resource_statuses(
+        self, study_plan_progress_id: UUID
+    ) -> dict[UUID, tuple[CompletionStatus, datetime]]:
+        """
+        Stream the event log of a study plan progress in the order the changes
+        happened and fold it into the latest (status, occurred_at) per
+        resource progress. The id only breaks ties: ids are not assigned in
+        commit order across concurrent transactions.
+        """
+        statement = (
+            select(
+                col(ProgressEvent.resource_progress_id),
+                col(ProgressEvent.status),
+                col(ProgressEvent.occurred_at),
+            )
+            .where(col(ProgressEvent.study_plan_progress_id) == study_plan_progress_id)
+            .order_by(col(ProgressEvent.occurred_at), col(ProgressEvent.id))
+        )
+        latest: dict[UUID, tuple[CompletionStatus, datetime]] = {}
+        result = await self.session.stream(statement)
+        async for resource_progress_id, status, occurred_at in result:
+            latest[resource_progress_id] = (status, occurred_at)
+        return latest
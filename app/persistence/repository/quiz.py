@@ -1,27 +1,41 @@
+from collections.abc import Sequence
+from datetime import UTC, datetime, timedelta
+from typing import Any
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import RowMapping, and_, case, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlmodel import col
 
-from app.persistence.model.quiz import Question, Quiz, QuizUserAnswer
+from app.domain.enums import QuizState
+from app.persistence.model.quiz import Question, QuestionOption, Quiz, QuizUserAnswer
 from app.persistence.repository.base import BaseRepository
 
 
+def _state_clause(state: QuizState, now: datetime) -> Any:
+    if state == QuizState.NOT_STARTED:
+        return col(Quiz.started_at).is_(None)
+    if state == QuizState.COMPLETED:
+        return col(Quiz.completed_at).is_not(None)
+    if state == QuizState.ACTIVE:
+        return and_(col(Quiz.completed_at).is_(None), col(Quiz.expires_at) > now)
+    return and_(col(Quiz.completed_at).is_(None), col(Quiz.expires_at) <= now)
+
+
 class QuizRepository(BaseRepository[Quiz]):
     def __init__(self, session: AsyncSession):
         super().__init__(session, Quiz)
 
     async def save(self, quiz: Quiz) -> Quiz:
         self.session.add(quiz)
-        await self.session.commit()
-        await self.session.refresh(quiz)
+        await self.session.flush()
         return quiz
 
     async def save_answers(self, answers: list[QuizUserAnswer]) -> None:
         self.session.add_all(answers)
-        await self.session.commit()
+        await self.session.flush()
 
     async def get_by_plan_and_user(self, plan_id: UUID, user_id: UUID) -> Quiz | None:
         statement = (
@@ -44,11 +58,131 @@ class QuizRepository(BaseRepository[Quiz]):
         result = await self.session.execute(statement)
         return result.scalars().first()
 
-    async def list_by_plan_and_user(self, plan_id: UUID, user_id: UUID) -> list[Quiz]:
+    async def get_public_questions(self, quiz_id: UUID) -> Sequence[RowMapping]:
+        """
+        Column-pruned question rows for a quiz, with the number of correct
+        options counted in SQL so the answer key is never loaded.
+        """
+        correct_answer_count = func.coalesce(
+            func.sum(case((col(QuestionOption.is_correct), 1), else_=0)), 0
+        )
+        statement = (
+            select(
+                col(Question.id),
+                col(Question.title),
+                col(Question.description),
+                col(Question.order),
+                correct_answer_count.label("correct_answer_count"),
+            )
+            .outerjoin(
+                QuestionOption, col(QuestionOption.question_id) == col(Question.id)
+            )
+            .where(col(Question.quiz_id) == quiz_id)
+            .group_by(col(Question.id))
+            .order_by(col(Question.order))
+        )
+        result = await self.session.execute(statement)
+        return result.mappings().all()
+
+    async def get_public_options(self, quiz_id: UUID) -> Sequence[RowMapping]:
+        """
+        Option id/text pairs for every question of a quiz, without `is_correct`,
+        ordered by text.
+        """
+        statement = (
+            select(
+                col(QuestionOption.id),
+                col(QuestionOption.question_id),
+                col(QuestionOption.text),
+            )
+            .join(Question, col(Question.id) == col(QuestionOption.question_id))
+            .where(col(Question.quiz_id) == quiz_id)
+            .order_by(col(QuestionOption.text), col(QuestionOption.id))
+        )
+        result = await self.session.execute(statement)
+        return result.mappings().all()
+
+    async def list_by_plan_and_user(
+        self, plan_id: UUID, user_id: UUID, state: QuizState | None = None
+    ) -> list[Quiz]:
         statement = (
             select(Quiz)
             .where(col(Quiz.study_plan_id) == plan_id, col(Quiz.user_id) == user_id)
             .order_by(col(Quiz.created_at).desc())
         )
+        if state is not None:
+            statement = statement.where(_state_clause(state, datetime.now(UTC)))
+        result = await self.session.execute(statement)
+        return list(result.scalars().all())
+
+    async def get_expired_open(self, now: datetime, limit: int = 100) -> list[Quiz]:
+        statement = (
+            select(Quiz)
+            .where(_state_clause(QuizState.EXPIRED, now))
+            .order_by(col(Quiz.expires_at))
+            .limit(limit)
+            .options(
+                selectinload(Quiz.questions).selectinload(Question.options),  # type: ignore
+                selectinload(Quiz.user_answers),  # type: ignore
+            )
+        )
         result = await self.session.execute(statement)
         return list(result.scalars().all())
+
+    async def close_expired(
+        self, quizzes: list[Quiz], scores: dict[UUID, float]
+    ) -> list[Quiz]:
+        """
+        Close those of `quizzes` that are still open, at their expiry and with
+        their score from `scores`, in one statement. Returns the quizzes closed
+        here: one closed in between, by its user or a sweep in another worker,
+        is left as it is.
+        """
+        if not quizzes:
+            return []
+        now = datetime.now(UTC)
+        result = await self.session.execute(
+            update(Quiz)
+            .where(
+                col(Quiz.id).in_([quiz.id for quiz in quizzes]),
+                col(Quiz.completed_at).is_(None),
+            )
+            .values(
+                completed_at=col(Quiz.expires_at),
+                score=case(scores, value=col(Quiz.id)),
+                updated_at=now,
+            )
+            .returning(col(Quiz.id))
+            .execution_options(synchronize_session=False)
+        )
+        closed_ids = set(result.scalars().all())
+        closed = [quiz for quiz in quizzes if quiz.id in closed_ids]
+        for quiz in closed:
+            set_committed_value(quiz, "completed_at", quiz.expires_at)
+            set_committed_value(quiz, "score", scores[quiz.id])
+            set_committed_value(quiz, "updated_at", now)
+        return closed
+
+    async def backfill_expires_at(self, limit: int = 100) -> int:
+        """
+        Set `expires_at` on up to `limit` started quizzes stored before it
+        was, from their start and duration. Returns how many were set.
+        """
+        statement = (
+            select(col(Quiz.id), col(Quiz.started_at), col(Quiz.duration_minutes))
+            .where(col(Quiz.expires_at).is_(None), col(Quiz.started_at).is_not(None))
+            .limit(limit)
+        )
+        rows = (await self.session.execute(statement)).all()
+        if rows:
+            await self.session.execute(
+                update(Quiz),
+                [
+                    {
+                        "id": id,
+                        "expires_at": started_at + timedelta(minutes=duration_minutes),
+                    }
+                    for id, started_at, duration_minutes in rows
+                ],
+            )
+        return len(rows)
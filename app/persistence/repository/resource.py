@@ -1,5 +1,9 @@
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+from sqlmodel import col
 
+from app.persistence.dialect import upsert_insert
 from app.persistence.model.resource import Resource
 from app.persistence.repository.base import BaseRepository
 
@@ -7,3 +11,38 @@ from app.persistence.repository.base import BaseRepository
 class ResourceRepository(BaseRepository[Resource]):
     def __init__(self, session: AsyncSession):
         super().__init__(session, Resource)
+
+    async def get_or_create(self, resources: list[Resource]) -> dict[str, Resource]:
+        """
+        Stored resources by fingerprint for `resources`, inserting the ones
+        with a new fingerprint. Concurrent inserts of the same resource do not
+        fail: the unique fingerprint keeps the first and the others link to it.
+        """
+        candidates = {resource.fingerprint: resource for resource in resources}
+        if not candidates:
+            return {}
+        table = Resource.__table__  # type: ignore[attr-defined]
+        columns = set(table.c.keys())
+        result = await self.session.execute(
+            upsert_insert(self.session, table)
+            .on_conflict_do_nothing(index_elements=["fingerprint"])
+            .returning(table.c.fingerprint),
+            [resource.model_dump(include=columns) for resource in candidates.values()],
+        )
+        stored: dict[str, Resource] = {}
+        for fingerprint in result.scalars().all():
+            # Stored exactly as built, so attached without reading it back
+            resource = candidates.pop(fingerprint)
+            make_transient_to_detached(resource)
+            self.session.add(resource)
+            stored[fingerprint] = resource
+        if candidates:
+            stored.update(await self._get_by_fingerprints(list(candidates)))
+        return stored
+
+    async def _get_by_fingerprints(
+        self, fingerprints: list[str]
+    ) -> dict[str, Resource]:
+        statement = select(Resource).where(col(Resource.fingerprint).in_(fingerprints))
+        result = await self.session.execute(statement)
+        return {resource.fingerprint: resource for resource in result.scalars().all()}
@@ -1,11 +1,13 @@
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import delete, insert, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from sqlmodel import col
 
-from app.persistence.model.section import Section
+from app.persistence.dataloader import get_loaders
+from app.persistence.model.links import SectionResourceLink
+from app.persistence.model.section import Section, SectionClosure
 from app.persistence.repository.base import BaseRepository
 
 
@@ -14,13 +16,101 @@ class SectionRepository(BaseRepository[Section]):
         super().__init__(session, Section)
 
     async def get_with_details(self, id: UUID) -> Section | None:
+        loader = get_loaders(self.session).get(
+            (Section, "details"), self._get_with_details
+        )
+        return await loader.load(id)
+
+    async def _get_with_details(self, ids: list[UUID]) -> dict[UUID, Section]:
         statement = (
             select(Section)
-            .where(col(Section.id) == id)
+            .where(col(Section.id).in_(ids))
             .options(
                 selectinload(Section.resources),  # type: ignore
                 selectinload(Section.children),  # type: ignore
             )
         )
         result = await self.session.execute(statement)
-        return result.scalars().first()
+        return {section.id: section for section in result.scalars().all()}
+
+    async def get_ancestor_ids(self, id: UUID) -> list[UUID]:
+        """Ids of the section and all its ancestors, nearest first."""
+        statement = (
+            select(col(SectionClosure.ancestor_id))
+            .where(col(SectionClosure.descendant_id) == id)
+            .order_by(col(SectionClosure.depth))
+        )
+        result = await self.session.execute(statement)
+        return list(result.scalars().all())
+
+    async def get_descendant_ids(self, ids: list[UUID]) -> list[UUID]:
+        """Ids of the sections `ids` and all their descendants."""
+        if not ids:
+            return []
+        statement = select(col(SectionClosure.descendant_id)).where(
+            col(SectionClosure.ancestor_id).in_(ids)
+        )
+        result = await self.session.execute(statement)
+        return list(result.scalars().all())
+
+    async def add_closure(self, sections: list[Section]) -> None:
+        """
+        Insert the closure rows of new `sections`, listed before their
+        children, in one executemany INSERT. The ancestors of parents that
+        are not among them are read in one query.
+        """
+        if not sections:
+            return
+        new_ids = {section.id for section in sections}
+        parent_ids = {
+            section.parent_id
+            for section in sections
+            if section.parent_id is not None and section.parent_id not in new_ids
+        }
+        # Ids of each section and its ancestors, nearest first
+        chains: dict[UUID, list[UUID]] = {}
+        if parent_ids:
+            statement = (
+                select(
+                    col(SectionClosure.descendant_id), col(SectionClosure.ancestor_id)
+                )
+                .where(col(SectionClosure.descendant_id).in_(parent_ids))
+                .order_by(col(SectionClosure.depth))
+            )
+            for descendant_id, ancestor_id in await self.session.execute(statement):
+                chains.setdefault(descendant_id, []).append(ancestor_id)
+
+        rows = []
+        for section in sections:
+            parent_chain = chains[section.parent_id] if section.parent_id else []
+            chain = chains[section.id] = [section.id, *parent_chain]
+            rows.extend(
+                {
+                    "ancestor_id": ancestor_id,
+                    "descendant_id": section.id,
+                    "depth": depth,
+                }
+                for depth, ancestor_id in enumerate(chain)
+            )
+        await self.session.execute(insert(SectionClosure), rows)
+
+    async def delete_by_ids(self, ids: list[UUID]) -> None:
+        """
+        Delete sections with their resource links and closure rows. Their
+        descendants and progress are left to the caller.
+        """
+        if not ids:
+            return
+        for statement in (
+            delete(SectionResourceLink).where(
+                col(SectionResourceLink.section_id).in_(ids)
+            ),
+            delete(SectionClosure).where(
+                or_(
+                    col(SectionClosure.ancestor_id).in_(ids),
+                    col(SectionClosure.descendant_id).in_(ids),
+                )
+            ),
+        ):
+            await self.session.execute(statement)
+        await super().delete_by_ids(ids)
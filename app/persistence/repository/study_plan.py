@@ -1,19 +1,45 @@
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Any
 from uuid import UUID
 
-from sqlalchemy import func, select
+from sqlalchemy import func, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlmodel import col
 
 from app.core.config import get_settings
+from app.persistence.model.links import SectionResourceLink, StudyPlanResourceLink
+from app.persistence.model.resource import Resource
 from app.persistence.model.section import Section
-from app.persistence.model.study_plan import StudyPlan
+from app.persistence.model.study_plan import StudyPlan, StudyPlanSnapshot
 from app.persistence.repository.base import BaseRepository
+from app.persistence.repository.resource import ResourceRepository
+from app.persistence.repository.section import SectionRepository
+
+
+@dataclass
+class StudyPlanRows:
+    """
+    Flattened plan trees for `StudyPlanRepository.insert_rows`, with ids and
+    foreign keys already assigned. Sections come before their children.
+    """
+
+    plans: list[StudyPlan] = field(default_factory=list)
+    sections: list[Section] = field(default_factory=list)
+    # Candidates, replaced by the stored resource with the same fingerprint
+    resources: list[Resource] = field(default_factory=list)
+    plan_resources: list[StudyPlanResourceLink] = field(default_factory=list)
+    section_resources: list[SectionResourceLink] = field(default_factory=list)
 
 
 class StudyPlanRepository(BaseRepository[StudyPlan]):
     def __init__(self, session: AsyncSession):
         super().__init__(session, StudyPlan)
+        self.resources = ResourceRepository(session)
+        self.sections = SectionRepository(session)
 
     async def get_by_user(
         self, user_id: UUID, skip: int = 0, limit: int = 100
@@ -40,6 +66,126 @@ class StudyPlanRepository(BaseRepository[StudyPlan]):
         return list(items), total
 
     async def get_study_plan_detailed(self, id: UUID) -> StudyPlan | None:
+        statement = (
+            select(StudyPlan)
+            .where(col(StudyPlan.id) == id)
+            .options(*self._detail_options())
+        )
+        result = await self.session.execute(statement)
+        plan = result.scalars().first()
+        if plan is not None:
+            await self._resolve_shared_trees([plan])
+        return plan
+
+    async def get_study_plans_detailed(self, ids: list[UUID]) -> list[StudyPlan]:
+        """
+        Plans with their section trees and resources, in the order of `ids`.
+        """
+        statement = (
+            select(StudyPlan)
+            .where(col(StudyPlan.id).in_(ids))
+            .options(*self._detail_options())
+        )
+        result = await self.session.execute(statement)
+        plans = {plan.id: plan for plan in result.scalars().all()}
+        await self._resolve_shared_trees(list(plans.values()))
+        return [plans[id] for id in ids if id in plans]
+
+    async def _resolve_shared_trees(self, plans: list[StudyPlan]) -> None:
+        """
+        Show the tree of its `tree_source_id` plan on each fork sharing one.
+        The trees are set as loaded state, so flushing the forks never moves
+        the rows over to them.
+        """
+        source_ids = {plan.tree_source_id for plan in plans if plan.tree_source_id}
+        if not source_ids:
+            return
+        statement = (
+            select(StudyPlan)
+            .where(col(StudyPlan.id).in_(source_ids))
+            .options(*self._detail_options())
+        )
+        result = await self.session.execute(statement)
+        sources = {source.id: source for source in result.scalars().all()}
+        for plan in plans:
+            source = sources.get(plan.tree_source_id)  # type: ignore[arg-type]
+            if source is not None:
+                set_committed_value(plan, "sections", list(source.sections))
+                set_committed_value(plan, "resources", list(source.resources))
+
+    async def bump_version(self, plan: StudyPlan, **values: Any) -> None:
+        """
+        Set `values` on `plan` and move it to its next version, in one
+        statement. Incremented by the database, so concurrent edits of a plan
+        never get the same version.
+        """
+        values["updated_at"] = datetime.now(UTC)
+        result = await self.session.execute(
+            update(StudyPlan)
+            .where(col(StudyPlan.id) == plan.id)
+            .values(version=col(StudyPlan.version) + 1, **values)
+            .returning(col(StudyPlan.version))
+            .execution_options(synchronize_session=False)
+        )
+        set_committed_value(plan, "version", result.scalar_one())
+        for name, value in values.items():
+            set_committed_value(plan, name, value)
+
+    async def get_version(self, id: UUID) -> int | None:
+        statement = select(col(StudyPlan.version)).where(col(StudyPlan.id) == id)
+        result = await self.session.execute(statement)
+        return result.scalar_one_or_none()
+
+    async def get_snapshot(self, id: UUID, version: int) -> bytes | None:
+        statement = select(col(StudyPlanSnapshot.content)).where(
+            col(StudyPlanSnapshot.study_plan_id) == id,
+            col(StudyPlanSnapshot.version) == version,
+        )
+        result = await self.session.execute(statement)
+        return result.scalar_one_or_none()
+
+    async def add_snapshots(self, snapshots: list[StudyPlanSnapshot]) -> None:
+        self.session.add_all(snapshots)
+        await self.session.flush()
+
+    async def get_tree_sharer_ids(self, id: UUID) -> list[UUID]:
+        """Ids of the forks showing the tree of plan `id`, oldest first."""
+        statement = (
+            select(col(StudyPlan.id))
+            .where(col(StudyPlan.tree_source_id) == id)
+            .order_by(col(StudyPlan.created_at), col(StudyPlan.id))
+        )
+        result = await self.session.execute(statement)
+        return list(result.scalars().all())
+
+    async def hand_off_tree(self, id: UUID, heir_id: UUID) -> None:
+        """
+        Give the sections and resource links of plan `id` to `heir_id`, one
+        of the forks sharing them, and point the other forks at the heir.
+        Section ids stay the same, so the forks' progress is left as it is.
+        """
+        await self.session.execute(
+            update(Section)
+            .where(col(Section.study_plan_id) == id)
+            .values(study_plan_id=heir_id)
+        )
+        await self.session.execute(
+            update(StudyPlanResourceLink)
+            .where(col(StudyPlanResourceLink.study_plan_id) == id)
+            .values(study_plan_id=heir_id)
+        )
+        await self.session.execute(
+            update(StudyPlan)
+            .where(col(StudyPlan.tree_source_id) == id)
+            .values(tree_source_id=heir_id)
+        )
+        await self.session.execute(
+            update(StudyPlan)
+            .where(col(StudyPlan.id) == heir_id)
+            .values(tree_source_id=None)
+        )
+
+    def _detail_options(self) -> list[Any]:
         load_options = [selectinload(StudyPlan.resources)]  # type: ignore
         path = selectinload(StudyPlan.sections)  # type: ignore
         load_options.append(path)
@@ -53,9 +199,72 @@ class StudyPlanRepository(BaseRepository[StudyPlan]):
             current_path = current_path.selectinload(Section.children)  # type: ignore
             load_options.append(current_path)
             load_options.append(current_path.selectinload(Section.resources))  # type: ignore
+        return load_options
 
+    async def stream_ids_by_user(
+        self, user_id: UUID, batch_size: int
+    ) -> AsyncIterator[list[UUID]]:
+        """
+        Ids of a user's active plans, oldest first, fetched `batch_size` at a
+        time from a server-side cursor.
+        """
         statement = (
-            select(StudyPlan).where(col(StudyPlan.id) == id).options(*load_options)
+            select(col(StudyPlan.id))
+            .where(col(StudyPlan.user_id) == user_id)
+            .where(col(StudyPlan.active))
+            .order_by(col(StudyPlan.created_at), col(StudyPlan.id))
+            .execution_options(yield_per=batch_size)
         )
-        result = await self.session.execute(statement)
-        return result.scalars().first()
+        result = await self.session.stream(statement)
+        async for ids in result.scalars().partitions():
+            yield list(ids)
+
+    async def insert_rows(self, rows: StudyPlanRows) -> None:
+        """
+        Bulk insert plan trees with one executemany INSERT per table, without
+        going through the unit of work. Links to resources already stored are
+        pointed at those instead of new copies. Links to resources that are
+        not in `rows.resources` are taken as they are.
+        """
+        stored = await self.resources.get_or_create(rows.resources)
+        stored_ids = {
+            resource.id: stored[resource.fingerprint].id for resource in rows.resources
+        }
+        # A resource listed twice under one plan or section is linked once
+        plan_resources = {
+            (
+                link.study_plan_id,
+                stored_ids.get(link.resource_id, link.resource_id),
+            ): None
+            for link in rows.plan_resources
+        }
+        section_resources = {
+            (link.section_id, stored_ids.get(link.resource_id, link.resource_id)): None
+            for link in rows.section_resources
+        }
+        for model, objs in (
+            (StudyPlan, rows.plans),
+            (Section, rows.sections),
+            (
+                StudyPlanResourceLink,
+                [
+                    StudyPlanResourceLink(study_plan_id=plan_id, resource_id=id)
+                    for plan_id, id in plan_resources
+                ],
+            ),
+            (
+                SectionResourceLink,
+                [
+                    SectionResourceLink(section_id=section_id, resource_id=id)
+                    for section_id, id in section_resources
+                ],
+            ),
+        ):
+            if not objs:
+                continue
+            table = model.__table__  # type: ignore[attr-defined]
+            columns = set(table.c.keys())
+            await self.session.execute(
+                insert(table), [obj.model_dump(include=columns) for obj in objs]
+            )
+        await self.sections.add_closure(rows.sections)
@@ -1,10 +1,11 @@
 from datetime import UTC, datetime
 from uuid import UUID
 
-from sqlalchemy import select, update
+from sqlalchemy import delete, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import col
 
+from app.core.security import hash_refresh_token
 from app.persistence.model.token import RefreshToken
 from app.persistence.repository.base import BaseRepository
 
@@ -14,7 +15,9 @@ class RefreshTokenRepository(BaseRepository[RefreshToken]):
         super().__init__(session, RefreshToken)
 
     async def get_by_token(self, token: str) -> RefreshToken | None:
-        statement = select(RefreshToken).where(col(RefreshToken.token) == token)
+        statement = select(RefreshToken).where(
+            col(RefreshToken.token_hash) == hash_refresh_token(token)
+        )
         result = await self.session.execute(statement)
         return result.scalars().first()
 
@@ -26,4 +29,25 @@ class RefreshTokenRepository(BaseRepository[RefreshToken]):
             .values(revoked_at=datetime.now(UTC))
         )
         await self.session.execute(statement)
-        await self.session.commit()
+
+    async def delete_stale_batch(
+        self, expired_before: datetime, revoked_before: datetime, limit: int
+    ) -> int:
+        """
+        Delete up to `limit` tokens that expired before `expired_before` or were
+        revoked before `revoked_before`. Returns the number of deleted rows.
+        """
+        stale_ids = (
+            select(col(RefreshToken.id))
+            .where(
+                or_(
+                    col(RefreshToken.expires_at) < expired_before,
+                    col(RefreshToken.revoked_at) < revoked_before,
+                )
+            )
+            .limit(limit)
+        )
+        result = await self.session.execute(
+            delete(RefreshToken).where(col(RefreshToken.id).in_(stale_ids))
+        )
+        return result.rowcount or 0  # type: ignore[attr-defined]
@@ -0,0 +1,59 @@
+"""
+Maintenance of study plan progress against the database of `DATABASE_URL`.
+
+    python -m app.scripts.progress backfill-events
+
+`backfill-events` is run once after upgrading to the progress event log: it
+seeds the log with the current status of progress recorded before it, which
+rebuilds otherwise refuse to replay.
+"""
+
+import argparse
+import asyncio
+import sys
+
+from app.core.database import engine, read_engine, unit_of_work
+from app.domain.services.progress import ProgressService
+from app.persistence.repository.progress import ProgressRepository
+from app.persistence.repository.section import SectionRepository
+from app.persistence.repository.study_plan import StudyPlanRepository
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Maintain study plan progress")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    backfill = commands.add_parser(
+        "backfill-events", help="seed the event log with progress recorded before it"
+    )
+    backfill.add_argument("--batch-size", type=int, default=500)
+    return parser.parse_args(argv)
+
+
+async def backfill_events(batch_size: int) -> int:
+    async with unit_of_work() as session:
+        service = ProgressService(
+            ProgressRepository(session),
+            StudyPlanRepository(session),
+            SectionRepository(session),
+        )
+        seeded = await service.backfill_progress_events(batch_size)
+    print(f"Seeded {seeded} progress events", file=sys.stderr)
+    return 0
+
+
+async def run(args: argparse.Namespace) -> int:
+    try:
+        return await backfill_events(args.batch_size)
+    finally:
+        # Open aiosqlite connections would keep the interpreter from exiting
+        await engine.dispose()
+        await read_engine.dispose()
+
+
+def main(argv: list[str] | None = None) -> int:
+    return asyncio.run(run(parse_args(argv)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""
+Bulk import and export of study plans as NDJSON, one plan per line, against
+the database of `DATABASE_URL`.
+
+    python -m app.scripts.study_plans export owner@example.com > plans.ndjson
+    python -m app.scripts.study_plans import owner@example.com plans.ndjson
+"""
+
+import argparse
+import asyncio
+import sys
+from collections.abc import AsyncIterator
+from contextlib import nullcontext
+
+from app.core.database import engine, read_engine, read_session_factory, unit_of_work
+from app.core.streaming import stream_ndjson
+from app.domain.exceptions.base import InvalidOperationException
+from app.domain.schemas.study_plan import StudyPlanProposal
+from app.domain.services.study_plan import StudyPlanService
+from app.persistence.repository.study_plan import StudyPlanRepository
+from app.persistence.repository.user import UserRepository
+
+_READ_SIZE = 64 * 1024
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Import or export study plans")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="write a user's plans to stdout")
+    export.add_argument("owner", help="email of the user whose plans to export")
+    export.add_argument("--batch-size", type=int, default=None)
+
+    import_ = commands.add_parser("import", help="create plans from an NDJSON file")
+    import_.add_argument("owner", help="email of the user who will own the plans")
+    import_.add_argument("path", help="NDJSON file, or - for stdin")
+    import_.add_argument("--chunk-size", type=int, default=None)
+    return parser.parse_args(argv)
+
+
+async def _read_chunks(path: str) -> AsyncIterator[bytes]:
+    with nullcontext(sys.stdin.buffer) if path == "-" else open(path, "rb") as file:
+        while chunk := file.read(_READ_SIZE):
+            yield chunk
+
+
+async def export_plans(owner: str, batch_size: int | None) -> int:
+    async with read_session_factory() as session:
+        user = await UserRepository(session).get_by_email(owner)
+        if not user:
+            print(f"No user with email {owner}", file=sys.stderr)
+            return 1
+        service = StudyPlanService(StudyPlanRepository(session))
+        plans = service.export_study_plans(user.id, batch_size)
+        async for chunk in stream_ndjson(StudyPlanProposal, plans):
+            sys.stdout.buffer.write(chunk)
+    return 0
+
+
+async def import_plans(owner: str, path: str, chunk_size: int | None) -> int:
+    try:
+        async with unit_of_work() as session:
+            user = await UserRepository(session).get_by_email(owner)
+            if not user:
+                print(f"No user with email {owner}", file=sys.stderr)
+                return 1
+            service = StudyPlanService(StudyPlanRepository(session))
+            imported = await service.import_study_plans(
+                user.id, _read_chunks(path), chunk_size
+            )
+    except InvalidOperationException as e:
+        print(e.message, file=sys.stderr)
+        print(f"Imported {e.detail['imported']} plans before it", file=sys.stderr)
+        return 1
+    print(f"Imported {imported} plans", file=sys.stderr)
+    return 0
+
+
+async def run(args: argparse.Namespace) -> int:
+    try:
+        if args.command == "export":
+            return await export_plans(args.owner, args.batch_size)
+        return await import_plans(args.owner, args.path, args.chunk_size)
+    finally:
+        # Open aiosqlite connections would keep the interpreter from exiting
+        await engine.dispose()
+        await read_engine.dispose()
+
+
+def main(argv: list[str] | None = None) -> int:
+    return asyncio.run(run(parse_args(argv)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from random import Random
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.database import unit_of_work
+from app.core.security import hash_password
+from app.domain.enums import CompletionStatus, ResourceType
+from app.domain.schemas.quiz import QuizGenerateRequest
+from app.domain.schemas.resource import ResourceCreate
+from app.domain.schemas.section import SectionCreate
+from app.domain.schemas.study_plan import StudyPlanCreate, StudyPlanReadDetail
+from app.domain.services.progress import ProgressService
+from app.domain.services.quiz import QuizService
+from app.domain.services.study_plan import StudyPlanService
+from app.persistence.model.section import Section
+from app.persistence.model.study_plan import StudyPlan
+from app.persistence.model.user import User
+from app.persistence.repository.progress import ProgressRepository
+from app.persistence.repository.quiz import QuizRepository
+from app.persistence.repository.section import SectionRepository
+from app.persistence.repository.study_plan import StudyPlanRepository
+from app.persistence.repository.user import UserRepository
+from benchmarks.fakes import FakeGeminiService
+
+# Every seeded user shares it, so seeding hashes a password only once
+BENCHMARK_PASSWORD = "benchmark-password"
+
+
+@dataclass
+class SeedConfig:
+    users: int = 20
+    plans_per_user: int = 3
+    # Levels of nested sections and sections per level
+    depth: int = 3
+    fanout: int = 3
+    resources_per_section: int = 2
+    # Share of each plan's resources already completed
+    completed_ratio: float = 0.3
+    quizzes_per_user: int = 1
+
+
+@dataclass
+class SeededPlan:
+    id: UUID
+    # (section id, resource id) of every resource in the plan's sections
+    resources: list[tuple[UUID, UUID]]
+
+
+@dataclass
+class SeededUser:
+    id: UUID
+    email: str
+    plans: list[SeededPlan] = field(default_factory=list)
+
+
+def build_sections(
+    depth: int, fanout: int, resources_per_section: int, rng: Random, path: str = ""
+) -> list[SectionCreate]:
+    """
+    `fanout` sections per level, `depth` levels deep, each with
+    `resources_per_section` resources of random types.
+    """
+    if depth == 0:
+        return []
+    sections = []
+    for i in range(fanout):
+        number = f"{path}{i + 1}"
+        sections.append(
+            SectionCreate(
+                title=f"Section {number}",
+                description=f"Generated section {number}",
+                order=i,
+                resources=[
+                    ResourceCreate(
+                        title=f"Resource {number}.{j + 1}",
+                        type=rng.choice(list(ResourceType)),
+                        url=f"https://example.com/{number}/{j + 1}",
+                        duration_minutes=rng.randint(5, 120),
+                    )
+                    for j in range(resources_per_section)
+                ],
+                children=build_sections(
+                    depth - 1, fanout, resources_per_section, rng, f"{number}."
+                ),
+            )
+        )
+    return sections
+
+
+def _section_resources(sections: list[Section]) -> list[tuple[UUID, UUID]]:
+    resources = []
+    for section in sections:
+        resources.extend((section.id, resource.id) for resource in section.resources)
+        resources.extend(_section_resources(section.children))
+    return resources
+
+
+async def _seed_user(
+    index: int,
+    hashed_password: str,
+    config: SeedConfig,
+    rng: Random,
+    session_factory: async_sessionmaker[AsyncSession] | None,
+) -> SeededUser:
+    async with unit_of_work(session_factory) as session:
+        user = await UserRepository(session).create(
+            User(
+                email=f"bench{index}@example.com",
+                username=f"bench{index}",
+                hashed_password=hashed_password,
+            )
+        )
+        seeded = SeededUser(id=user.id, email=user.email)
+
+        study_plan_repository = StudyPlanRepository(session)
+        plan_service = StudyPlanService(study_plan_repository)
+        progress_repository = ProgressRepository(session)
+        progress_service = ProgressService(
+            progress_repository,
+            study_plan_repository,
+            SectionRepository(session),
+        )
+        plans: list[StudyPlan] = []
+        for p in range(config.plans_per_user):
+            plan = await plan_service.create_study_plan(
+                StudyPlanCreate(
+                    title=f"Plan {index}.{p + 1}",
+                    description="Generated for benchmarks",
+                    user_id=user.id,
+                    sections=build_sections(
+                        config.depth,
+                        config.fanout,
+                        config.resources_per_section,
+                        rng,
+                    ),
+                )
+            )
+            plans.append(plan)
+            resources = _section_resources(plan.sections)
+            seeded.plans.append(SeededPlan(id=plan.id, resources=resources))
+
+            # Written as events and projected once, the way a rebuild does,
+            # rather than one status update per resource
+            progress = await progress_service.initialize_study_plan_progress(
+                user.id, plan.id
+            )
+            resource_progress_ids = {
+                rp.resource_id: rp.id
+                for sp in progress.section_progresses
+                for rp in sp.resource_progresses
+            }
+            completed = rng.sample(
+                resources, int(len(resources) * config.completed_ratio)
+            )
+            now = datetime.now(UTC)
+            await progress_repository.append_events(
+                [
+                    {
+                        "study_plan_progress_id": progress.id,
+                        "resource_progress_id": resource_progress_ids[resource_id],
+                        "status": CompletionStatus.COMPLETED,
+                        "occurred_at": now,
+                    }
+                    for _, resource_id in completed
+                ]
+            )
+            await progress_service.rebuild_study_plan_progress(user.id, plan.id)
+
+        quiz_service = QuizService(
+            QuizRepository(session), study_plan_repository, FakeGeminiService()
+        )
+        for q in range(config.quizzes_per_user if plans else 0):
+            plan = plans[q % len(plans)]
+            await quiz_service.create_quiz(
+                plan.id,
+                user.id,
+                QuizGenerateRequest(
+                    ignore_base_prompt=False,
+                    study_plan=StudyPlanReadDetail.model_validate(plan),
+                    num_questions=5,
+                    difficulty=0.5,
+                    extra_instructions="",
+                ),
+            )
+    return seeded
+
+
+async def seed(
+    config: SeedConfig,
+    rng: Random,
+    session_factory: async_sessionmaker[AsyncSession] | None = None,
+) -> list[SeededUser]:
+    """
+    Create `config.users` users, each with their plans, progress and quizzes,
+    through the same services the API uses. Users log in with
+    `BENCHMARK_PASSWORD`.
+    """
+    hashed_password = hash_password(BENCHMARK_PASSWORD)
+    return [
+        await _seed_user(i, hashed_password, config, rng, session_factory)
+        for i in range(config.users)
+    ]
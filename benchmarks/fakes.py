@@ -0,0 +1,49 @@
+from app.domain.schemas.quiz import (
+    QuestionCreate,
+    QuestionOptionCreate,
+    QuizProposal,
+)
+from app.domain.schemas.study_plan import StudyPlanProposal, StudyPlanReadDetail
+from app.domain.services.gemini import GeminiService
+
+
+class FakeGeminiService(GeminiService):
+    """
+    Answers instantly with canned proposals, so benchmarks measure the app
+    and not the model. The first option of every question is the correct one.
+    """
+
+    def generate_study_plan_proposal(
+        self,
+        ignore_base_prompt: bool,  # noqa: ARG002
+        ignore_proposal: bool,  # noqa: ARG002
+        extra_instructions: str,  # noqa: ARG002
+        proposal: StudyPlanProposal,
+    ) -> StudyPlanProposal | None:
+        return proposal
+
+    def generate_quiz_proposal(
+        self,
+        ignore_base_prompt: bool,  # noqa: ARG002
+        study_plan: StudyPlanReadDetail,
+        extra_instructions: str,  # noqa: ARG002
+        num_questions: int,
+        difficulty: float,
+    ) -> QuizProposal | None:
+        return QuizProposal(
+            title=f"Quiz on {study_plan.title}",
+            difficulty=difficulty,
+            duration_minutes=30,
+            questions=[
+                QuestionCreate(
+                    title=f"Question {i + 1}",
+                    description=f"About {study_plan.title}",
+                    order=i,
+                    options=[
+                        QuestionOptionCreate(text=f"Option {j + 1}", is_correct=j == 0)
+                        for j in range(4)
+                    ],
+                )
+                for i in range(num_questions)
+            ],
+        )
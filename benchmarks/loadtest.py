@@ -0,0 +1,260 @@
+"""
+Load test of the API against a generated data set.
+
+    python -m benchmarks.loadtest --users 20 --concurrency 20 --duration 60
+    python -m benchmarks.loadtest --transport uvicorn --save-baseline
+    python -m benchmarks.loadtest --baseline benchmarks/baseline.json
+
+Seeds a fresh database, then has `--concurrency` virtual users browse plans,
+mark resources, fork plans and take quizzes (against a fake model) for
+`--duration` seconds. Prints RPS and p50/p95/p99 latency per route and,
+given a baseline, exits with status 1 when a route regressed past
+`--tolerance`.
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import asdict
+from pathlib import Path
+from random import Random
+
+import httpx
+
+SERVER_START_TIMEOUT_SECONDS = 30
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Load test the API against generated data"
+    )
+    parser.add_argument(
+        "--transport",
+        choices=["asgi", "uvicorn"],
+        default="asgi",
+        help="call the app in-process (asgi) or over HTTP through uvicorn "
+        "running in a separate process",
+    )
+    parser.add_argument(
+        "--database-url",
+        default=None,
+        help="database to seed and run against; it is wiped first "
+        "(default: a temporary SQLite file)",
+    )
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--plans-per-user", type=int, default=3)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--fanout", type=int, default=3)
+    parser.add_argument("--resources-per-section", type=int, default=2)
+    parser.add_argument("--quizzes-per-user", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=20)
+    # Long enough for the rarer quiz and fork routes to reach --min-requests
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=Path("benchmarks/baseline.json"),
+        help="results to compare against, or to write with --save-baseline",
+    )
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="allowed p95/RPS change before a route counts as regressed",
+    )
+    parser.add_argument(
+        "--min-requests",
+        type=int,
+        default=20,
+        help="routes with fewer requests than this are not compared",
+    )
+    args = parser.parse_args(argv)
+    if args.users < 1 or args.plans_per_user < 1:
+        parser.error("--users and --plans-per-user must be at least 1")
+    return args
+
+
+@asynccontextmanager
+async def open_client(
+    transport: str, concurrency: int
+) -> AsyncIterator[httpx.AsyncClient]:
+    from app.main import app
+
+    if transport == "asgi":
+        # Unhandled errors come back as 500s, as they would through a server
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app, raise_app_exceptions=False),
+            base_url="http://bench",
+        ) as client:
+            yield client
+        return
+
+    # A separate process, as in production: the load generator does not share
+    # the server's event loop or CPU time
+    port = _free_port()
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "benchmarks.server:app",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        env={**os.environ, "RESET_DB_ON_STARTUP": "false"},
+    )
+    try:
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{port}",
+            limits=httpx.Limits(max_connections=concurrency),
+            timeout=60,
+        ) as client:
+            await _wait_until_serving(client, server)
+            yield client
+    finally:
+        server.terminate()
+        await asyncio.to_thread(server.wait, SERVER_START_TIMEOUT_SECONDS)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_until_serving(
+    client: httpx.AsyncClient, server: subprocess.Popen[bytes]
+) -> None:
+    deadline = time.monotonic() + SERVER_START_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with status {server.returncode}")
+        try:
+            await client.get("/api/v1/health/")
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError(f"uvicorn did not start in {SERVER_START_TIMEOUT_SECONDS} s")
+
+
+async def run(args: argparse.Namespace) -> int:
+    # Imported once the environment points the app at the benchmark database
+    from sqlmodel import SQLModel
+
+    from app.core.database import engine, read_engine
+    from app.core.dependencies import get_gemini_service
+    from app.main import app
+    from benchmarks.data import SeedConfig, seed
+    from benchmarks.fakes import FakeGeminiService
+    from benchmarks.report import (
+        TOTAL,
+        compare,
+        format_table,
+        load_baseline,
+        save_baseline,
+        summarize,
+        uncompared,
+        undersampled,
+    )
+    from benchmarks.scenarios import ROUTES, Recorder, VirtualUser
+
+    app.dependency_overrides[get_gemini_service] = FakeGeminiService
+
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.drop_all)
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    config = SeedConfig(
+        users=args.users,
+        plans_per_user=args.plans_per_user,
+        depth=args.depth,
+        fanout=args.fanout,
+        resources_per_section=args.resources_per_section,
+        quizzes_per_user=args.quizzes_per_user,
+    )
+    started = time.perf_counter()
+    users = await seed(config, Random(args.seed))
+    print(f"Seeded {len(users)} users in {time.perf_counter() - started:.1f} s")
+
+    recorder = Recorder()
+    async with open_client(args.transport, args.concurrency) as client:
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(
+            *(
+                VirtualUser(
+                    users[i % len(users)], client, recorder, Random(args.seed + i)
+                ).run(deadline)
+                for i in range(args.concurrency)
+            )
+        )
+        elapsed = time.perf_counter() - started
+    # Open aiosqlite connections would keep the interpreter from exiting
+    await engine.dispose()
+    await read_engine.dispose()
+
+    stats = summarize(recorder.samples, elapsed)
+    print(format_table(stats))
+
+    settings = {
+        key: value
+        for key, value in vars(args).items()
+        if key not in ("baseline", "save_baseline", "tolerance", "min_requests")
+    }
+    if args.save_baseline:
+        # Such routes would never be compared against it
+        too_few = undersampled(stats, args.min_requests, ROUTES)
+        if too_few:
+            print(
+                f"Not saved, routes with fewer than {args.min_requests} requests; "
+                "raise --duration or --concurrency:"
+            )
+            print("\n".join(f"  {line}" for line in too_few))
+            return 1
+        save_baseline(args.baseline, stats, settings)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    skipped = uncompared(stats, baseline, args.min_requests)
+    if skipped:
+        print(f"Not compared against {args.baseline}:")
+        print("\n".join(f"  {line}" for line in skipped))
+    regressions = compare(stats, baseline, args.tolerance, args.min_requests)
+    if regressions:
+        print(f"Regressed against {args.baseline}:")
+        print("\n".join(f"  {line}" for line in regressions))
+        return 1
+    total = stats[TOTAL]
+    print(f"Within {args.tolerance:.0%} of {args.baseline}: {asdict(total)}")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    database_url = args.database_url or (
+        "sqlite+aiosqlite:///" + os.path.join(tempfile.mkdtemp(), "benchmark.db")
+    )
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("ENVIRONMENT", "production")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
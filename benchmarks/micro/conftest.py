@@ -0,0 +1,86 @@
+"""
+Fixtures of the micro-benchmarks. pytest-benchmark times synchronous
+callables, so coroutines run on a private event loop (`runner`) and the
+database is an in-memory SQLite engine created on that loop.
+"""
+
+import asyncio
+from collections.abc import Callable, Iterator
+from random import Random
+from uuid import UUID
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from sqlmodel import SQLModel
+
+from app.core.database import create_engine, unit_of_work
+from app.domain.schemas.section import SectionCreate
+from app.domain.schemas.study_plan import StudyPlanCreate
+from app.domain.services.study_plan import StudyPlanService
+from app.persistence.model.user import User
+from app.persistence.repository.study_plan import StudyPlanRepository
+from app.persistence.repository.user import UserRepository
+from benchmarks.data import build_sections
+
+# 10 + 100 + 1,000 sections with a resource each
+LARGE_TREE_DEPTH = 3
+LARGE_TREE_FANOUT = 10
+
+
+def section_tree(
+    depth: int = LARGE_TREE_DEPTH,
+    fanout: int = LARGE_TREE_FANOUT,
+    resources_per_section: int = 1,
+) -> list[SectionCreate]:
+    return build_sections(depth, fanout, resources_per_section, Random(0))
+
+
+@pytest.fixture
+def runner() -> Iterator[asyncio.Runner]:
+    with asyncio.Runner() as runner:
+        yield runner
+
+
+async def _create_tables(engine: AsyncEngine) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+
+@pytest.fixture
+def session_factory(
+    runner: asyncio.Runner,
+) -> Iterator[async_sessionmaker[AsyncSession]]:
+    # In-memory SQLite keeps one connection, so every session sees the data
+    engine = create_engine("sqlite+aiosqlite://", name="benchmark")
+    runner.run(_create_tables(engine))
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    runner.run(engine.dispose())
+
+
+async def _create_plan(
+    session_factory: async_sessionmaker[AsyncSession], sections: list[SectionCreate]
+) -> UUID:
+    async with unit_of_work(session_factory) as session:
+        user = await UserRepository(session).create(
+            User(email="bench@example.com", username="bench", hashed_password="h")
+        )
+        plan = await StudyPlanService(StudyPlanRepository(session)).create_study_plan(
+            StudyPlanCreate(
+                title="Plan", description="", user_id=user.id, sections=sections
+            )
+        )
+    return plan.id
+
+
+@pytest.fixture
+def create_plan(
+    runner: asyncio.Runner, session_factory: async_sessionmaker[AsyncSession]
+) -> Callable[[list[SectionCreate]], UUID]:
+    """
+    Save a plan with the given sections, returning its id.
+    """
+
+    def create(sections: list[SectionCreate]) -> UUID:
+        return runner.run(_create_plan(session_factory, sections))
+
+    return create
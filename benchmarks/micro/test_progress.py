@@ -0,0 +1,34 @@
+import asyncio
+from uuid import uuid4
+
+from app.domain.services.progress import ProgressService
+from app.domain.services.study_plan import StudyPlanService
+from benchmarks.micro.conftest import section_tree
+
+
+def _sections():
+    service = StudyPlanService(None)  # type: ignore[arg-type]
+    return [service._create_section_entity(section) for section in section_tree()]
+
+
+def test_create_section_progress_tree(benchmark, runner: asyncio.Runner):
+    service = ProgressService(None, None, None)  # type: ignore[arg-type]
+    sections = _sections()
+    user_id, sp_progress_id = uuid4(), uuid4()
+
+    section_progresses, resource_progresses = benchmark(
+        lambda: runner.run(
+            service._create_section_progress_tree(user_id, sp_progress_id, sections)
+        )
+    )
+
+    assert len(section_progresses) == len(resource_progresses) == 1110
+
+
+def test_get_plan_element_ids(benchmark):
+    service = ProgressService(None, None, None)  # type: ignore[arg-type]
+    sections = _sections()
+
+    section_ids, resource_ids = benchmark(service._get_plan_element_ids, sections)
+
+    assert len(section_ids) == len(resource_ids) == 1110
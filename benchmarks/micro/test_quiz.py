@@ -0,0 +1,35 @@
+from uuid import uuid4
+
+from app.domain.services.quiz import QuizService
+from app.persistence.model.quiz import Question, QuestionOption, Quiz
+
+
+def test_calculate_score(benchmark):
+    service = QuizService(None, None, None)  # type: ignore[arg-type]
+    quiz = Quiz(
+        study_plan_id=uuid4(),
+        user_id=uuid4(),
+        title="Quiz",
+        difficulty=0.5,
+        duration_minutes=60,
+    )
+    quiz.questions = [
+        Question(
+            title=f"Question {i}",
+            description="",
+            order=i,
+            options=[
+                QuestionOption(text=f"Option {j}", is_correct=j == 0) for j in range(4)
+            ],
+        )
+        for i in range(100)
+    ]
+    # Every other question answered right
+    answers = {
+        question.id: {question.options[i % 2].id}
+        for i, question in enumerate(quiz.questions)
+    }
+
+    score = benchmark(service._calculate_score, quiz, answers)
+
+    assert score == 50.0
@@ -0,0 +1,105 @@
+import asyncio
+import json
+from collections.abc import Callable
+from uuid import UUID
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import get_settings
+from app.core.streaming import iter_model_json
+from app.domain.schemas.section import SectionCreate
+from app.domain.schemas.study_plan import StudyPlanReadDetail
+from app.domain.services.study_plan import StudyPlanService
+from app.persistence.model.study_plan import StudyPlan
+from app.persistence.repository.study_plan import StudyPlanRepository, StudyPlanRows
+from benchmarks.micro.conftest import section_tree
+
+
+def test_create_section_entity(benchmark):
+    service = StudyPlanService(None)  # type: ignore[arg-type]
+    sections = section_tree()
+
+    created = benchmark(
+        lambda: [service._create_section_entity(section) for section in sections]
+    )
+
+    assert len(created) == len(sections)
+
+
+def test_copy_section(benchmark):
+    service = StudyPlanService(None)  # type: ignore[arg-type]
+    originals = [service._create_section_entity(section) for section in section_tree()]
+
+    def copy() -> StudyPlanRows:
+        rows = StudyPlanRows()
+        for section in originals:
+            service._copy_section_rows(rows, section, {})
+        return rows
+
+    copies = benchmark(copy)
+
+    assert len(copies.sections) >= len(originals)
+
+
+async def _load_plan(
+    session_factory: async_sessionmaker[AsyncSession], plan_id: UUID
+) -> StudyPlan | None:
+    # A new session each time, so rows are not served from the identity map
+    async with session_factory() as session:
+        return await StudyPlanRepository(session).get_study_plan_detailed(plan_id)
+
+
+def test_read_detail_model_validate(
+    benchmark,
+    runner: asyncio.Runner,
+    session_factory: async_sessionmaker[AsyncSession],
+    create_plan: Callable[[list[SectionCreate]], UUID],
+):
+    plan = runner.run(_load_plan(session_factory, create_plan(section_tree())))
+
+    detail = benchmark(StudyPlanReadDetail.model_validate, plan)
+
+    assert len(detail.sections) == len(section_tree())
+
+
+def test_read_detail_model_dump_json(
+    benchmark,
+    runner: asyncio.Runner,
+    session_factory: async_sessionmaker[AsyncSession],
+    create_plan: Callable[[list[SectionCreate]], UUID],
+):
+    plan = runner.run(_load_plan(session_factory, create_plan(section_tree())))
+
+    body = benchmark(lambda: StudyPlanReadDetail.model_validate(plan).model_dump_json())
+
+    assert len(json.loads(body)["sections"]) == len(section_tree())
+
+
+def test_read_detail_iter_model_json(
+    benchmark,
+    runner: asyncio.Runner,
+    session_factory: async_sessionmaker[AsyncSession],
+    create_plan: Callable[[list[SectionCreate]], UUID],
+):
+    plan = runner.run(_load_plan(session_factory, create_plan(section_tree())))
+
+    body = benchmark(lambda: b"".join(iter_model_json(StudyPlanReadDetail, plan)))
+
+    assert len(json.loads(body)["sections"]) == len(section_tree())
+
+
+@pytest.mark.parametrize("depth", range(1, get_settings().STUDY_PLAN_MAX_DEPTH + 1))
+def test_get_study_plan_detailed(
+    benchmark,
+    depth: int,
+    runner: asyncio.Runner,
+    session_factory: async_sessionmaker[AsyncSession],
+    create_plan: Callable[[list[SectionCreate]], UUID],
+):
+    plan_id = create_plan(section_tree(depth=depth, fanout=3, resources_per_section=2))
+
+    plan = benchmark(lambda: runner.run(_load_plan(session_factory, plan_id)))
+
+    assert plan is not None
+    assert len(plan.sections) == 3
@@ -0,0 +1,167 @@
+import json
+import math
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from benchmarks.scenarios import Sample
+
+TOTAL = "ALL"
+
+
+@dataclass
+class RouteStats:
+    route: str
+    requests: int
+    errors: int
+    rps: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    # Nearest rank: the smallest value with at least q% of samples at or below
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _stats(route: str, samples: list[Sample], duration_seconds: float) -> RouteStats:
+    latencies = sorted(sample.seconds * 1000 for sample in samples)
+    return RouteStats(
+        route=route,
+        requests=len(samples),
+        errors=sum(1 for sample in samples if sample.status >= 400),
+        rps=len(samples) / duration_seconds if duration_seconds else 0.0,
+        p50_ms=percentile(latencies, 50),
+        p95_ms=percentile(latencies, 95),
+        p99_ms=percentile(latencies, 99),
+    )
+
+
+def summarize(samples: list[Sample], duration_seconds: float) -> dict[str, RouteStats]:
+    """
+    Stats per route, plus all requests together under `TOTAL`.
+    """
+    by_route: dict[str, list[Sample]] = {}
+    for sample in samples:
+        by_route.setdefault(sample.route, []).append(sample)
+    stats = {
+        route: _stats(route, route_samples, duration_seconds)
+        for route, route_samples in sorted(by_route.items())
+    }
+    stats[TOTAL] = _stats(TOTAL, samples, duration_seconds)
+    return stats
+
+
+def format_table(stats: dict[str, RouteStats]) -> str:
+    width = max(len(route) for route in stats)
+    lines = [
+        f"{'route':<{width}} {'reqs':>7} {'errs':>5} {'rps':>8} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    ]
+    for s in stats.values():
+        lines.append(
+            f"{s.route:<{width}} {s.requests:>7} {s.errors:>5} {s.rps:>8.1f} "
+            f"{s.p50_ms:>8.1f} {s.p95_ms:>8.1f} {s.p99_ms:>8.1f}"
+        )
+    return "\n".join(lines)
+
+
+def save_baseline(
+    path: Path, stats: dict[str, RouteStats], settings: dict[str, Any]
+) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        "settings": settings,
+        "routes": {
+            route: {
+                key: round(value, 2) if isinstance(value, float) else value
+                for key, value in asdict(s).items()
+            }
+            for route, s in stats.items()
+        },
+    }
+    path.write_text(json.dumps(data, indent=2, sort_keys=True) + "\n")
+
+
+def load_baseline(path: Path) -> dict[str, RouteStats]:
+    data = json.loads(path.read_text())
+    return {route: RouteStats(**s) for route, s in data["routes"].items()}
+
+
+def compare(
+    stats: dict[str, RouteStats],
+    baseline: dict[str, RouteStats],
+    tolerance: float,
+    min_requests: int = 20,
+) -> list[str]:
+    """
+    Routes slower (p95) or with lower throughput than the baseline by more
+    than `tolerance` (a fraction), or failing where they did not before.
+    Routes with fewer than `min_requests` samples in either run are too noisy
+    to compare.
+    """
+    regressions = []
+    for route, current in stats.items():
+        base = baseline.get(route)
+        if base is None or min(current.requests, base.requests) < min_requests:
+            # Listed by `uncompared`
+            continue
+        if current.p95_ms > base.p95_ms * (1 + tolerance):
+            regressions.append(
+                f"{route}: p95 {current.p95_ms:.1f} ms, baseline {base.p95_ms:.1f} ms"
+            )
+        if current.rps < base.rps * (1 - tolerance):
+            regressions.append(
+                f"{route}: {current.rps:.1f} rps, baseline {base.rps:.1f} rps"
+            )
+        if current.errors and not base.errors:
+            regressions.append(f"{route}: {current.errors} errors, baseline none")
+    return regressions
+
+
+def uncompared(
+    stats: dict[str, RouteStats],
+    baseline: dict[str, RouteStats],
+    min_requests: int = 20,
+) -> list[str]:
+    """
+    Routes `compare` skipped, each with the reason: missing from one of the
+    runs, or with fewer than `min_requests` samples in either.
+    """
+    skipped = []
+    for route in sorted(stats.keys() | baseline.keys()):
+        current, base = stats.get(route), baseline.get(route)
+        if base is None:
+            skipped.append(f"{route}: not in the baseline")
+        elif current is None:
+            skipped.append(f"{route}: not requested in this run")
+        elif min(current.requests, base.requests) < min_requests:
+            skipped.append(
+                f"{route}: {current.requests} requests, baseline "
+                f"{base.requests}, fewer than {min_requests}"
+            )
+    return skipped
+
+
+def undersampled(
+    stats: dict[str, RouteStats],
+    min_requests: int = 20,
+    routes: Iterable[str] = (),
+) -> list[str]:
+    """
+    Routes with fewer than `min_requests` samples, which a baseline could
+    not be compared on, counting those of `routes` missing from `stats`.
+    """
+    requests = dict.fromkeys(routes, 0) | {
+        route: s.requests for route, s in stats.items()
+    }
+    return [
+        f"{route}: {count} requests"
+        for route, count in sorted(requests.items())
+        if count < min_requests
+    ]
@@ -0,0 +1,174 @@
+import time
+from dataclasses import dataclass
+from random import Random
+from typing import Any
+
+import httpx
+
+from app.domain.enums import CompletionStatus
+from benchmarks.data import BENCHMARK_PASSWORD, SeededUser
+
+API = "/api/v1"
+
+# Every route the scenarios call, so a run can tell which ones it missed
+ROUTES = (
+    "POST /auth/login",
+    "GET /plan/user/{user_id}",
+    "GET /plan/{plan_id}",
+    "POST /progress/plan/{plan_id}/sections/{section_id}"
+    "/resources/{resource_id}/status",
+    "POST /plan/{plan_id}/fork",
+    "DELETE /plan/{plan_id}",
+    "POST /quizzes/plan/{plan_id}/gen-quiz",
+    "POST /quizzes/{quiz_id}/start",
+    "POST /quizzes/{quiz_id}/submit",
+    "GET /quizzes/plan/{plan_id}/quizzes",
+)
+
+
+@dataclass
+class Sample:
+    # "<METHOD> <route template>", so requests to different ids add up
+    route: str
+    status: int
+    seconds: float
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.samples: list[Sample] = []
+
+    async def call(
+        self,
+        client: httpx.AsyncClient,
+        method: str,
+        route: str,
+        *,
+        headers: dict[str, str] | None = None,
+        json: Any = None,
+        **path_params: Any,
+    ) -> httpx.Response:
+        started = time.perf_counter()
+        response = await client.request(
+            method, API + route.format(**path_params), headers=headers, json=json
+        )
+        self.samples.append(
+            Sample(
+                f"{method} {route}", response.status_code, time.perf_counter() - started
+            )
+        )
+        return response
+
+
+class VirtualUser:
+    """
+    One seeded user going through the scenarios at random, back to back,
+    the way a client of the API would.
+    """
+
+    def __init__(
+        self,
+        user: SeededUser,
+        client: httpx.AsyncClient,
+        recorder: Recorder,
+        rng: Random,
+    ) -> None:
+        self.user = user
+        self.client = client
+        self.recorder = recorder
+        self.rng = rng
+        self.headers: dict[str, str] = {}
+        # Scenario and how often it is picked relative to the others
+        self.scenarios = [
+            (self.browse_plan, 50),
+            (self.mark_resources, 30),
+            (self.fork_plan, 10),
+            (self.take_quiz, 10),
+        ]
+
+    async def _call(self, method: str, route: str, **kwargs: Any) -> httpx.Response:
+        return await self.recorder.call(
+            self.client, method, route, headers=self.headers, **kwargs
+        )
+
+    async def login(self) -> None:
+        response = await self._call(
+            "POST",
+            "/auth/login",
+            json={"email": self.user.email, "password": BENCHMARK_PASSWORD},
+        )
+        response.raise_for_status()
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    async def run(self, deadline: float) -> None:
+        await self.login()
+        scenarios, weights = zip(*self.scenarios, strict=True)
+        while time.perf_counter() < deadline:
+            scenario = self.rng.choices(scenarios, weights)[0]
+            await scenario()
+
+    async def browse_plan(self) -> None:
+        await self._call("GET", "/plan/user/{user_id}", user_id=self.user.id)
+        plan = self.rng.choice(self.user.plans)
+        await self._call("GET", "/plan/{plan_id}", plan_id=plan.id)
+
+    async def mark_resources(self) -> None:
+        plan = self.rng.choice(self.user.plans)
+        for section_id, resource_id in self.rng.sample(
+            plan.resources, min(3, len(plan.resources))
+        ):
+            await self._call(
+                "POST",
+                "/progress/plan/{plan_id}/sections/{section_id}"
+                "/resources/{resource_id}/status",
+                json={"status": self.rng.choice(list(CompletionStatus))},
+                plan_id=plan.id,
+                section_id=section_id,
+                resource_id=resource_id,
+            )
+
+    async def fork_plan(self) -> None:
+        plan = self.rng.choice(self.user.plans)
+        response = await self._call("POST", "/plan/{plan_id}/fork", plan_id=plan.id)
+        if response.is_success:
+            # Keeps the data set the same size however long the run is
+            await self._call("DELETE", "/plan/{plan_id}", plan_id=response.json()["id"])
+
+    async def take_quiz(self) -> None:
+        plan = self.rng.choice(self.user.plans)
+        detail = await self._call("GET", "/plan/{plan_id}", plan_id=plan.id)
+        if not detail.is_success:
+            return
+        quiz = await self._call(
+            "POST",
+            "/quizzes/plan/{plan_id}/gen-quiz",
+            json={
+                "ignore_base_prompt": False,
+                "study_plan": detail.json(),
+                "num_questions": 5,
+                "difficulty": 0.5,
+                "extra_instructions": "",
+            },
+            plan_id=plan.id,
+        )
+        if not quiz.is_success:
+            return
+        started = await self._call(
+            "POST", "/quizzes/{quiz_id}/start", quiz_id=quiz.json()["id"]
+        )
+        if not started.is_success:
+            return
+        answers = [
+            {
+                "question_id": question["id"],
+                "selected_option_id": self.rng.choice(question["options"])["id"],
+            }
+            for question in started.json()["questions"]
+        ]
+        await self._call(
+            "POST",
+            "/quizzes/{quiz_id}/submit",
+            json={"answers": answers},
+            quiz_id=quiz.json()["id"],
+        )
+        await self._call("GET", "/quizzes/plan/{plan_id}/quizzes", plan_id=plan.id)
@@ -0,0 +1,14 @@
+"""
+The app as served to `benchmarks.loadtest --transport uvicorn`, answering
+with the fake model:
+
+    uvicorn benchmarks.server:app
+"""
+
+from app.core.dependencies import get_gemini_service
+from app.main import app
+from benchmarks.fakes import FakeGeminiService
+
+app.dependency_overrides[get_gemini_service] = FakeGeminiService
+
+__all__ = ["app"]
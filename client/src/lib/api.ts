@@ -75,6 +75,8 @@ class APIClient {
     const response = await fetch(`${API_BASE_URL}${endpoint}`, {
       ...options,
       headers,
+      // Sends back the cookie pinning reads to the primary after a write
+      credentials: "include",
     });
 
     if (!response.ok) {
@@ -1,6 +1,11 @@
+from datetime import UTC, datetime, timedelta
+
+import jwt
 import pytest
 from httpx import AsyncClient
 
+from app.core.config import get_settings
+from app.core.security import access_token_verifier
 from app.domain.schemas.user import UserCreate
 from app.domain.services.user import UserService
 
@@ -156,3 +161,78 @@ async def test_login_access_token(client: AsyncClient, user_service: UserService
     data = response.json()
     assert "access_token" in data
     assert data["token_type"] == "bearer"
+
+
+@pytest.mark.asyncio
+async def test_access_token_verification_is_cached(
+    client: AsyncClient, user_service: UserService
+):
+    user_in = UserCreate(
+        email="cached@example.com", username="cacheduser", password="password123"
+    )
+    await user_service.create_user(user_in)
+    login_response = await client.post(
+        "/api/v1/auth/login",
+        json={"email": "cached@example.com", "password": "password123"},
+    )
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+
+    hits_before = access_token_verifier.stats.cache_hits
+    for _ in range(3):
+        response = await client.get("/api/v1/auth/me", headers=headers)
+        assert response.status_code == 200
+        assert "jwt;dur=" in response.headers["server-timing"]
+    assert access_token_verifier.stats.cache_hits - hits_before == 2
+
+
+@pytest.mark.asyncio
+async def test_server_timing_hidden_in_production(
+    client: AsyncClient, user_service: UserService, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    user_in = UserCreate(
+        email="timing@example.com", username="timinguser", password="password123"
+    )
+    await user_service.create_user(user_in)
+    login_response = await client.post(
+        "/api/v1/auth/login",
+        json={"email": "timing@example.com", "password": "password123"},
+    )
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+    monkeypatch.setattr(get_settings(), "ENVIRONMENT", "production")
+
+    response = await client.get("/api/v1/auth/me", headers=headers)
+    assert response.status_code == 200
+    assert "server-timing" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_access_token_signed_with_rotated_key(
+    client: AsyncClient, user_service: UserService, monkeypatch: pytest.MonkeyPatch
+):
+    user = await user_service.create_user(
+        UserCreate(
+            email="rotated@example.com", username="rotated", password="password123"
+        )
+    )
+    settings = get_settings()
+    expire = datetime.now(UTC) + timedelta(minutes=5)
+    old_token = jwt.encode(
+        {"exp": expire, "sub": str(user.id)},
+        "retired-secret",
+        algorithm=settings.ALGORITHM,
+        headers={"kid": "retired"},
+    )
+    headers = {"Authorization": f"Bearer {old_token}"}
+
+    response = await client.get("/api/v1/auth/me", headers=headers)
+    assert response.status_code == 403
+
+    monkeypatch.setattr(settings, "PREVIOUS_SECRET_KEYS", {"retired": "retired-secret"})
+    response = await client.get("/api/v1/auth/me", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["email"] == "rotated@example.com"
+
+    # Retiring the key revokes the token even though it is cached
+    monkeypatch.setattr(settings, "PREVIOUS_SECRET_KEYS", {})
+    response = await client.get("/api/v1/auth/me", headers=headers)
+    assert response.status_code == 403
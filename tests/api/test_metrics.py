@@ -0,0 +1,51 @@
+import pytest
+from httpx import AsyncClient
+
+from app.core.config import get_settings
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(client: AsyncClient):
+    await client.get("/api/v1/health/")
+
+    response = await client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert (
+        'http_request_duration_seconds_count{method="GET",'
+        'route="/api/v1/health/",status="200"}'
+    ) in body
+    assert 'http_requests_in_progress{method="GET"}' in body
+    assert 'db_queries_per_request_count{method="GET",route="/api/v1/health/"}' in (
+        body
+    )
+    for name in (
+        "db_pool_connections",
+        "event_loop_lag_seconds",
+        "gemini_request_duration_seconds",
+        "password_hash_queue_depth",
+        "cache_requests_total",
+    ):
+        assert f"# TYPE {name.removesuffix('_total')}" in body
+
+
+@pytest.mark.asyncio
+async def test_metrics_require_the_token(client: AsyncClient, monkeypatch):
+    monkeypatch.setattr(get_settings(), "METRICS_TOKEN", "scraper-token")
+
+    assert (await client.get("/metrics")).status_code == 401
+    wrong = {"Authorization": "Bearer other"}
+    assert (await client.get("/metrics", headers=wrong)).status_code == 401
+    right = {"Authorization": "Bearer scraper-token"}
+    assert (await client.get("/metrics", headers=right)).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_metrics_are_not_served_in_production_without_token(
+    client: AsyncClient, monkeypatch
+):
+    monkeypatch.setattr(get_settings(), "ENVIRONMENT", "production")
+
+    assert (await client.get("/metrics")).status_code == 404
@@ -1,8 +1,11 @@
 import pytest
 from httpx import AsyncClient
 
+from app.core.cache import get_cache
+from app.core.database import get_session
 from app.domain.schemas.user import UserCreate
 from app.domain.services.user import UserService
+from app.main import app
 
 
 @pytest.mark.asyncio
@@ -85,6 +88,101 @@ async def test_get_study_plan_detail(client: AsyncClient, user_service: UserServ
     assert len(data["sections"]) == 1
 
 
+@pytest.mark.asyncio
+async def test_get_study_plan_detail_streamed(
+    client: AsyncClient, user_service: UserService
+):
+    user_in = UserCreate(
+        email="plan_streamer@example.com",
+        username="planstreamer",
+        password="password123",
+    )
+    user_data = await user_service.create_user(user_in)
+    login_response = await client.post(
+        "/api/v1/auth/login",
+        json={"email": "plan_streamer@example.com", "password": "password123"},
+    )
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+    resource = {"title": "Docs", "url": "https://docs", "type": "documentation"}
+    plan_data = {
+        "title": "Streamed Plan",
+        "description": "Desc",
+        "user_id": str(user_data.id),
+        "resources": [resource],
+        "sections": [
+            {
+                "title": "S1",
+                "resources": [resource],
+                "children": [{"title": "S1.1", "resources": [resource, resource]}],
+            },
+            {"title": "S2"},
+        ],
+    }
+    create_res = await client.post("/api/v1/plan/", json=plan_data, headers=headers)
+    plan_id = create_res.json()["id"]
+
+    built = await client.get(f"/api/v1/plan/{plan_id}", headers=headers)
+    streamed = await client.get(
+        f"/api/v1/plan/{plan_id}", params={"stream": True}, headers=headers
+    )
+
+    assert streamed.status_code == 200
+    assert streamed.headers["content-type"] == "application/json"
+    assert streamed.json() == built.json()
+    assert streamed.json()["progress"]["section_progresses"]
+
+    missing = await client.get(
+        "/api/v1/plan/00000000-0000-0000-0000-000000000000", params={"stream": True}
+    )
+    assert missing.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_get_study_plan_detail_precompressed(
+    client: AsyncClient, user_service: UserService
+):
+    user_in = UserCreate(
+        email="plan_zipper@example.com", username="planzipper", password="password123"
+    )
+    user_data = await user_service.create_user(user_in)
+    login_response = await client.post(
+        "/api/v1/auth/login",
+        json={"email": "plan_zipper@example.com", "password": "password123"},
+    )
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+    plan_data = {
+        "title": "Large Plan",
+        "description": "Desc",
+        "user_id": str(user_data.id),
+        "sections": [{"title": f"Section {i}"} for i in range(20)],
+    }
+    create_res = await client.post("/api/v1/plan/", json=plan_data, headers=headers)
+    plan_id = create_res.json()["id"]
+    gzip_only = {"Accept-Encoding": "gzip"}
+
+    for _ in range(2):
+        response = await client.get(f"/api/v1/plan/{plan_id}", headers=gzip_only)
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.json()["progress"] is None
+        assert len(response.json()["sections"]) == 20
+
+    # Compressed on the first request only, then served from the cache
+    stats = app.dependency_overrides[get_cache]().stats()["plan_tree_body"]
+    assert (stats.loads, stats.local_hits) == (1, 1)
+
+    plain = await client.get(
+        f"/api/v1/plan/{plan_id}", headers={"Accept-Encoding": "identity"}
+    )
+    assert "content-encoding" not in plain.headers
+    assert plain.json() == response.json()
+    assert stats.loads == 2
+
+    missing = await client.get("/api/v1/plan/00000000-0000-0000-0000-000000000000")
+    assert missing.status_code == 404
+
+
 @pytest.mark.asyncio
 async def test_fork_study_plan(client: AsyncClient, user_service: UserService):
     # User 1 creates a plan
@@ -200,6 +298,11 @@ async def test_update_study_plan_endpoint(
     plan_id = create_res.json()["id"]
     s1_id = create_res.json()["sections"][0]["id"]
 
+    # Cache the tree before updating it
+    get_res = await client.get(f"/api/v1/plan/{plan_id}")
+    assert get_res.json()["title"] == "Original"
+    assert get_res.json()["version"] == 1
+
     # 3. Update Plan
     update_data = {
         "title": "Updated",
@@ -222,6 +325,12 @@ async def test_update_study_plan_endpoint(
     assert "S1 Updated" in titles
     assert "S2 New" in titles
 
+    # The update made a new version, cached apart from the first one
+    get_res = await client.get(f"/api/v1/plan/{plan_id}")
+    assert get_res.json()["title"] == "Updated"
+    assert get_res.json()["version"] == 2
+    assert len(get_res.json()["sections"]) == 2
+
 
 @pytest.mark.asyncio
 async def test_create_study_plan_too_deep(
@@ -261,3 +370,47 @@ async def test_create_study_plan_too_deep(
     response = await client.post("/api/v1/plan/", json=plan_data, headers=headers)
     assert response.status_code == 400
     assert "Maximum section nesting depth of 5 exceeded" in response.json()["detail"]
+
+
+class _UnusedSession:
+    """Write session that fails the request if a statement goes through it."""
+
+    def __getattr__(self, name: str):
+        raise AssertionError(f"read-only request used the write session: {name}")
+
+
+@pytest.mark.asyncio
+async def test_read_requests_leave_the_write_session_unused(
+    client: AsyncClient, user_service: UserService
+):
+    user_in = UserCreate(
+        email="plan_reader@example.com", username="planreader", password="password123"
+    )
+    user = await user_service.create_user(user_in)
+    login_res = await client.post(
+        "/api/v1/auth/login",
+        json={"email": "plan_reader@example.com", "password": "password123"},
+    )
+    headers = {"Authorization": f"Bearer {login_res.json()['access_token']}"}
+    plan_data = {
+        "title": "Read Plan",
+        "description": "Desc",
+        "user_id": str(user.id),
+        "sections": [{"title": "S1", "resources": [], "children": []}],
+    }
+    create_res = await client.post("/api/v1/plan/", json=plan_data, headers=headers)
+    plan_id = create_res.json()["id"]
+
+    # On SQLite the write session takes the write lock with its first
+    # statement, so reads must not issue any through it
+    app.dependency_overrides[get_session] = _UnusedSession
+    for url, request_headers in [
+        (f"/api/v1/plan/{plan_id}", {}),
+        (f"/api/v1/plan/{plan_id}?stream=true", {}),
+        ("/api/v1/auth/me", headers),
+        ("/api/v1/analytics/me", headers),
+        ("/api/v1/users/?username=planreader", headers),
+        ("/api/v1/health/", {}),
+    ]:
+        response = await client.get(url, headers=request_headers)
+        assert response.status_code == 200, (url, response.text)
@@ -0,0 +1,162 @@
+import json
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.config import get_settings
+from app.domain.schemas.user import UserCreate
+from app.domain.services.user import UserService
+
+NDJSON = {"Content-Type": "application/x-ndjson"}
+
+
+def _plan(title: str, depth: int = 2) -> dict:
+    section: dict = {
+        "title": f"{title} level {depth}",
+        "resources": [{"title": f"{title} R{depth}", "type": "article"}],
+    }
+    for level in range(depth - 1, 0, -1):
+        section = {"title": f"{title} level {level}", "children": [section]}
+    return {
+        "title": title,
+        "description": f"{title} description",
+        "resources": [{"title": f"{title} docs", "type": "documentation"}],
+        "sections": [section],
+    }
+
+
+async def _login(client: AsyncClient, user_service: UserService, name: str):
+    user = await user_service.create_user(
+        UserCreate(email=f"{name}@example.com", username=name, password="password123")
+    )
+    response = await client.post(
+        "/api/v1/auth/login",
+        json={"email": f"{name}@example.com", "password": "password123"},
+    )
+    return user, {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.mark.asyncio
+async def test_import_and_export_round_trip(
+    client: AsyncClient, user_service: UserService, monkeypatch
+):
+    monkeypatch.setattr(get_settings(), "STUDY_PLAN_IMPORT_CHUNK_SIZE", 2)
+    monkeypatch.setattr(get_settings(), "STUDY_PLAN_EXPORT_BATCH_SIZE", 2)
+    user, headers = await _login(client, user_service, "importer")
+    plans = [_plan(f"Plan {i}", depth=i % 3 + 1) for i in range(5)]
+    # Blank lines are skipped
+    body = "\n".join(json.dumps(plan) for plan in plans) + "\n\n"
+
+    response = await client.post(
+        "/api/v1/plan/import", content=body, headers={**headers, **NDJSON}
+    )
+    assert response.status_code == 201
+    assert response.json() == {"imported": 5}
+
+    listed = await client.get(f"/api/v1/plan/user/{user.id}")
+    assert sorted(plan["title"] for plan in listed.json()) == [
+        f"Plan {i}" for i in range(5)
+    ]
+    detail = await client.get(f"/api/v1/plan/{listed.json()[0]['id']}")
+    assert detail.status_code == 200
+    assert detail.json()["sections"][0]["title"].endswith("level 1")
+
+    response = await client.get(f"/api/v1/plan/user/{user.id}/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    exported = [json.loads(line) for line in response.text.splitlines()]
+    assert len(exported) == 5
+    by_title = {plan["title"]: plan for plan in exported}
+    for plan in plans:
+        exported_plan = by_title[plan["title"]]
+        assert exported_plan["resources"] == [
+            {
+                **plan["resources"][0],
+                "url": None,
+                "description": None,
+                "duration_minutes": None,
+            }
+        ]
+        section, expected = exported_plan["sections"][0], plan["sections"][0]
+        while expected.get("children"):
+            assert section["title"] == expected["title"]
+            section, expected = section["children"][0], expected["children"][0]
+        assert section["resources"][0]["title"] == expected["resources"][0]["title"]
+
+    # The export imports back as is
+    response = await client.post(
+        "/api/v1/plan/import",
+        content=response.text,
+        headers={**headers, **NDJSON},
+    )
+    assert response.json() == {"imported": 5}
+
+
+@pytest.mark.asyncio
+async def test_import_stops_at_invalid_line(
+    client: AsyncClient, user_service: UserService, monkeypatch
+):
+    monkeypatch.setattr(get_settings(), "STUDY_PLAN_IMPORT_CHUNK_SIZE", 2)
+    user, headers = await _login(client, user_service, "badimporter")
+    lines = [json.dumps(_plan(f"Plan {i}")) for i in range(3)]
+    lines.append('{"title": "No description"}')
+    lines.append(json.dumps(_plan("Never read")))
+
+    response = await client.post(
+        "/api/v1/plan/import", content="\n".join(lines), headers={**headers, **NDJSON}
+    )
+    assert response.status_code == 400
+    error = response.json()["error"]
+    assert error["message"] == "Line 4 is not a valid study plan"
+    assert error["detail"]["line"] == 4
+    assert error["detail"]["imported"] == 2
+    assert error["detail"]["errors"][0]["loc"] == ["description"]
+
+    # The first chunk was committed before the bad line was read
+    listed = await client.get(f"/api/v1/plan/user/{user.id}")
+    assert sorted(plan["title"] for plan in listed.json()) == ["Plan 0", "Plan 1"]
+
+
+@pytest.mark.asyncio
+async def test_import_rejects_too_long_line(
+    client: AsyncClient, user_service: UserService, monkeypatch
+):
+    first = json.dumps(_plan("Short")).encode()
+    monkeypatch.setattr(get_settings(), "STUDY_PLAN_IMPORT_MAX_LINE_BYTES", len(first))
+    _, headers = await _login(client, user_service, "longimporter")
+
+    async def body():
+        yield first + b"\n"
+        # A line without end, sent in small chunks
+        for _ in range(len(first) + 1):
+            yield b" "
+
+    response = await client.post(
+        "/api/v1/plan/import", content=body(), headers={**headers, **NDJSON}
+    )
+    assert response.status_code == 400
+    assert response.json()["error"]["detail"] == {"line": 2, "imported": 0}
+
+
+@pytest.mark.asyncio
+async def test_import_rejects_too_deep_plan(
+    client: AsyncClient, user_service: UserService
+):
+    _, headers = await _login(client, user_service, "deepimporter")
+    too_deep = _plan("Deep", depth=get_settings().STUDY_PLAN_MAX_DEPTH + 1)
+
+    response = await client.post(
+        "/api/v1/plan/import",
+        content=json.dumps(too_deep),
+        headers={**headers, **NDJSON},
+    )
+    assert response.status_code == 400
+    assert response.json()["error"]["detail"] == {"line": 1, "imported": 0}
+
+
+@pytest.mark.asyncio
+async def test_export_unknown_user(client: AsyncClient):
+    response = await client.get(
+        "/api/v1/plan/user/00000000-0000-0000-0000-000000000000/export"
+    )
+    assert response.status_code == 404
@@ -0,0 +1,77 @@
+from collections.abc import Iterator
+
+import pytest
+from fastapi import FastAPI, HTTPException, status
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from app.core import database
+from app.core.database import READ_ONLY_OPTION
+from app.core.dependencies import SessionDep
+from app.persistence.model.user import User
+from app.persistence.repository.user import UserRepository
+
+app = FastAPI()
+
+
+@app.post("/users/{username}", status_code=status.HTTP_201_CREATED)
+async def create_user(username: str, session: SessionDep) -> None:
+    await UserRepository(session).create(
+        User(email=f"{username}@example.com", username=username, hashed_password="h")
+    )
+
+
+@app.post("/users/{username}/fail")
+async def create_user_then_fail(username: str, session: SessionDep) -> None:
+    await UserRepository(session).create(
+        User(email=f"{username}@example.com", username=username, hashed_password="h")
+    )
+    raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="boom")
+
+
+@pytest.fixture(name="commits")
+def commits_fixture() -> Iterator[list[Session]]:
+    commits: list[Session] = []
+
+    def record(session: Session) -> None:
+        commits.append(session)
+
+    event.listen(Session, "after_commit", record)
+    yield commits
+    event.remove(Session, "after_commit", record)
+
+
+@pytest.mark.asyncio
+async def test_route_commits_once_or_rolls_back(
+    session: AsyncSession,
+    commits: list[Session],
+    monkeypatch: pytest.MonkeyPatch,
+):
+    # The real `get_session`, on the test database
+    monkeypatch.setattr(
+        database,
+        "async_session_factory",
+        async_sessionmaker(session.bind, expire_on_commit=False),
+    )
+    reader_factory = async_sessionmaker(
+        session.bind.execution_options(**{READ_ONLY_OPTION: True})
+    )
+
+    async def usernames() -> list[str]:
+        async with reader_factory() as reader:
+            return list((await reader.scalars(select(User.username))).all())
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.post("/users/failed/fail")
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert await usernames() == []
+        assert commits == []
+
+        response = await client.post("/users/created")
+        assert response.status_code == status.HTTP_201_CREATED
+        assert await usernames() == ["created"]
+        assert len(commits) == 1
@@ -0,0 +1,85 @@
+import pytest
+from httpx import AsyncClient
+
+# Measured on SQLite and PostgreSQL; lower them when a change saves queries
+BUDGET = {
+    "register": 2,
+    "login": 2,
+    "create_plan": 8,
+    "update_plan": 18,
+    "update_resource_status": 42,
+}
+
+
+@pytest.mark.asyncio
+async def test_write_endpoints_query_budget(client: AsyncClient, max_queries):
+    """
+    Writes trust client-side defaults instead of reading rows back; keep the
+    number of statements per write endpoint from creeping up.
+    """
+
+    async def call(name: str, method: str, url: str, **kwargs):
+        with max_queries(BUDGET[name]):
+            response = await client.request(method, url, **kwargs)
+        assert response.status_code < 400, response.text
+        return response
+
+    user = (
+        await call(
+            "register",
+            "POST",
+            "/api/v1/auth/register",
+            json={
+                "email": "budget@example.com",
+                "username": "budget",
+                "password": "password123",
+            },
+        )
+    ).json()
+    token = (
+        await call(
+            "login",
+            "POST",
+            "/api/v1/auth/login",
+            json={"email": "budget@example.com", "password": "password123"},
+        )
+    ).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    plan = (
+        await call(
+            "create_plan",
+            "POST",
+            "/api/v1/plan/",
+            headers=headers,
+            json={
+                "title": "Budget",
+                "description": "Query budget",
+                "user_id": user["id"],
+                "sections": [
+                    {
+                        "title": "S1",
+                        "resources": [{"title": "R1", "type": "article"}],
+                        "children": [{"title": "S1.1", "resources": []}],
+                    }
+                ],
+            },
+        )
+    ).json()
+    section = plan["sections"][0]
+
+    await call(
+        "update_plan",
+        "PUT",
+        f"/api/v1/plan/{plan['id']}",
+        headers=headers,
+        json={"title": "Budget renamed"},
+    )
+    await call(
+        "update_resource_status",
+        "POST",
+        f"/api/v1/progress/plan/{plan['id']}/sections/{section['id']}"
+        f"/resources/{section['resources'][0]['id']}/status",
+        headers=headers,
+        json={"status": "completed"},
+    )
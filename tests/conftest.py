@@ -1,12 +1,19 @@
-from collections.abc import AsyncGenerator
+import os
+from collections.abc import AsyncGenerator, Callable, Iterator
+from contextlib import AbstractContextManager, contextmanager
 
 import pytest
 from httpx import ASGITransport, AsyncClient
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlmodel import SQLModel
 
+from app.core.cache import Cache, LocalCache, get_cache
 from app.core.config import get_settings
-from app.core.database import get_session
+from app.core.database import create_engine, get_read_session, get_session
+from app.core.instrumentation import QueryStats, track_queries
+from app.core.watchdog import get_loop_watchdog
+from app.domain.services.analytics import AnalyticsService
 from app.domain.services.auth import AuthService
 from app.domain.services.gemini import GeminiService
 from app.domain.services.progress import ProgressService
@@ -14,6 +21,7 @@ from app.domain.services.quiz import QuizService
 from app.domain.services.study_plan import StudyPlanService
 from app.domain.services.user import UserService
 from app.main import app
+from app.persistence.repository.analytics import AnalyticsRepository
 from app.persistence.repository.progress import ProgressRepository
 from app.persistence.repository.quiz import QuizRepository
 from app.persistence.repository.section import SectionRepository
@@ -24,14 +32,21 @@ from app.persistence.repository.user import UserRepository
 settings = get_settings()
 
 
+def pytest_configure(config: pytest.Config) -> None:  # noqa: ARG001
+    # Set by `make test-postgres`, so a missing DATABASE_TEST_URL fails
+    # instead of quietly testing the default SQLite database again
+    expected = os.environ.get("TEST_DATABASE_DIALECT")
+    dialect = make_url(settings.DATABASE_TEST_URL).get_backend_name()
+    if expected and dialect != expected:
+        raise pytest.UsageError(
+            f"TEST_DATABASE_DIALECT is {expected}, "
+            f"but DATABASE_TEST_URL is a {dialect} URL"
+        )
+
+
 @pytest.fixture(name="session")
 async def session_fixture() -> AsyncGenerator[AsyncSession, None]:
-    engine = create_async_engine(
-        settings.DATABASE_TEST_URL,
-        echo=False,
-        future=True,
-        connect_args={"check_same_thread": False},
-    )
+    engine = create_engine(settings.DATABASE_TEST_URL)
 
     async with engine.begin() as conn:
         await conn.run_sync(SQLModel.metadata.create_all)
@@ -46,14 +61,49 @@ async def session_fixture() -> AsyncGenerator[AsyncSession, None]:
     await engine.dispose()
 
 
+@pytest.fixture(name="max_queries")
+def max_queries_fixture() -> Callable[[int], AbstractContextManager[QueryStats]]:
+    """
+    `with max_queries(n): ...` fails if the block runs more than n statements
+    (transaction control excluded), listing the ones it ran.
+    """
+
+    @contextmanager
+    def max_queries(limit: int) -> Iterator[QueryStats]:
+        with track_queries(record_statements=True) as stats:
+            yield stats
+        statements = "\n".join(stats.statements or [])
+        assert stats.count <= limit, (
+            f"{stats.count} statements, expected at most {limit}:\n{statements}"
+        )
+
+    return max_queries
+
+
 @pytest.fixture(name="client")
 async def client_fixture(session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
     app.dependency_overrides[get_session] = lambda: session
+    app.dependency_overrides[get_read_session] = lambda: session
+    cache = Cache(LocalCache(max_entries=1000))
+    app.dependency_overrides[get_cache] = lambda: cache
+    # LOOP_WATCHDOG_ENABLED=true fails tests whose requests block the loop
+    # for more than LOOP_WATCHDOG_THRESHOLD_MS
+    watchdog = get_loop_watchdog()
+    if settings.LOOP_WATCHDOG_ENABLED:
+        await watchdog.start()
     async with AsyncClient(
         transport=ASGITransport(app=app), base_url="http://test"
     ) as client:
         yield client
     app.dependency_overrides.clear()
+    if settings.LOOP_WATCHDOG_ENABLED:
+        await watchdog.stop()
+        blocks = [block for block in watchdog.drain() if block.route]
+        assert not blocks, "\n".join(
+            f"{block.route} blocked the event loop for "
+            f"{block.duration_seconds * 1000:.0f} ms:\n{block.stack}"
+            for block in blocks
+        )
 
 
 @pytest.fixture
@@ -126,3 +176,13 @@ def quiz_service(
     gemini_service: GeminiService,
 ) -> QuizService:
     return QuizService(quiz_repository, study_plan_repository, gemini_service)
+
+
+@pytest.fixture
+def analytics_repository(session: AsyncSession) -> AnalyticsRepository:
+    return AnalyticsRepository(session)
+
+
+@pytest.fixture
+def analytics_service(analytics_repository: AnalyticsRepository) -> AnalyticsService:
+    return AnalyticsService(analytics_repository)
@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+from pydantic import BaseModel
+
+from app.core.cache import Cache, InMemoryCacheBackend, LocalCache
+
+
+class Item(BaseModel):
+    name: str
+
+
+def test_local_cache_evicts_least_recently_used_and_expired():
+    local = LocalCache(max_entries=2)
+    local.set("a", 1, ttl_seconds=60)
+    local.set("b", 2, ttl_seconds=60)
+    assert local.get("a") == 1
+    local.set("c", 3, ttl_seconds=60)
+
+    assert local.get("b") is None
+    assert local.get("a") == 1
+    local.set("d", 4, ttl_seconds=0)
+    assert local.get("d") is None
+
+
+@pytest.mark.asyncio
+async def test_shared_tier_and_versioned_invalidation_across_workers():
+    shared = InMemoryCacheBackend()
+    # Two workers; local copies expire at once so every read consults the
+    # shared tier, as it would after CACHE_LOCAL_TTL_SECONDS
+    worker_a = Cache(LocalCache(100), shared, local_ttl_seconds=0)
+    worker_b = Cache(LocalCache(100), shared, local_ttl_seconds=0)
+    items_a = worker_a.namespace("items", Item, ttl_seconds=60)
+    items_b = worker_b.namespace("items", Item, ttl_seconds=60)
+
+    await items_a.set("1", Item(name="first"))
+    assert await items_b.get("1") == Item(name="first")
+    assert items_b.stats.shared_hits == 1
+
+    await items_b.invalidate_all()
+    assert await items_a.get("1") is None
+    assert items_a.stats.misses == 1
+
+
+@pytest.mark.asyncio
+async def test_get_or_load_coalesces_concurrent_misses():
+    items = Cache(LocalCache(100)).namespace("items", Item, ttl_seconds=60)
+    calls = 0
+
+    async def load() -> Item:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return Item(name="loaded")
+
+    results = await asyncio.gather(*(items.get_or_load("1", load) for _ in range(10)))
+
+    assert calls == 1
+    assert all(result == Item(name="loaded") for result in results)
+    assert items.stats.loads == 1
+    assert items.stats.coalesced == 9
+
+    assert await items.get_or_load("1", load) == Item(name="loaded")
+    assert items.stats.local_hits == 1
+
+    await items.invalidate("1")
+    await items.get_or_load("1", load)
+    assert calls == 2
@@ -0,0 +1,144 @@
+import gzip
+import zlib
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from httpx import ASGITransport, AsyncClient
+
+from app.core import compression
+from app.core.compression import (
+    GZIP,
+    IDENTITY,
+    CompressionBudget,
+    CompressionMiddleware,
+    StreamCompressor,
+    negotiate_encoding,
+)
+
+BODY = b'{"title": "Plan", "sections": []}' * 100
+
+
+def _app(budget: CompressionBudget) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/json")
+    async def json_body() -> Response:
+        return Response(BODY, media_type="application/json")
+
+    @app.get("/small")
+    async def small_body() -> Response:
+        return Response(b"{}", media_type="application/json")
+
+    @app.get("/stream")
+    async def streamed_body() -> StreamingResponse:
+        async def chunks():
+            for _ in range(3):
+                yield BODY
+
+        return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+    @app.get("/binary")
+    async def binary_body() -> Response:
+        return Response(BODY, media_type="application/octet-stream")
+
+    @app.get("/encoded")
+    async def encoded_body() -> Response:
+        return Response(
+            gzip.compress(BODY),
+            media_type="application/json",
+            headers={"Content-Encoding": GZIP},
+        )
+
+    @app.get("/text")
+    async def text_body() -> PlainTextResponse:
+        return PlainTextResponse(BODY.decode())
+
+    app.add_middleware(CompressionMiddleware, minimum_size=1024, budget=budget)
+    return app
+
+
+def test_negotiate_encoding(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+
+    assert negotiate_encoding(None) == IDENTITY
+    assert negotiate_encoding("gzip, deflate") == GZIP
+    assert negotiate_encoding("br") == IDENTITY
+    assert negotiate_encoding("gzip;q=0") == IDENTITY
+    assert negotiate_encoding("*;q=0.5") == GZIP
+    assert negotiate_encoding("*, gzip;q=0") == IDENTITY
+
+    monkeypatch.setattr(compression, "brotli", object())
+    assert negotiate_encoding("gzip, br") == "br"
+    assert negotiate_encoding("gzip, br;q=0.5") == GZIP
+
+
+def test_compression_budget():
+    budget = CompressionBudget(cpu_fraction=0.5)
+    assert budget.available()
+    budget.spend(1.0)
+    assert not budget.available()
+
+    unlimited = CompressionBudget(cpu_fraction=0)
+    unlimited.spend(100.0)
+    assert unlimited.available()
+
+
+def test_stream_compressor_flushes_every_chunk():
+    compressor = StreamCompressor(GZIP)
+    first = compressor.compress(BODY)
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    # The first chunk decodes on its own, before the stream is finished
+    assert decompressor.decompress(first) == BODY
+    rest = compressor.compress(BODY) + compressor.finish()
+    assert decompressor.decompress(rest) == BODY
+    assert gzip.decompress(first + rest) == BODY * 2
+
+
+@pytest.mark.asyncio
+async def test_compression_middleware(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    transport = ASGITransport(app=_app(CompressionBudget(cpu_fraction=0)))
+    gzip_only = {"Accept-Encoding": GZIP}
+
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/json", headers=gzip_only)
+        assert response.headers["content-encoding"] == GZIP
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert int(response.headers["content-length"]) < len(BODY)
+        assert response.content == BODY
+
+        response = await client.get("/stream", headers=gzip_only)
+        assert response.headers["content-encoding"] == GZIP
+        assert "content-length" not in response.headers
+        assert response.content == BODY * 3
+
+        response = await client.get("/text", headers=gzip_only)
+        assert response.headers["content-encoding"] == GZIP
+
+        response = await client.get("/encoded", headers=gzip_only)
+        assert response.headers["content-encoding"] == GZIP
+        assert response.content == BODY
+
+        for path in ("/small", "/binary"):
+            response = await client.get(path, headers=gzip_only)
+            assert "content-encoding" not in response.headers
+
+        response = await client.get("/json", headers={"Accept-Encoding": IDENTITY})
+        assert "content-encoding" not in response.headers
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.content == BODY
+
+
+@pytest.mark.asyncio
+async def test_compression_middleware_over_budget():
+    budget = CompressionBudget(cpu_fraction=0.01)
+    transport = ASGITransport(app=_app(budget))
+
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        budget.spend(1.0)
+        response = await client.get("/json", headers={"Accept-Encoding": GZIP})
+
+    assert "content-encoding" not in response.headers
+    assert response.content == BODY
@@ -0,0 +1,39 @@
+import pytest
+from httpx import AsyncClient
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.instrumentation import QUERY_COUNT_HEADER, track_queries
+
+
+@pytest.mark.asyncio
+async def test_track_queries_nests_and_skips_transaction_control(
+    session: AsyncSession,
+):
+    with track_queries() as outer:
+        await session.execute(text("SELECT 1"))
+        with track_queries(record_statements=True) as inner:
+            await session.execute(text("SELECT 2"))
+        await session.commit()
+
+    assert inner.count == 1
+    assert inner.statements == ["SELECT 2"]
+    assert outer.count == 2
+    assert outer.slowest_statement in ("SELECT 1", "SELECT 2")
+    assert outer.total_seconds >= outer.slowest_seconds > 0
+
+
+@pytest.mark.asyncio
+async def test_request_query_stats_headers_and_metrics(client: AsyncClient):
+    labels = {"method": "GET", "route": "/api/v1/health/"}
+    before = REGISTRY.get_sample_value("db_queries_per_request_sum", labels) or 0
+
+    response = await client.get("/api/v1/health/")
+
+    assert response.status_code == 200
+    assert response.headers[QUERY_COUNT_HEADER] == "1"
+    assert float(response.headers["X-DB-Time-Ms"]) >= 0
+    assert REGISTRY.get_sample_value("db_queries_per_request_sum", labels) == (
+        before + 1
+    )
@@ -0,0 +1,55 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.core.jobs import sample_event_loop_lag
+from app.core.security import PasswordHashPool, verify_password
+
+
+@pytest.mark.asyncio
+async def test_password_hash_pool_runs_off_the_loop_and_drains_its_queue():
+    pool = PasswordHashPool(max_workers=1)
+
+    hashes = await asyncio.gather(*(pool.hash(f"password{i}") for i in range(3)))
+
+    assert all(verify_password(f"password{i}", h) for i, h in enumerate(hashes))
+    assert await pool.verify("password0", hashes[0])
+    assert not await pool.verify("wrong", hashes[0])
+    assert REGISTRY.get_sample_value("password_hash_queue_depth") == 0
+    assert (
+        REGISTRY.get_sample_value(
+            "password_hash_duration_seconds_count", {"operation": "hash"}
+        )
+        or 0
+    ) >= 3
+
+
+@pytest.mark.asyncio
+async def test_sample_event_loop_lag():
+    before = REGISTRY.get_sample_value("event_loop_lag_seconds_count") or 0
+    assert await sample_event_loop_lag() >= 0
+    assert REGISTRY.get_sample_value("event_loop_lag_seconds_count") == before + 1
+
+
+def test_metrics_are_merged_across_processes(tmp_path):
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    record = (
+        "from app.core.metrics import CACHE_REQUESTS; "
+        "CACHE_REQUESTS.labels(namespace='plan_tree', result='miss').inc()"
+    )
+    render = (
+        "from app.core.metrics import render_metrics; "
+        "print(render_metrics()[0].decode())"
+    )
+
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", record], env=env, check=True)
+    output = subprocess.run(
+        [sys.executable, "-c", render], env=env, check=True, capture_output=True
+    ).stdout.decode()
+
+    assert 'cache_requests_total{namespace="plan_tree",result="miss"} 2.0' in output
@@ -0,0 +1,92 @@
+import json
+from datetime import UTC, datetime
+from uuid import uuid4
+
+import pytest
+
+from app.core import streaming
+from app.core.streaming import iter_model_json, stream_json, stream_ndjson
+from app.domain.enums import CompletionStatus, ResourceType
+from app.domain.schemas.progress import StudyPlanProgressRead
+from app.domain.schemas.resource import ResourceRead
+from app.domain.schemas.section import SectionRead
+from app.domain.schemas.study_plan import (
+    StudyPlanProposal,
+    StudyPlanReadDetailWithProgress,
+)
+
+
+def _section(title: str, depth: int) -> SectionRead:
+    return SectionRead(
+        id=uuid4(),
+        title=title,
+        description=None if depth % 2 else 'Ünïcode "quoted" </script>',
+        order=depth,
+        resources=[
+            ResourceRead(
+                id=uuid4(), title=f"{title} R", type=ResourceType.VIDEO, url=None
+            )
+        ],
+        children=[_section(f"{title}.{depth}", depth - 1)] if depth else [],
+    )
+
+
+def _plan() -> StudyPlanReadDetailWithProgress:
+    now = datetime.now(UTC)
+    return StudyPlanReadDetailWithProgress(
+        id=uuid4(),
+        user_id=uuid4(),
+        title="Plan",
+        description="",
+        created_at=now,
+        updated_at=now,
+        sections=[_section("S1", 3), _section("S2", 0)],
+        resources=[],
+        progress=StudyPlanProgressRead(
+            id=uuid4(),
+            study_plan_id=uuid4(),
+            user_id=uuid4(),
+            status=CompletionStatus.IN_PROGRESS,
+            progress=0.5,
+        ),
+    )
+
+
+def test_iter_model_json_matches_model_dump_json():
+    plan = _plan()
+
+    encoded = b"".join(iter_model_json(StudyPlanReadDetailWithProgress, plan))
+
+    assert encoded.decode() == plan.model_dump_json()
+    # Another schema over the same object picks only its own fields
+    proposal = b"".join(iter_model_json(StudyPlanProposal, plan))
+    assert json.loads(proposal) == json.loads(
+        StudyPlanProposal.model_validate(plan, from_attributes=True).model_dump_json()
+    )
+    # Values replace attributes
+    without_progress = iter_model_json(
+        StudyPlanReadDetailWithProgress, plan, progress=None
+    )
+    assert json.loads(b"".join(without_progress))["progress"] is None
+
+
+@pytest.mark.asyncio
+async def test_stream_json_sends_chunks(monkeypatch):
+    monkeypatch.setattr(streaming, "STREAM_CHUNK_BYTES", 100)
+    plan = _plan()
+
+    chunks = [
+        chunk async for chunk in stream_json(StudyPlanReadDetailWithProgress, plan)
+    ]
+
+    assert len(chunks) > 1
+    assert b"".join(chunks).decode() == plan.model_dump_json()
+
+    async def plans():
+        for _ in range(3):
+            yield plan
+
+    lines = b"".join(
+        [chunk async for chunk in stream_ndjson(StudyPlanProposal, plans())]
+    )
+    assert [json.loads(line)["title"] for line in lines.splitlines()] == ["Plan"] * 3
@@ -0,0 +1,44 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.watchdog import LoopWatchdog
+
+
+class Route:
+    path = "/api/v1/things/{id}"
+
+
+@pytest.mark.asyncio
+async def test_watchdog_reports_blocking_callback_with_route_and_stack():
+    watchdog = LoopWatchdog(threshold_seconds=0.05)
+    await watchdog.start()
+    try:
+        handle = watchdog.track({"type": "http", "route": Route()})
+        time.sleep(0.3)
+        watchdog.untrack(handle)
+        # Yielding lets the heartbeat run, which ends the block
+        await asyncio.sleep(0.1)
+        # Waiting on the loop is not blocking it
+        await asyncio.sleep(0.2)
+    finally:
+        await watchdog.stop()
+
+    blocks = watchdog.drain()
+    assert len(blocks) == 1
+    assert blocks[0].route == "/api/v1/things/{id}"
+    assert blocks[0].duration_seconds >= 0.2
+    assert "time.sleep(0.3)" in blocks[0].stack
+
+
+@pytest.mark.asyncio
+async def test_watchdog_without_request_reports_no_route():
+    watchdog = LoopWatchdog(threshold_seconds=0.05)
+    await watchdog.start()
+    time.sleep(0.2)
+    await asyncio.sleep(0.1)
+    await watchdog.stop()
+
+    blocks = watchdog.drain()
+    assert [block.route for block in blocks] == [None]
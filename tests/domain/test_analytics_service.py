@@ -0,0 +1,189 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.enums import CompletionStatus, ResourceType
+from app.domain.schemas.quiz import QuestionUserSelectedOptions
+from app.domain.schemas.resource import ResourceCreate, ResourceUpsert
+from app.domain.schemas.section import SectionCreate, SectionUpsert
+from app.domain.schemas.study_plan import StudyPlanCreate, StudyPlanUpdate
+from app.domain.schemas.user import UserCreate
+from app.domain.services.analytics import AnalyticsService
+from app.domain.services.gemini import GeminiService
+from app.domain.services.progress import ProgressService
+from app.domain.services.quiz import QuizService
+from app.domain.services.study_plan import StudyPlanService
+from app.domain.services.user import UserService
+from app.persistence.model.quiz import Question, QuestionOption, Quiz
+from app.persistence.repository.progress import ProgressRepository
+from app.persistence.repository.quiz import QuizRepository
+from app.persistence.repository.section import SectionRepository
+from app.persistence.repository.study_plan import StudyPlanRepository
+
+
+@pytest.mark.asyncio
+async def test_rollups_follow_status_changes_and_submissions(
+    session: AsyncSession,
+    analytics_service: AnalyticsService,
+    study_plan_service: StudyPlanService,
+    user_service: UserService,
+):
+    progress_service = ProgressService(
+        ProgressRepository(session),
+        StudyPlanRepository(session),
+        SectionRepository(session),
+        analytics_service,
+    )
+    quiz_service = QuizService(
+        QuizRepository(session),
+        StudyPlanRepository(session),
+        GeminiService(),
+        analytics_service,
+    )
+
+    user = await user_service.create_user(
+        UserCreate(email="stats@test.com", username="stats", password="password123")
+    )
+    plan = await study_plan_service.create_study_plan(
+        StudyPlanCreate(
+            title="Stats Plan",
+            description="Test",
+            user_id=user.id,
+            sections=[
+                SectionCreate(
+                    title="S1",
+                    resources=[
+                        ResourceCreate(
+                            title="R1",
+                            type=ResourceType.VIDEO,
+                            duration_minutes=30,
+                        ),
+                        ResourceCreate(
+                            title="R2",
+                            type=ResourceType.ARTICLE,
+                            duration_minutes=15,
+                        ),
+                    ],
+                )
+            ],
+        )
+    )
+    section = plan.sections[0]
+    resources = {r.title: r for r in section.resources}
+    r1, r2 = resources["R1"], resources["R2"]
+
+    for resource in (r1, r2):
+        await progress_service.update_resource_status(
+            user.id, plan.id, section.id, resource.id, CompletionStatus.COMPLETED
+        )
+    # Re-marking a completed resource is not a new completion
+    await progress_service.update_resource_status(
+        user.id, plan.id, section.id, r1.id, CompletionStatus.COMPLETED
+    )
+    await progress_service.update_resource_status(
+        user.id, plan.id, section.id, r2.id, CompletionStatus.IN_PROGRESS
+    )
+
+    quiz = Quiz(
+        study_plan_id=plan.id,
+        user_id=user.id,
+        title="Quiz",
+        difficulty=1.0,
+        duration_minutes=10,
+    )
+    question = Question(title="Q1", description="Desc", order=1)
+    correct = QuestionOption(text="Correct", is_correct=True)
+    question.options.append(correct)
+    quiz.questions.append(question)
+    session.add(quiz)
+    await session.commit()
+
+    await quiz_service.submit_answers(
+        quiz.id,
+        user.id,
+        [
+            QuestionUserSelectedOptions(
+                question_id=question.id, selected_option_id=correct.id
+            )
+        ],
+    )
+
+    summary = await analytics_service.get_user_summary(user.id)
+
+    assert len(summary.daily) == 1
+    day = summary.daily[0]
+    assert day.study_plan_id == plan.id
+    assert day.resources_completed == 1
+    assert day.minutes_studied == 30
+    assert day.quiz_attempts == 1
+    assert day.mean_quiz_score == 100.0
+
+    assert len(summary.plans) == 1
+    assert summary.plans[0].resources_completed == 1
+    assert summary.plans[0].mean_quiz_score == 100.0
+
+
+@pytest.mark.asyncio
+async def test_rollups_drop_completions_reset_by_plan_edits(
+    session: AsyncSession,
+    analytics_service: AnalyticsService,
+    study_plan_service: StudyPlanService,
+    user_service: UserService,
+):
+    progress_service = ProgressService(
+        ProgressRepository(session),
+        StudyPlanRepository(session),
+        SectionRepository(session),
+        analytics_service,
+    )
+
+    user = await user_service.create_user(
+        UserCreate(email="reset@test.com", username="reset", password="password123")
+    )
+    plan = await study_plan_service.create_study_plan(
+        StudyPlanCreate(
+            title="Reset Plan",
+            description="Test",
+            user_id=user.id,
+            sections=[
+                SectionCreate(
+                    title="S1",
+                    resources=[
+                        ResourceCreate(
+                            title="R1",
+                            type=ResourceType.VIDEO,
+                            duration_minutes=30,
+                        )
+                    ],
+                )
+            ],
+        )
+    )
+    section = plan.sections[0]
+    resource = section.resources[0]
+    await progress_service.update_resource_status(
+        user.id, plan.id, section.id, resource.id, CompletionStatus.COMPLETED
+    )
+    summary = await analytics_service.get_user_summary(user.id)
+    assert summary.plans[0].resources_completed == 1
+    assert summary.plans[0].minutes_studied == 30
+
+    # Renaming the section resets its progress
+    await study_plan_service.update_study_plan(
+        plan.id,
+        StudyPlanUpdate(
+            sections=[
+                SectionUpsert(
+                    id=section.id,
+                    title="S1 renamed",
+                    resources=[
+                        ResourceUpsert.model_validate(resource, from_attributes=True)
+                    ],
+                )
+            ]
+        ),
+        progress_service,
+    )
+
+    summary = await analytics_service.get_user_summary(user.id)
+    assert summary.plans[0].resources_completed == 0
+    assert summary.plans[0].minutes_studied == 0
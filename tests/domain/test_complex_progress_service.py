@@ -86,7 +86,9 @@ async def test_complex_nested_progress(
     r3 = s3.resources[0]
 
     # 3. Initialize Progress
-    await progress_service.initialize_study_plan_progress(user.id, plan.id)
+    sp_progress = await progress_service.initialize_study_plan_progress(
+        user.id, plan.id
+    )
 
     # 4. Complete R3 (Deepest level)
     # S3 has 1 resource (R3). Progress should become 1.0
@@ -95,21 +97,27 @@ async def test_complex_nested_progress(
     )
 
     # Verify S3 Progress
-    s3_prog = await progress_service.progress_repo.get_section_progress(user.id, s3.id)
+    s3_prog = await progress_service.progress_repo.get_section_progress(
+        sp_progress.id, s3.id
+    )
     assert s3_prog is not None
     assert s3_prog.progress == 1.0
     assert s3_prog.status == CompletionStatus.COMPLETED
 
     # Verify S2 Progress
     # S2 has R2 (0.0) and S3 (1.0). Total items = 2. Progress = 0.5
-    s2_prog = await progress_service.progress_repo.get_section_progress(user.id, s2.id)
+    s2_prog = await progress_service.progress_repo.get_section_progress(
+        sp_progress.id, s2.id
+    )
     assert s2_prog is not None
     assert s2_prog.progress == 0.5
     assert s2_prog.status == CompletionStatus.IN_PROGRESS
 
     # Verify S1 Progress
     # S1 has R1 (0.0) and S2 (0.5). Total items = 2. Progress = 0.25
-    s1_prog = await progress_service.progress_repo.get_section_progress(user.id, s1.id)
+    s1_prog = await progress_service.progress_repo.get_section_progress(
+        sp_progress.id, s1.id
+    )
     assert s1_prog is not None
     assert s1_prog.progress == 0.25
     assert s1_prog.status == CompletionStatus.IN_PROGRESS
@@ -130,14 +138,18 @@ async def test_complex_nested_progress(
 
     # Verify S2 Progress
     # S2 has R2 (1.0) and S3 (1.0). Progress = 1.0
-    s2_prog = await progress_service.progress_repo.get_section_progress(user.id, s2.id)
+    s2_prog = await progress_service.progress_repo.get_section_progress(
+        sp_progress.id, s2.id
+    )
     assert s2_prog is not None
     assert s2_prog.progress == 1.0
     assert s2_prog.status == CompletionStatus.COMPLETED
 
     # Verify S1 Progress
     # S1 has R1 (0.0) and S2 (1.0). Progress = 0.5
-    s1_prog = await progress_service.progress_repo.get_section_progress(user.id, s1.id)
+    s1_prog = await progress_service.progress_repo.get_section_progress(
+        sp_progress.id, s1.id
+    )
     assert s1_prog is not None
     assert s1_prog.progress == 0.5
 
@@ -155,7 +167,9 @@ async def test_complex_nested_progress(
 
     # Verify S1 Progress
     # S1 has R1 (1.0) and S2 (1.0). Progress = 1.0
-    s1_prog = await progress_service.progress_repo.get_section_progress(user.id, s1.id)
+    s1_prog = await progress_service.progress_repo.get_section_progress(
+        sp_progress.id, s1.id
+    )
     assert s1_prog is not None
     assert s1_prog.progress == 1.0
     assert s1_prog.status == CompletionStatus.COMPLETED
@@ -0,0 +1,145 @@
+import pytest
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.enums import CompletionStatus, ResourceType
+from app.domain.exceptions.base import InvalidOperationException
+from app.domain.schemas.resource import ResourceCreate
+from app.domain.schemas.section import SectionCreate
+from app.domain.schemas.study_plan import StudyPlanCreate
+from app.domain.schemas.user import UserCreate
+from app.domain.services.progress import ProgressService
+from app.domain.services.study_plan import StudyPlanService
+from app.domain.services.user import UserService
+from app.persistence.model.progress_event import ProgressEvent
+
+
+@pytest.mark.asyncio
+async def test_rebuild_progress_from_event_log(
+    session: AsyncSession,
+    study_plan_service: StudyPlanService,
+    progress_service: ProgressService,
+    user_service: UserService,
+):
+    user = await user_service.create_user(
+        UserCreate(email="events@test.com", username="events", password="password123")
+    )
+    # S1 -> R1, S2
+    #       S2 -> R2
+    plan = await study_plan_service.create_study_plan(
+        StudyPlanCreate(
+            title="Event Plan",
+            description="Test",
+            user_id=user.id,
+            sections=[
+                SectionCreate(
+                    title="S1",
+                    resources=[ResourceCreate(title="R1", type=ResourceType.BOOK)],
+                    children=[
+                        SectionCreate(
+                            title="S2",
+                            resources=[
+                                ResourceCreate(title="R2", type=ResourceType.PAPER)
+                            ],
+                        )
+                    ],
+                )
+            ],
+        )
+    )
+    s1 = plan.sections[0]
+    s2 = s1.children[0]
+    r1 = s1.resources[0]
+    r2 = s2.resources[0]
+
+    await progress_service.update_resource_status(
+        user.id, plan.id, s1.id, r1.id, CompletionStatus.COMPLETED
+    )
+    await progress_service.update_resource_status(
+        user.id, plan.id, s2.id, r2.id, CompletionStatus.IN_PROGRESS
+    )
+    await progress_service.update_resource_status(
+        user.id, plan.id, s2.id, r2.id, CompletionStatus.COMPLETED
+    )
+
+    # Events are written with the status changes
+    count = await session.execute(select(func.count()).select_from(ProgressEvent))
+    assert count.scalar_one() == 3
+
+    # Wipe the snapshot, then rebuild it from the log
+    sp_progress = await progress_service.progress_repo.get_study_plan_progress(
+        user.id, plan.id
+    )
+    assert sp_progress is not None
+    assert sp_progress.status == CompletionStatus.COMPLETED
+    for sec_progress in sp_progress.section_progresses:
+        sec_progress.progress = 0.0
+        sec_progress.status = CompletionStatus.NOT_STARTED
+        for rp in sec_progress.resource_progresses:
+            rp.status = CompletionStatus.NOT_STARTED
+            rp.completed_at = None
+    sp_progress.progress = 0.0
+    sp_progress.status = CompletionStatus.NOT_STARTED
+    await session.commit()
+
+    rebuilt = await progress_service.rebuild_study_plan_progress(user.id, plan.id)
+
+    assert rebuilt.progress == 1.0
+    assert rebuilt.status == CompletionStatus.COMPLETED
+    for sec_progress in rebuilt.section_progresses:
+        assert sec_progress.progress == 1.0
+        for rp in sec_progress.resource_progresses:
+            assert rp.status == CompletionStatus.COMPLETED
+            assert rp.completed_at is not None
+
+
+@pytest.mark.asyncio
+async def test_rebuild_refuses_an_incomplete_event_log_until_backfilled(
+    session: AsyncSession,
+    study_plan_service: StudyPlanService,
+    progress_service: ProgressService,
+    user_service: UserService,
+):
+    user = await user_service.create_user(
+        UserCreate(
+            email="unlogged@test.com", username="unlogged", password="password123"
+        )
+    )
+    plan = await study_plan_service.create_study_plan(
+        StudyPlanCreate(
+            title="Unlogged Plan",
+            description="Test",
+            user_id=user.id,
+            sections=[
+                SectionCreate(
+                    title="S1",
+                    resources=[ResourceCreate(title="R1", type=ResourceType.BOOK)],
+                )
+            ],
+        )
+    )
+    s1 = plan.sections[0]
+    await progress_service.update_resource_status(
+        user.id, plan.id, s1.id, s1.resources[0].id, CompletionStatus.COMPLETED
+    )
+    # As for a status changed before the log existed
+    await session.execute(delete(ProgressEvent))
+
+    with pytest.raises(InvalidOperationException):
+        await progress_service.rebuild_study_plan_progress(user.id, plan.id)
+
+    sp_progress = await progress_service.progress_repo.get_study_plan_progress(
+        user.id, plan.id
+    )
+    assert sp_progress is not None
+    assert sp_progress.status == CompletionStatus.COMPLETED
+    completed_at = sp_progress.section_progresses[0].resource_progresses[0].completed_at
+
+    assert await progress_service.backfill_progress_events(batch_size=1) == 1
+    assert await progress_service.backfill_progress_events() == 0
+
+    rebuilt = await progress_service.rebuild_study_plan_progress(user.id, plan.id)
+    assert rebuilt.status == CompletionStatus.COMPLETED
+    rp = rebuilt.section_progresses[0].resource_progresses[0]
+    assert rp.status == CompletionStatus.COMPLETED
+    assert rp.completed_at == completed_at
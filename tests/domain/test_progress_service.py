@@ -79,7 +79,7 @@ async def test_progress_flow(
     # 5. Check Section Progress
     # S1 has 2 resources. 1 completed. Progress should be 0.5
     sec_progress = await progress_service.progress_repo.get_section_progress(
-        user.id, section.id
+        sp_progress.id, section.id
     )
     assert sec_progress is not None
     assert sec_progress.progress == 0.5
@@ -101,7 +101,7 @@ async def test_progress_flow(
 
     # 8. Check Completion
     sec_progress = await progress_service.progress_repo.get_section_progress(
-        user.id, section.id
+        sp_progress.id, section.id
     )
     assert sec_progress is not None
     assert sec_progress.progress == 1.0
@@ -162,7 +162,9 @@ async def test_nested_section_progress(
     r2 = s1_1.resources[0]
 
     # 3. Initialize
-    await progress_service.initialize_study_plan_progress(user.id, plan.id)
+    sp_progress = await progress_service.initialize_study_plan_progress(
+        user.id, plan.id
+    )
 
     # 4. Complete R2 (Child section resource)
     await progress_service.update_resource_status(
@@ -170,7 +172,9 @@ async def test_nested_section_progress(
     )
 
     # Check S1.1 Progress (Should be 100%)
-    sp_1_1 = await progress_service.progress_repo.get_section_progress(user.id, s1_1.id)
+    sp_1_1 = await progress_service.progress_repo.get_section_progress(
+        sp_progress.id, s1_1.id
+    )
     assert sp_1_1 is not None
     assert sp_1_1.progress == 1.0
     assert sp_1_1.status == CompletionStatus.COMPLETED
@@ -178,7 +182,9 @@ async def test_nested_section_progress(
     # Check S1 Progress
     # S1 has 1 Resource (R1 - 0%) and 1 Child (S1.1 - 100%)
     # Total items = 2. Score = 0 + 1 = 1. Progress = 0.5
-    sp_1 = await progress_service.progress_repo.get_section_progress(user.id, s1.id)
+    sp_1 = await progress_service.progress_repo.get_section_progress(
+        sp_progress.id, s1.id
+    )
     assert sp_1 is not None
     assert sp_1.progress == 0.5
     assert sp_1.status == CompletionStatus.IN_PROGRESS
@@ -196,7 +202,9 @@ async def test_nested_section_progress(
     )
 
     # Check S1 Progress (Should be 100%)
-    sp_1 = await progress_service.progress_repo.get_section_progress(user.id, s1.id)
+    sp_1 = await progress_service.progress_repo.get_section_progress(
+        sp_progress.id, s1.id
+    )
     assert sp_1 is not None
     assert sp_1.progress == 1.0
     assert sp_1.status == CompletionStatus.COMPLETED
@@ -234,13 +242,17 @@ async def test_revert_progress(
     s1 = plan.sections[0]
     r1 = s1.resources[0]
 
-    await progress_service.initialize_study_plan_progress(user.id, plan.id)
+    sp_progress = await progress_service.initialize_study_plan_progress(
+        user.id, plan.id
+    )
 
     # Complete
     await progress_service.update_resource_status(
         user.id, plan.id, s1.id, r1.id, CompletionStatus.COMPLETED
     )
-    sp = await progress_service.progress_repo.get_section_progress(user.id, s1.id)
+    sp = await progress_service.progress_repo.get_section_progress(
+        sp_progress.id, s1.id
+    )
     assert sp is not None
     assert sp.progress == 1.0
 
@@ -248,7 +260,9 @@ async def test_revert_progress(
     await progress_service.update_resource_status(
         user.id, plan.id, s1.id, r1.id, CompletionStatus.NOT_STARTED
     )
-    sp = await progress_service.progress_repo.get_section_progress(user.id, s1.id)
+    sp = await progress_service.progress_repo.get_section_progress(
+        sp_progress.id, s1.id
+    )
     assert sp is not None
     assert sp.progress == 0.0
     assert sp.status == CompletionStatus.NOT_STARTED
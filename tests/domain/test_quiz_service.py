@@ -1,5 +1,10 @@
+from datetime import UTC, datetime, timedelta
+
 import pytest
+from sqlalchemy import update
+from sqlmodel import col
 
+from app.domain.enums import QuizState
 from app.domain.schemas.quiz import QuestionUserSelectedOptions
 from app.persistence.model.quiz import Question, QuestionOption, Quiz
 from app.persistence.model.study_plan import StudyPlan
@@ -81,3 +86,135 @@ async def test_submit_answers_multiple_correct_options(quiz_service, session):
     ]
     result4 = await quiz_service.submit_answers(quiz4.id, user.id, answers4)
     assert result4.score == 0.0
+
+
+@pytest.mark.asyncio
+async def test_start_quiz_hides_answer_key(quiz_service, session):
+    user = User(
+        email="test_quiz_public@example.com", username="testuser", hashed_password="pw"
+    )
+    session.add(user)
+    await session.commit()
+
+    study_plan = StudyPlan(user_id=user.id, title="Plan", description="Desc")
+    session.add(study_plan)
+    await session.commit()
+
+    quiz = Quiz(
+        study_plan_id=study_plan.id,
+        user_id=user.id,
+        title="Quiz Public",
+        difficulty=1.0,
+        duration_minutes=10,
+        started_at=None,
+    )
+    q1 = Question(title="Q1", description="Desc", order=1)
+    q1.options.extend(
+        [
+            QuestionOption(text="Wrong 1", is_correct=False),
+            QuestionOption(text="Correct 2", is_correct=True),
+            QuestionOption(text="Correct 1", is_correct=True),
+        ]
+    )
+    q2 = Question(title="Q2", description="Desc", order=2)
+    q2.options.append(QuestionOption(text="Wrong 2", is_correct=False))
+    quiz.questions.extend([q2, q1])
+    session.add(quiz)
+    await session.commit()
+
+    public_quiz = await quiz_service.start_quiz(quiz.id, user.id)
+
+    assert public_quiz.started_at is not None
+    assert [q.title for q in public_quiz.questions] == ["Q1", "Q2"]
+    assert public_quiz.questions[0].correct_answer_count == 2
+    assert public_quiz.questions[1].correct_answer_count == 0
+    assert [o.text for o in public_quiz.questions[0].options] == [
+        "Correct 1",
+        "Correct 2",
+        "Wrong 1",
+    ]
+    dumped = public_quiz.model_dump()
+    assert all(
+        "is_correct" not in option
+        for question in dumped["questions"]
+        for option in question["options"]
+    )
+
+
+@pytest.mark.asyncio
+async def test_close_expired_quizzes(quiz_service, session):
+    user = User(
+        email="test_quiz_expiry@example.com", username="testuser", hashed_password="pw"
+    )
+    session.add(user)
+    await session.commit()
+
+    study_plan = StudyPlan(user_id=user.id, title="Plan", description="Desc")
+    session.add(study_plan)
+    await session.commit()
+
+    def make_quiz(title: str, started_minutes_ago: int | None) -> Quiz:
+        started_at = (
+            datetime.now(UTC) - timedelta(minutes=started_minutes_ago)
+            if started_minutes_ago is not None
+            else None
+        )
+        quiz = Quiz(
+            study_plan_id=study_plan.id,
+            user_id=user.id,
+            title=title,
+            difficulty=1.0,
+            duration_minutes=10,
+            started_at=started_at,
+        )
+        question = Question(title="Q1", description="Desc", order=1)
+        question.options.append(QuestionOption(text="Correct", is_correct=True))
+        quiz.questions.append(question)
+        return quiz
+
+    expired_1 = make_quiz("Expired 1", 30)
+    expired_2 = make_quiz("Expired 2", 20)
+    legacy = make_quiz("Legacy", 40)
+    active = make_quiz("Active", 1)
+    not_started = make_quiz("Not started", None)
+    session.add_all([expired_1, expired_2, legacy, active, not_started])
+    await session.commit()
+    # As stored before `expires_at` was
+    await session.execute(
+        update(Quiz).where(col(Quiz.id) == legacy.id).values(expires_at=None)
+    )
+    await session.commit()
+
+    assert expired_1.expires_at is not None
+    assert not_started.expires_at is None
+
+    expired = await quiz_service.list_quizzes(study_plan.id, user.id, QuizState.EXPIRED)
+    assert {q.title for q in expired} == {"Expired 1", "Expired 2"}
+
+    closed = await quiz_service.close_expired_quizzes(batch_size=1)
+    assert closed == 3
+
+    for quiz in (expired_1, expired_2, legacy):
+        await session.refresh(quiz)
+        assert quiz.completed_at is not None
+        assert quiz.completed_at == quiz.expires_at
+        assert quiz.score == 0.0
+
+    # A sweep that loaded a quiz before another one closed it leaves it alone
+    repo = quiz_service.quiz_repo
+    assert await repo.close_expired([expired_1], {expired_1.id: 100.0}) == []
+    await session.refresh(expired_1)
+    assert expired_1.score == 0.0
+
+    completed = await quiz_service.list_quizzes(
+        study_plan.id, user.id, QuizState.COMPLETED
+    )
+    assert {q.title for q in completed} == {"Expired 1", "Expired 2", "Legacy"}
+    active_quizzes = await quiz_service.list_quizzes(
+        study_plan.id, user.id, QuizState.ACTIVE
+    )
+    assert [q.title for q in active_quizzes] == ["Active"]
+    pending = await quiz_service.list_quizzes(
+        study_plan.id, user.id, QuizState.NOT_STARTED
+    )
+    assert [q.title for q in pending] == ["Not started"]
@@ -1,15 +1,21 @@
+import gzip
 from uuid import uuid4
 
 import pytest
 
-from app.domain.enums import ResourceType
+from app.domain.enums import CompletionStatus, ResourceType
 from app.domain.schemas.resource import ResourceCreate, ResourceUpsert
 from app.domain.schemas.section import SectionCreate, SectionUpsert
-from app.domain.schemas.study_plan import StudyPlanCreate, StudyPlanUpdate
+from app.domain.schemas.study_plan import (
+    StudyPlanCreate,
+    StudyPlanReadDetail,
+    StudyPlanUpdate,
+)
 from app.domain.schemas.user import UserCreate
 from app.domain.services.progress import ProgressService
 from app.domain.services.study_plan import StudyPlanService
 from app.domain.services.user import UserService
+from app.persistence.repository.section import SectionRepository
 
 
 @pytest.fixture
@@ -299,3 +305,352 @@ async def test_update_study_plan(
     assert s2.title == "S2"
     assert len(s2.resources) == 1
     assert s2.resources[0].title == "R2"
+
+
+@pytest.mark.asyncio
+async def test_resources_are_shared_across_plans(
+    study_plan_service: StudyPlanService, user
+):
+    docs = ResourceCreate(
+        title="Python Docs", url="https://docs.python.org", type=ResourceType.ARTICLE
+    )
+    # Same resource: the URL differs only by case, tracking params and slash
+    same_docs = ResourceCreate(
+        title=" python  docs",
+        url="HTTPS://Docs.Python.org/?utm_source=newsletter",
+        type=ResourceType.ARTICLE,
+    )
+    first = await study_plan_service.create_study_plan(
+        StudyPlanCreate(
+            title="First",
+            description="Desc",
+            user_id=user.id,
+            resources=[docs],
+            sections=[SectionCreate(title="S1", resources=[docs, same_docs])],
+        )
+    )
+    second = await study_plan_service.create_study_plan(
+        StudyPlanCreate(
+            title="Second",
+            description="Desc",
+            user_id=user.id,
+            sections=[SectionCreate(title="S1", resources=[same_docs])],
+        )
+    )
+    forked = await study_plan_service.fork_study_plan(first.id, user.id)
+
+    assert len(first.sections[0].resources) == 1
+    resource_id = first.resources[0].id
+    assert first.sections[0].resources[0].id == resource_id
+    assert second.sections[0].resources[0].id == resource_id
+    assert forked.resources[0].id == resource_id
+    assert forked.sections[0].resources[0].id == resource_id
+
+
+@pytest.mark.asyncio
+async def test_update_shared_resource_is_copy_on_write(
+    study_plan_service: StudyPlanService,
+    progress_service: ProgressService,
+    user,
+):
+    resource = ResourceCreate(title="R1", url="http://r1", type=ResourceType.ARTICLE)
+    plan_in = StudyPlanCreate(
+        title="Plan",
+        description="Desc",
+        user_id=user.id,
+        sections=[SectionCreate(title="S1", resources=[resource])],
+    )
+    plan = await study_plan_service.create_study_plan(plan_in)
+    other = await study_plan_service.create_study_plan(plan_in)
+    shared_id = plan.sections[0].resources[0].id
+    assert other.sections[0].resources[0].id == shared_id
+
+    updated = await study_plan_service.update_study_plan(
+        plan.id,
+        StudyPlanUpdate(
+            sections=[
+                SectionUpsert(
+                    id=plan.sections[0].id,
+                    title="S1",
+                    resources=[
+                        ResourceUpsert(
+                            id=shared_id,
+                            title="R1 (2nd edition)",
+                            url="http://r1",
+                            type=ResourceType.ARTICLE,
+                        )
+                    ],
+                )
+            ]
+        ),
+        progress_service,
+    )
+
+    edited = updated.sections[0].resources[0]
+    assert edited.id != shared_id
+    assert edited.title == "R1 (2nd edition)"
+    detail = await study_plan_service.get_study_plan_detailed(other.id)
+    assert detail.sections[0].resources[0].id == shared_id
+    assert detail.sections[0].resources[0].title == "R1"
+
+
+async def _create_forkable_plan(study_plan_service: StudyPlanService, user):
+    return await study_plan_service.create_study_plan(
+        StudyPlanCreate(
+            title="Source",
+            description="Desc",
+            user_id=user.id,
+            sections=[
+                SectionCreate(
+                    title="S1",
+                    resources=[
+                        ResourceCreate(
+                            title="R1", url="http://r1", type=ResourceType.ARTICLE
+                        )
+                    ],
+                ),
+                SectionCreate(title="S2"),
+            ],
+        )
+    )
+
+
+def _keep_s1_rename_s2(plan) -> StudyPlanUpdate:
+    s1, s2 = plan.sections
+    r1 = s1.resources[0]
+    return StudyPlanUpdate(
+        sections=[
+            SectionUpsert(
+                id=s1.id,
+                title=s1.title,
+                resources=[
+                    ResourceUpsert(id=r1.id, title=r1.title, url=r1.url, type=r1.type)
+                ],
+            ),
+            SectionUpsert(id=s2.id, title="S2 edited"),
+        ]
+    )
+
+
+@pytest.mark.asyncio
+async def test_fork_shares_tree_until_edited(
+    study_plan_service: StudyPlanService,
+    progress_service: ProgressService,
+    user,
+):
+    source = await _create_forkable_plan(study_plan_service, user)
+    s1_id = source.sections[0].id
+    r1_id = source.sections[0].resources[0].id
+
+    fork = await study_plan_service.fork_study_plan(source.id, user.id)
+    fork_of_fork = await study_plan_service.fork_study_plan(fork.id, user.id)
+
+    assert fork.tree_source_id == source.id
+    assert [s.id for s in fork.sections] == [s.id for s in source.sections]
+    # Forks of forks read the rows of the plan owning them, not a chain
+    assert fork_of_fork.tree_source_id == source.id
+    assert fork_of_fork.forked_from_id == fork.id
+
+    # Progress on the shared sections is kept per plan
+    fork_progress = await progress_service.initialize_study_plan_progress(
+        user.id, fork.id
+    )
+    source_progress = await progress_service.initialize_study_plan_progress(
+        user.id, source.id
+    )
+    await progress_service.update_resource_status(
+        user.id, fork.id, s1_id, r1_id, CompletionStatus.COMPLETED
+    )
+    repo = progress_service.progress_repo
+    assert (await repo.get_section_progress(fork_progress.id, s1_id)).progress == 1.0
+    assert (await repo.get_section_progress(source_progress.id, s1_id)).progress == 0
+
+    edited = await study_plan_service.update_study_plan(
+        fork.id, _keep_s1_rename_s2(fork), progress_service
+    )
+
+    assert edited.tree_source_id is None
+    assert [s.title for s in edited.sections] == ["S1", "S2 edited"]
+    assert s1_id not in {s.id for s in edited.sections}
+    assert edited.sections[0].resources[0].id == r1_id
+    # The progress moved over to the copies
+    copied_s1 = await repo.get_section_progress(fork_progress.id, edited.sections[0].id)
+    assert copied_s1.progress == 1.0
+
+    for plan_id in (source.id, fork_of_fork.id):
+        plan = await study_plan_service.get_study_plan_detailed(plan_id)
+        assert [s.title for s in plan.sections] == ["S1", "S2"]
+        assert plan.sections[0].id == s1_id
+
+
+@pytest.mark.asyncio
+async def test_update_shared_source_hands_tree_to_fork(
+    study_plan_service: StudyPlanService,
+    progress_service: ProgressService,
+    user,
+):
+    source = await _create_forkable_plan(study_plan_service, user)
+    section_ids = [s.id for s in source.sections]
+    s1_id, r1_id = section_ids[0], source.sections[0].resources[0].id
+    first_fork = await study_plan_service.fork_study_plan(source.id, user.id)
+    second_fork = await study_plan_service.fork_study_plan(source.id, user.id)
+    sp_progress = await progress_service.initialize_study_plan_progress(
+        user.id, source.id
+    )
+    await progress_service.update_resource_status(
+        user.id, source.id, s1_id, r1_id, CompletionStatus.COMPLETED
+    )
+
+    edited = await study_plan_service.update_study_plan(
+        source.id, _keep_s1_rename_s2(source), progress_service
+    )
+
+    assert [s.title for s in edited.sections] == ["S1", "S2 edited"]
+    assert not {s.id for s in edited.sections} & set(section_ids)
+    repo = progress_service.progress_repo
+    copied_s1 = await repo.get_section_progress(sp_progress.id, edited.sections[0].id)
+    assert copied_s1.progress == 1.0
+
+    # The oldest fork took over the rows, the other one now shares its tree
+    heir = await study_plan_service.get_study_plan_detailed(first_fork.id)
+    other = await study_plan_service.get_study_plan_detailed(second_fork.id)
+    assert heir.tree_source_id is None
+    assert other.tree_source_id == first_fork.id
+    for plan in (heir, other):
+        assert [s.id for s in plan.sections] == section_ids
+        assert [s.title for s in plan.sections] == ["S1", "S2"]
+
+
+@pytest.mark.asyncio
+async def test_update_versions_plan_and_keeps_snapshots(
+    study_plan_service: StudyPlanService, progress_service: ProgressService, user
+):
+    plan = await _create_forkable_plan(study_plan_service, user)
+    repo = study_plan_service.study_plan_repository
+    assert plan.version == 1
+
+    # Each version is stored by the write that makes it, before any read
+    stored = await repo.get_snapshot(plan.id, 1)
+    assert stored is not None
+    first = await study_plan_service.get_study_plan_tree(plan.id)
+    assert first.version == 1
+    # Later reads of the version decode the stored snapshot
+    assert await study_plan_service.get_study_plan_tree(plan.id) == first
+
+    update_in = _keep_s1_rename_s2(plan)
+    update_in.title = "Renamed"
+    edited = await study_plan_service.update_study_plan(
+        plan.id, update_in, progress_service
+    )
+    assert edited.version == 2
+    assert edited.title == "Renamed"
+    assert await repo.get_snapshot(plan.id, 2) is not None
+
+    second = await study_plan_service.get_study_plan_tree(plan.id)
+    assert second.version == 2
+    assert second.title == "Renamed"
+    assert [s.title for s in second.sections] == ["S1", "S2 edited"]
+    # The first version is left as it was read
+    assert await repo.get_snapshot(plan.id, 1) == stored
+    assert StudyPlanReadDetail.model_validate_json(gzip.decompress(stored)) == first
+
+
+@pytest.mark.asyncio
+async def test_follower_progress_catches_up_with_plan_version(
+    study_plan_service: StudyPlanService,
+    progress_service: ProgressService,
+    user_service: UserService,
+    user,
+):
+    plan = await _create_forkable_plan(study_plan_service, user)
+    follower = await user_service.create_user(
+        UserCreate(
+            email="follower@example.com", username="follower", password="password123"
+        )
+    )
+    progress = await progress_service.initialize_study_plan_progress(
+        follower.id, plan.id
+    )
+    assert progress.plan_version == 1
+
+    update_in = _keep_s1_rename_s2(plan)
+    update_in.sections.append(SectionUpsert(title="S3"))
+    edited = await study_plan_service.update_study_plan(
+        plan.id, update_in, progress_service
+    )
+
+    # Only the owner's progress follows the edit, the follower's on next use
+    caught_up = await progress_service.initialize_study_plan_progress(
+        follower.id, plan.id
+    )
+    assert caught_up.plan_version == edited.version == 2
+    assert {sp.section_id for sp in caught_up.section_progresses} == {
+        s.id for s in edited.sections
+    }
+
+
+@pytest.mark.asyncio
+async def test_update_removes_subtrees_with_their_progress(
+    study_plan_service: StudyPlanService,
+    progress_service: ProgressService,
+    section_repository: SectionRepository,
+    user,
+):
+    plan = await study_plan_service.create_study_plan(
+        StudyPlanCreate(
+            title="Tree",
+            description="Desc",
+            user_id=user.id,
+            sections=[
+                SectionCreate(
+                    title="A",
+                    children=[
+                        SectionCreate(
+                            title="A1",
+                            resources=[
+                                ResourceCreate(
+                                    title="R", url="http://r", type=ResourceType.ARTICLE
+                                )
+                            ],
+                        )
+                    ],
+                ),
+                SectionCreate(title="B"),
+            ],
+        )
+    )
+    a, b = plan.sections
+    a1 = a.children[0]
+    assert await section_repository.get_ancestor_ids(a1.id) == [a1.id, a.id]
+    sp_progress = await progress_service.initialize_study_plan_progress(
+        user.id, plan.id
+    )
+    await progress_service.update_resource_status(
+        user.id, plan.id, a1.id, a1.resources[0].id, CompletionStatus.COMPLETED
+    )
+
+    edited = await study_plan_service.update_study_plan(
+        plan.id,
+        StudyPlanUpdate(
+            sections=[
+                SectionUpsert(id=b.id, title="B", children=[SectionUpsert(title="B1")])
+            ]
+        ),
+        progress_service,
+    )
+
+    assert [s.title for s in edited.sections] == ["B"]
+    b1 = edited.sections[0].children[0]
+    # New sections get their closure rows, removed subtrees lose theirs
+    assert await section_repository.get_ancestor_ids(b1.id) == [b1.id, b.id]
+    assert await section_repository.get_descendant_ids([a.id]) == []
+    assert await section_repository.get_by_ids([a.id, a1.id]) == [None, None]
+    progresses = await progress_service.progress_repo.get_section_progresses(
+        sp_progress.id, [a.id, a1.id, b.id, b1.id]
+    )
+    assert [progress is not None for progress in progresses] == [
+        False,
+        False,
+        True,
+        True,
+    ]
@@ -49,3 +49,29 @@ async def test_create_user_duplicate_email(user_service: UserService):
     )
     with pytest.raises(AlreadyExistsException):
         await user_service.create_user(user_in_2)
+
+
+@pytest.mark.asyncio
+async def test_create_user_duplicate_email_race(
+    user_service: UserService, monkeypatch: pytest.MonkeyPatch
+):
+    first = await user_service.create_user(
+        UserCreate(email="race@example.com", username="first", password="password1")
+    )
+
+    # Simulate a concurrent signup slipping past the email check
+    async def not_found(_email: str) -> None:
+        return None
+
+    monkeypatch.setattr(user_service, "get_user_by_email", not_found)
+    with pytest.raises(AlreadyExistsException):
+        await user_service.create_user(
+            UserCreate(
+                email="race@example.com", username="second", password="password1"
+            )
+        )
+
+    # Only the savepoint was rolled back, earlier work is still there
+    assert await user_service.get_by_id(first.id) is first
+    _, total = await user_service.fetch()
+    assert total == 1
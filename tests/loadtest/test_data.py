@@ -0,0 +1,55 @@
+from random import Random
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlmodel import col
+
+from app.domain.enums import CompletionStatus
+from app.persistence.model.progress import ResourceProgress, StudyPlanProgress
+from app.persistence.model.quiz import Quiz
+from benchmarks.data import SeedConfig, build_sections, seed
+
+
+def test_build_sections_depth_and_fanout():
+    sections = build_sections(depth=2, fanout=3, resources_per_section=2, rng=Random(1))
+
+    assert [s.title for s in sections] == ["Section 1", "Section 2", "Section 3"]
+    assert [c.title for c in sections[1].children] == [
+        "Section 2.1",
+        "Section 2.2",
+        "Section 2.3",
+    ]
+    assert all(not c.children for s in sections for c in s.children)
+    assert all(len(c.resources) == 2 for s in sections for c in s.children)
+
+
+@pytest.mark.asyncio
+async def test_seed_creates_plans_progress_and_quizzes(session: AsyncSession):
+    config = SeedConfig(
+        users=2,
+        plans_per_user=2,
+        depth=2,
+        fanout=2,
+        resources_per_section=2,
+        completed_ratio=0.5,
+        quizzes_per_user=1,
+    )
+
+    users = await seed(
+        config, Random(1), async_sessionmaker(session.bind, expire_on_commit=False)
+    )
+
+    assert len(users) == 2
+    # 2 + 4 sections of 2 resources each per plan
+    assert all(len(plan.resources) == 12 for user in users for plan in user.plans)
+    completed = await session.scalar(
+        select(func.count())
+        .select_from(ResourceProgress)
+        .where(col(ResourceProgress.status) == CompletionStatus.COMPLETED)
+    )
+    assert completed == 2 * 2 * 6
+    progresses = (await session.execute(select(StudyPlanProgress))).scalars().all()
+    assert len(progresses) == 4
+    assert all(0 < p.progress < 1 for p in progresses)
+    assert await session.scalar(select(func.count()).select_from(Quiz)) == 2
@@ -0,0 +1,86 @@
+from benchmarks.report import (
+    TOTAL,
+    RouteStats,
+    compare,
+    percentile,
+    summarize,
+    uncompared,
+    undersampled,
+)
+from benchmarks.scenarios import Sample
+
+
+def _stats(route: str, requests: int = 100, errors: int = 0, **kwargs) -> RouteStats:
+    values = {"rps": 10.0, "p50_ms": 10.0, "p95_ms": 50.0, "p99_ms": 80.0} | kwargs
+    return RouteStats(route=route, requests=requests, errors=errors, **values)
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile(values, 100) == 100.0
+    assert percentile([7.0], 99) == 7.0
+    assert percentile([], 50) == 0.0
+
+
+def test_summarize_per_route_and_total():
+    samples = [
+        Sample("GET /plan/{plan_id}", 200, 0.010),
+        Sample("GET /plan/{plan_id}", 200, 0.030),
+        Sample("POST /auth/login", 401, 0.100),
+    ]
+
+    stats = summarize(samples, duration_seconds=2.0)
+
+    plan = stats["GET /plan/{plan_id}"]
+    assert (plan.requests, plan.errors, plan.rps) == (2, 0, 1.0)
+    assert plan.p50_ms == 10.0
+    assert plan.p99_ms == 30.0
+    assert stats["POST /auth/login"].errors == 1
+    assert stats[TOTAL].requests == 3
+    assert list(stats)[-1] == TOTAL
+
+
+def test_compare_flags_latency_throughput_and_new_errors():
+    baseline = {
+        "GET /a": _stats("GET /a"),
+        "GET /b": _stats("GET /b"),
+        "GET /c": _stats("GET /c"),
+        "GET /d": _stats("GET /d"),
+        "GET /f": _stats("GET /f"),
+    }
+    current = {
+        # Within tolerance
+        "GET /a": _stats("GET /a", p95_ms=55.0, rps=9.0),
+        "GET /b": _stats("GET /b", p95_ms=70.0),
+        "GET /c": _stats("GET /c", rps=5.0, errors=3),
+        # Too few samples to tell
+        "GET /d": _stats("GET /d", requests=5, p95_ms=500.0),
+        # Not in the baseline
+        "GET /e": _stats("GET /e", p95_ms=500.0),
+    }
+
+    regressions = compare(current, baseline, tolerance=0.2)
+
+    assert regressions == [
+        "GET /b: p95 70.0 ms, baseline 50.0 ms",
+        "GET /c: 5.0 rps, baseline 10.0 rps",
+        "GET /c: 3 errors, baseline none",
+    ]
+    assert uncompared(current, baseline) == [
+        "GET /d: 5 requests, baseline 100, fewer than 20",
+        "GET /e: not in the baseline",
+        "GET /f: not requested in this run",
+    ]
+
+
+def test_undersampled_routes():
+    stats = {"GET /a": _stats("GET /a"), "GET /b": _stats("GET /b", requests=19)}
+
+    assert undersampled(stats, min_requests=20) == ["GET /b: 19 requests"]
+    assert undersampled(stats, min_requests=20, routes=["GET /a", "GET /c"]) == [
+        "GET /b: 19 requests",
+        "GET /c: 0 requests",
+    ]
@@ -0,0 +1,33 @@
+from random import Random
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.dependencies import get_gemini_service
+from app.main import app
+from benchmarks.data import SeedConfig, seed
+from benchmarks.fakes import FakeGeminiService
+from benchmarks.scenarios import ROUTES, Recorder, VirtualUser
+
+
+@pytest.mark.asyncio
+async def test_scenarios_call_every_listed_route(
+    session: AsyncSession, client: AsyncClient
+):
+    app.dependency_overrides[get_gemini_service] = FakeGeminiService
+    config = SeedConfig(
+        users=1, plans_per_user=1, depth=1, fanout=1, quizzes_per_user=0
+    )
+    users = await seed(
+        config, Random(1), async_sessionmaker(session.bind, expire_on_commit=False)
+    )
+
+    recorder = Recorder()
+    user = VirtualUser(users[0], client, recorder, Random(1))
+    await user.login()
+    for scenario, _weight in user.scenarios:
+        await scenario()
+
+    assert {sample.route for sample in recorder.samples} == set(ROUTES)
+    assert all(sample.status < 400 for sample in recorder.samples)
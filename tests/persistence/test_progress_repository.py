@@ -0,0 +1,147 @@
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.instrumentation import track_queries
+from app.domain.enums import ResourceType
+from app.persistence.model.progress import ResourceProgress, SectionProgress
+from app.persistence.model.resource import Resource
+from app.persistence.model.section import Section
+from app.persistence.model.study_plan import StudyPlan
+from app.persistence.model.user import User
+from app.persistence.repository.progress import ProgressRepository
+from app.persistence.repository.section import SectionRepository
+
+
+async def _create_plan(session: AsyncSession) -> tuple[User, StudyPlan, list[Section]]:
+    user = User(
+        email="progress_repo@example.com", username="progressrepo", hashed_password="h"
+    )
+    plan = StudyPlan(title="Plan", description="Plan", user=user)
+    root = Section(title="Root", study_plan=plan)
+    child = Section(title="Child", parent=root)
+    leaf = Section(title="Leaf", parent=child)
+    leaf.resources.append(
+        Resource(title="R", type=ResourceType.ARTICLE, fingerprint="r")
+    )
+    session.add_all([user, plan, root, child, leaf])
+    await session.flush()
+    await SectionRepository(session).add_closure([root, child, leaf])
+    await session.commit()
+    return user, plan, [root, child, leaf]
+
+
+@pytest.mark.asyncio
+async def test_get_ancestor_and_descendant_ids(
+    session: AsyncSession, section_repository: SectionRepository
+):
+    _, _, (root, child, leaf) = await _create_plan(session)
+
+    assert await section_repository.get_ancestor_ids(leaf.id) == [
+        leaf.id,
+        child.id,
+        root.id,
+    ]
+    assert await section_repository.get_ancestor_ids(root.id) == [root.id]
+    assert set(await section_repository.get_descendant_ids([child.id])) == {
+        child.id,
+        leaf.id,
+    }
+
+
+@pytest.mark.asyncio
+async def test_progress_rows_are_inserted_once(
+    session: AsyncSession, progress_repository: ProgressRepository
+):
+    user, plan, (root, _, leaf) = await _create_plan(session)
+
+    sp_progress_id = await progress_repository.create_study_plan_progress_if_missing(
+        user.id, plan.id
+    )
+    assert sp_progress_id is not None
+    assert (
+        await progress_repository.create_study_plan_progress_if_missing(
+            user.id, plan.id
+        )
+        is None
+    )
+
+    sec_progress = SectionProgress(
+        user_id=user.id, section_id=root.id, study_plan_progress_id=sp_progress_id
+    )
+    res_progress = ResourceProgress(
+        user_id=user.id,
+        resource_id=leaf.resources[0].id,
+        section_progress_id=sec_progress.id,
+    )
+    await progress_repository.insert_missing_progress([sec_progress], [res_progress])
+    # A second attempt for the same section and resource is skipped
+    await progress_repository.insert_missing_progress(
+        [
+            SectionProgress(
+                user_id=user.id,
+                section_id=root.id,
+                study_plan_progress_id=sp_progress_id,
+            )
+        ],
+        [
+            ResourceProgress(
+                user_id=user.id,
+                resource_id=leaf.resources[0].id,
+                section_progress_id=sec_progress.id,
+            )
+        ],
+    )
+
+    sp_progress = await progress_repository.get_study_plan_progress(user.id, plan.id)
+    assert sp_progress is not None
+    assert sp_progress.id == sp_progress_id
+    assert [sp.id for sp in sp_progress.section_progresses] == [sec_progress.id]
+    assert [rp.id for rp in sp_progress.section_progresses[0].resource_progresses] == [
+        res_progress.id
+    ]
+
+
+@pytest.mark.asyncio
+async def test_section_progress_lookups_are_batched_and_memoized(
+    session: AsyncSession, progress_repository: ProgressRepository
+):
+    user, plan, sections = await _create_plan(session)
+    sp_progress_id = await progress_repository.create_study_plan_progress_if_missing(
+        user.id, plan.id
+    )
+    assert sp_progress_id is not None
+    await progress_repository.insert_missing_progress(
+        [
+            SectionProgress(
+                user_id=user.id,
+                section_id=section.id,
+                study_plan_progress_id=sp_progress_id,
+            )
+            for section in sections
+        ],
+        [],
+    )
+
+    with track_queries(record_statements=True) as stats:
+        progresses = await asyncio.gather(
+            *(
+                progress_repository.get_section_progress(sp_progress_id, section.id)
+                for section in sections
+            )
+        )
+        assert [p.section_id for p in progresses if p] == [s.id for s in sections]
+        assert stats.statements is not None
+        section_queries = [s for s in stats.statements if "FROM section_progress" in s]
+        assert len(section_queries) == 1
+
+        # Memoized for the rest of the request...
+        await progress_repository.get_section_progress(sp_progress_id, sections[0].id)
+        assert len([s for s in stats.statements if "FROM section_progress" in s]) == 1
+
+        # ...until the session writes
+        progresses[0].progress = 0.5
+        await session.commit()
+        await progress_repository.get_section_progress(sp_progress_id, sections[0].id)
+        assert len([s for s in stats.statements if "FROM section_progress" in s]) == 2
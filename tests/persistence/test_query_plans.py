@@ -0,0 +1,267 @@
+"""
+Query-plan snapshots of the repositories' hot statements. Each case runs a
+repository call against a seeded database, captures the statements it
+executes and asks the database how it would run them (EXPLAIN QUERY PLAN on
+SQLite, EXPLAIN on PostgreSQL with sequential scans discouraged). The test
+fails when a statement scans a table, or when a plan drifts from the
+snapshot in `query_plans/<dialect>.json`. After an intended change,
+regenerate the snapshot with
+
+    UPDATE_QUERY_PLANS=1 pytest tests/persistence/test_query_plans.py
+"""
+
+import json
+import os
+import re
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, timedelta
+from pathlib import Path
+from random import Random
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, async_sessionmaker
+from sqlmodel import SQLModel
+
+from app.core.security import hash_refresh_token
+from app.persistence.model.token import RefreshToken
+from app.persistence.repository.analytics import AnalyticsRepository
+from app.persistence.repository.progress import ProgressRepository
+from app.persistence.repository.quiz import QuizRepository
+from app.persistence.repository.section import SectionRepository
+from app.persistence.repository.study_plan import StudyPlanRepository
+from app.persistence.repository.token import RefreshTokenRepository
+from app.persistence.repository.user import UserRepository
+from benchmarks.data import SeedConfig, SeededUser, seed
+
+SNAPSHOTS = Path(__file__).parent / "query_plans"
+REFRESH_TOKEN = "query-plan-token"
+
+_TRANSACTION_CONTROL = ("BEGIN", "COMMIT", "ROLLBACK", "SAVEPOINT", "RELEASE")
+# Literals PostgreSQL inlines into custom plans, e.g. '3f0c...'::uuid
+_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_SQLITE_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+?)(?:_\d+)?(?: |$)")
+_POSTGRES_SCAN = re.compile(r"Seq Scan on (\w+)")
+
+
+@dataclass
+class Seeded:
+    user: SeededUser
+    quiz_id: UUID
+    study_plan_progress_id: UUID
+    section_progress_id: UUID
+
+
+Case = Callable[[AsyncSession, Seeded], Awaitable[Any]]
+
+
+async def _get_study_plan_progress(session: AsyncSession, seeded: Seeded) -> Any:
+    plan = seeded.user.plans[0]
+    return await ProgressRepository(session).get_study_plan_progress(
+        seeded.user.id, plan.id
+    )
+
+
+async def _get_section_progresses(session: AsyncSession, seeded: Seeded) -> Any:
+    section_ids = [section_id for section_id, _ in seeded.user.plans[0].resources]
+    return await ProgressRepository(session).get_section_progresses(
+        seeded.study_plan_progress_id, section_ids
+    )
+
+
+async def _get_resource_progress(session: AsyncSession, seeded: Seeded) -> Any:
+    _, resource_id = seeded.user.plans[0].resources[0]
+    return await ProgressRepository(session).get_resource_progress(
+        seeded.section_progress_id, resource_id
+    )
+
+
+async def _get_ancestor_ids(session: AsyncSession, seeded: Seeded) -> Any:
+    section_id, _ = seeded.user.plans[0].resources[-1]
+    return await SectionRepository(session).get_ancestor_ids(section_id)
+
+
+async def _get_descendant_ids(session: AsyncSession, seeded: Seeded) -> Any:
+    section_id, _ = seeded.user.plans[0].resources[0]
+    return await SectionRepository(session).get_descendant_ids([section_id])
+
+
+async def _get_daily_activity(session: AsyncSession, seeded: Seeded) -> Any:
+    today = date.today()
+    return await AnalyticsRepository(session).get_daily_activity(
+        seeded.user.id, today - timedelta(days=30), today
+    )
+
+
+CASES: dict[str, Case] = {
+    "user.get_by_email": lambda session, seeded: UserRepository(session).get_by_email(
+        seeded.user.email
+    ),
+    "token.get_by_token": lambda session, _: RefreshTokenRepository(
+        session
+    ).get_by_token(REFRESH_TOKEN),
+    "study_plan.get_by_user": lambda session, seeded: StudyPlanRepository(
+        session
+    ).get_by_user(seeded.user.id),
+    "study_plan.get_study_plan_detailed": lambda session, seeded: StudyPlanRepository(
+        session
+    ).get_study_plan_detailed(seeded.user.plans[0].id),
+    "section.get_ancestor_ids": _get_ancestor_ids,
+    "section.get_descendant_ids": _get_descendant_ids,
+    "progress.get_study_plan_progress": _get_study_plan_progress,
+    "progress.get_section_progresses": _get_section_progresses,
+    "progress.get_resource_progress": _get_resource_progress,
+    "progress.replay_resource_statuses": lambda session, seeded: ProgressRepository(
+        session
+    ).replay_resource_statuses(seeded.study_plan_progress_id),
+    "quiz.get_by_plan_and_user": lambda session, seeded: QuizRepository(
+        session
+    ).get_by_plan_and_user(seeded.user.plans[0].id, seeded.user.id),
+    "quiz.list_by_plan_and_user": lambda session, seeded: QuizRepository(
+        session
+    ).list_by_plan_and_user(seeded.user.plans[0].id, seeded.user.id),
+    "quiz.get_public_questions": lambda session, seeded: QuizRepository(
+        session
+    ).get_public_questions(seeded.quiz_id),
+    "quiz.get_public_options": lambda session, seeded: QuizRepository(
+        session
+    ).get_public_options(seeded.quiz_id),
+    "analytics.get_daily_activity": _get_daily_activity,
+}
+
+
+async def _seed(session_factory: async_sessionmaker[AsyncSession]) -> Seeded:
+    users = await seed(
+        SeedConfig(users=2, plans_per_user=1, depth=2, fanout=2),
+        Random(0),
+        session_factory,
+    )
+    user = users[0]
+    async with session_factory() as session:
+        await RefreshTokenRepository(session).create(
+            RefreshToken(
+                token_hash=hash_refresh_token(REFRESH_TOKEN),
+                expires_at=datetime.now(UTC) + timedelta(days=7),
+                user_id=user.id,
+            )
+        )
+        quiz = await QuizRepository(session).get_by_plan_and_user(
+            user.plans[0].id, user.id
+        )
+        progress_repository = ProgressRepository(session)
+        progress = await progress_repository.get_study_plan_progress(
+            user.id, user.plans[0].id
+        )
+        assert progress is not None
+        section_id, _ = user.plans[0].resources[0]
+        section_progress = await progress_repository.get_section_progress(
+            progress.id, section_id
+        )
+    assert quiz is not None and section_progress is not None
+    return Seeded(
+        user=user,
+        quiz_id=quiz.id,
+        study_plan_progress_id=progress.id,
+        section_progress_id=section_progress.id,
+    )
+
+
+@contextmanager
+def _capture(
+    session_factory: async_sessionmaker[AsyncSession],
+) -> Iterator[list[tuple[str, Any]]]:
+    statements: list[tuple[str, Any]] = []
+
+    def record(_conn, _cursor, statement, parameters, _context, _many):
+        if not statement.lstrip().upper().startswith(_TRANSACTION_CONTROL):
+            statements.append((statement, parameters))
+
+    engine = session_factory.kw["bind"].sync_engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+async def _explain(conn: AsyncConnection, statement: str, parameters: Any) -> list[str]:
+    if conn.dialect.name == "sqlite":
+        rows = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        # (id, parent, notused, detail), parents listed before their children
+        depths = {0: -1}
+        lines = []
+        for id, parent, _, detail in rows:
+            depths[id] = depths.get(parent, -1) + 1
+            lines.append("  " * depths[id] + detail)
+        return lines
+
+    # On a table this small a sequential scan is always cheapest, so it is
+    # priced out to show whether an index could serve the statement
+    await conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    rows = await conn.exec_driver_sql(f"EXPLAIN (COSTS OFF) {statement}", parameters)
+    return [_LITERAL.sub("?", line) for (line,) in rows]
+
+
+def _scanned_tables(plan: list[str], dialect: str) -> list[str]:
+    tables = SQLModel.metadata.tables
+    scanned = []
+    for line in plan:
+        if dialect == "sqlite":
+            match = _SQLITE_SCAN.match(line.strip())
+        else:
+            match = _POSTGRES_SCAN.search(line)
+        # CTEs and subqueries are scanned too, but they are not tables
+        if match and match.group(1) in tables:
+            scanned.append(match.group(1))
+    return scanned
+
+
+async def test_hot_queries_use_indexes_and_match_snapshot(session: AsyncSession):
+    session_factory = async_sessionmaker(session.bind, expire_on_commit=False)
+    seeded = await _seed(session_factory)
+    dialect = session.bind.dialect.name
+
+    plans: dict[str, list[list[str]]] = {}
+    scans = []
+    for name, case in CASES.items():
+        # A new session per case, so nothing is served from the identity map
+        with _capture(session_factory) as statements:
+            async with session_factory() as case_session:
+                await case(case_session, seeded)
+        assert statements, f"{name} ran no statements"
+
+        plans[name] = []
+        async with session_factory.kw["bind"].connect() as conn:
+            for statement, parameters in statements:
+                plan = await _explain(conn, statement, parameters)
+                plans[name].append(plan)
+                scans.extend(
+                    f"{name} scans {table}:\n{statement}\n" + "\n".join(plan)
+                    for table in _scanned_tables(plan, dialect)
+                )
+        # Eager loads of sibling relationships run in no fixed order
+        plans[name].sort()
+
+    assert not scans, "\n\n".join(scans)
+
+    snapshot = SNAPSHOTS / f"{dialect}.json"
+    if os.environ.get("UPDATE_QUERY_PLANS"):
+        SNAPSHOTS.mkdir(exist_ok=True)
+        snapshot.write_text(json.dumps(plans, indent=2) + "\n")
+    assert snapshot.exists(), (
+        f"No query-plan snapshot for {dialect}; create it with UPDATE_QUERY_PLANS=1"
+    )
+    expected = json.loads(snapshot.read_text())
+    changed = sorted(
+        name
+        for name in plans.keys() | expected.keys()
+        if plans.get(name) != expected.get(name)
+    )
+    assert not changed, (
+        f"Query plans of {', '.join(changed)} differ from {snapshot.name}; "
+        "review them and regenerate it with UPDATE_QUERY_PLANS=1:\n"
+        + json.dumps({name: plans.get(name) for name in changed}, indent=2)
+    )
@@ -0,0 +1,152 @@
+import time
+from collections.abc import Awaitable, Callable
+
+import pytest
+from fastapi import Request
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event, func, insert, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core import database
+from app.core.config import get_settings
+from app.core.database import (
+    READ_ONLY_OPTION,
+    READ_PRIMARY_COOKIE,
+    ReadYourWritesMiddleware,
+    create_read_engine,
+    get_session,
+    reads_primary,
+)
+from app.persistence.model.user import User
+
+settings = get_settings()
+
+
+def _request(method: str, cookie: str | None = None) -> Request:
+    headers = [(b"cookie", cookie.encode())] if cookie else []
+    return Request({"type": "http", "method": method, "headers": headers})
+
+
+@pytest.mark.asyncio
+async def test_sqlite_read_engine_is_read_only(session: AsyncSession):
+    read_engine = create_read_engine(settings.DATABASE_TEST_URL)
+    if read_engine is None:
+        pytest.skip("Reads share the primary engine on this backend")
+
+    session.add(User(email="ro@example.com", username="readonly", hashed_password="h"))
+    await session.commit()
+
+    try:
+        async with read_engine.connect() as conn:
+            count = await conn.scalar(select(func.count()).select_from(User))
+            assert count == 1
+            with pytest.raises(OperationalError, match="readonly"):
+                await conn.execute(
+                    insert(User).values(
+                        email="no@example.com", username="nope", hashed_password="h"
+                    )
+                )
+    finally:
+        await read_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_only_write_sessions_take_the_sqlite_write_lock(session: AsyncSession):
+    engine = session.bind
+    if engine.dialect.name != "sqlite":
+        pytest.skip("Transactions only take the write lock up front on SQLite")
+
+    begins: list[str] = []
+
+    def record(_conn, _cursor, statement, *_args) -> None:
+        if statement.startswith("BEGIN"):
+            begins.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        read_only = engine.execution_options(**{READ_ONLY_OPTION: True})
+        async with async_sessionmaker(read_only)() as reader:
+            await reader.execute(select(func.count()).select_from(User))
+        async with async_sessionmaker(engine)() as writer:
+            await writer.execute(select(func.count()).select_from(User))
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+    assert begins == ["BEGIN", "BEGIN IMMEDIATE"]
+
+
+async def _run_session(
+    request: Request, body: Callable[[AsyncSession], Awaitable[object]]
+) -> None:
+    sessions = get_session(request)
+    session = await anext(sessions)
+    try:
+        await body(session)
+    except Exception as exc:
+        with pytest.raises(type(exc)):
+            await sessions.athrow(exc)
+        return
+    with pytest.raises(StopAsyncIteration):
+        await anext(sessions)
+
+
+@pytest.mark.asyncio
+async def test_committed_writes_pin_reads_to_primary(
+    session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(
+        database,
+        "async_session_factory",
+        async_sessionmaker(session.bind, expire_on_commit=False),
+    )
+
+    async def write(session: AsyncSession) -> None:
+        session.add(User(email="pin@example.com", username="pin", hashed_password="h"))
+
+    async def write_then_fail(session: AsyncSession) -> None:
+        await write(session)
+        await session.flush()
+        raise RuntimeError("failed after writing")
+
+    async def read(session: AsyncSession) -> None:
+        await session.execute(select(func.count()).select_from(User))
+
+    failed = _request("POST")
+    await _run_session(failed, write_then_fail)
+    assert not hasattr(failed.state, "read_primary_until")
+
+    no_op = _request("POST")
+    await _run_session(no_op, read)
+    assert not hasattr(no_op.state, "read_primary_until")
+
+    written = _request("POST")
+    await _run_session(written, write)
+    assert written.state.read_primary_until > time.time()
+
+
+@pytest.mark.asyncio
+async def test_middleware_sets_the_read_primary_cookie():
+    until = time.time() + settings.READ_YOUR_WRITES_SECONDS
+
+    async def app(scope, _receive, send) -> None:
+        if scope["path"] == "/write":
+            scope.setdefault("state", {})["read_primary_until"] = until
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async with AsyncClient(
+        transport=ASGITransport(app=ReadYourWritesMiddleware(app)),
+        base_url="http://test",
+    ) as client:
+        written = await client.get("/write")
+        read = await client.get("/read")
+
+    cookie = written.headers["set-cookie"]
+    assert cookie.startswith(f"{READ_PRIMARY_COOKIE}={until}")
+    assert reads_primary(_request("GET", cookie.split(";")[0]))
+    assert "set-cookie" not in read.headers
+
+    expired = f"{READ_PRIMARY_COOKIE}={time.time() - 1}"
+    assert not reads_primary(_request("GET", expired))
+    assert not reads_primary(_request("GET"))
@@ -28,12 +28,16 @@ async def test_get_with_details(
 
     # Section 1
     s1 = Section(title="S1", order=0)
-    r1 = Resource(title="R1", url="http://r1", type=ResourceType.ARTICLE)
+    r1 = Resource(
+        title="R1", url="http://r1", type=ResourceType.ARTICLE, fingerprint="r1"
+    )
     s1.resources.append(r1)
 
     # Section 1.1 (Child)
     s1_1 = Section(title="S1.1", order=0)
-    r1_1 = Resource(title="R1.1", url="http://r1.1", type=ResourceType.VIDEO)
+    r1_1 = Resource(
+        title="R1.1", url="http://r1.1", type=ResourceType.VIDEO, fingerprint="r1.1"
+    )
     s1_1.resources.append(r1_1)
 
     s1.children.append(s1_1)
@@ -2,6 +2,7 @@ from datetime import UTC, datetime, timedelta
 
 import pytest
 
+from app.core.security import hash_refresh_token
 from app.persistence.model.token import RefreshToken
 from app.persistence.model.user import User
 from app.persistence.repository.token import RefreshTokenRepository
@@ -20,7 +21,7 @@ async def test_create_and_get_token(
     user = await user_repository.create(user)
 
     token = RefreshToken(
-        token="some_random_token",
+        token_hash=hash_refresh_token("some_random_token"),
         expires_at=datetime.now(UTC) + timedelta(days=7),
         user_id=user.id,
     )
@@ -29,5 +30,60 @@ async def test_create_and_get_token(
 
     fetched_token = await refresh_token_repository.get_by_token("some_random_token")
     assert fetched_token is not None
-    assert fetched_token.token == "some_random_token"
+    assert fetched_token.token_hash == hash_refresh_token("some_random_token")
     assert fetched_token.user_id == user.id
+
+
+@pytest.mark.asyncio
+async def test_delete_stale_batch(
+    refresh_token_repository: RefreshTokenRepository, user_repository: UserRepository
+):
+    user = await user_repository.create(
+        User(
+            email="purge@example.com",
+            username="purgeuser",
+            hashed_password="hashedpassword",
+        )
+    )
+    now = datetime.now(UTC)
+    tokens = {
+        "expired": RefreshToken(
+            token_hash=hash_refresh_token("expired"),
+            expires_at=now - timedelta(days=1),
+            user_id=user.id,
+        ),
+        "revoked_long_ago": RefreshToken(
+            token_hash=hash_refresh_token("revoked_long_ago"),
+            expires_at=now + timedelta(days=1),
+            revoked_at=now - timedelta(days=2),
+            user_id=user.id,
+        ),
+        "revoked_recently": RefreshToken(
+            token_hash=hash_refresh_token("revoked_recently"),
+            expires_at=now + timedelta(days=1),
+            revoked_at=now,
+            user_id=user.id,
+        ),
+        "live": RefreshToken(
+            token_hash=hash_refresh_token("live"),
+            expires_at=now + timedelta(days=1),
+            user_id=user.id,
+        ),
+    }
+    await refresh_token_repository.create_batch(list(tokens.values()))
+
+    revoked_before = now - timedelta(days=1)
+    assert (
+        await refresh_token_repository.delete_stale_batch(now, revoked_before, 1) == 1
+    )
+    assert (
+        await refresh_token_repository.delete_stale_batch(now, revoked_before, 5) == 1
+    )
+    assert (
+        await refresh_token_repository.delete_stale_batch(now, revoked_before, 5) == 0
+    )
+
+    assert await refresh_token_repository.get_by_token("expired") is None
+    assert await refresh_token_repository.get_by_token("revoked_long_ago") is None
+    assert await refresh_token_repository.get_by_token("revoked_recently") is not None
+    assert await refresh_token_repository.get_by_token("live") is not None
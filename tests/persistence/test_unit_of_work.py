@@ -0,0 +1,41 @@
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.database import READ_ONLY_OPTION, unit_of_work
+from app.persistence.model.user import User
+from app.persistence.repository.user import UserRepository
+
+
+async def _count_users(session_factory: async_sessionmaker[AsyncSession]) -> int:
+    async with session_factory() as session:
+        return (
+            await session.execute(select(func.count()).select_from(User))
+        ).scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_unit_of_work_commits_once_or_rolls_back(session: AsyncSession):
+    session_factory = async_sessionmaker(session.bind, expire_on_commit=False)
+    # Reads from outside the unit of work, without waiting for its write lock
+    reader_factory = async_sessionmaker(
+        session.bind.execution_options(**{READ_ONLY_OPTION: True})
+    )
+
+    async with unit_of_work(session_factory) as uow_session:
+        repository = UserRepository(uow_session)
+        await repository.create(
+            User(email="a@example.com", username="a", hashed_password="h")
+        )
+        # Flushed, but not visible outside the unit of work yet
+        assert await _count_users(reader_factory) == 0
+    assert await _count_users(reader_factory) == 1
+
+    with pytest.raises(RuntimeError):
+        async with unit_of_work(session_factory) as uow_session:
+            repository = UserRepository(uow_session)
+            await repository.create(
+                User(email="b@example.com", username="b", hashed_password="h")
+            )
+            raise RuntimeError("boom")
+    assert await _count_users(reader_factory) == 1